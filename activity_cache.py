@@ -0,0 +1,196 @@
+"""
+Activity Detail Cache
+
+This module keeps Strava activity details (`GET /activities/{id}`) on disk,
+zlib-compressed JSON in SQLite keyed by activity ID, so re-running an analysis
+or a traffic capture does not download rides we have already seen.
+
+Entries are served without any network call while they are fresh (forever by
+default). Stale entries, from `max_age_seconds` or `mark_stale` (for example
+after an activity update), are revalidated with a conditional request using the
+stored ETag (If-None-Match) or Last-Modified (If-Modified-Since); a 304 answer
+keeps the cached copy without downloading it again. Only the webhook receiver
+learns about edits, so callers that poll use POLLING_MAX_AGE_SECONDS instead
+of caching forever.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Revalidate daily when no webhook events mark edited activities stale
+POLLING_MAX_AGE_SECONDS = 24 * 3600
+
+
+@dataclass
+class CachedActivity:
+    """Cached activity details and their validators."""
+    activity_id: int
+    details: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    fresh: bool
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the server to answer 304 if the activity is unchanged."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ActivityCache:
+    """Persistent, compressed cache of Strava activity details."""
+
+    def __init__(self, db_path: str = "activity_cache.db", max_age_seconds: Optional[float] = None,
+                 compression_level: int = 6):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to SQLite database (share it to share the cache)
+            max_age_seconds: Revalidate entries older than this (None serves them until marked stale)
+            compression_level: zlib level for stored JSON
+        """
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up SQLite table for cached activity details."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS activity_details (
+                activity_id INTEGER PRIMARY KEY,
+                details BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                stale INTEGER DEFAULT 0,
+                raw_bytes INTEGER,
+                stored_bytes INTEGER
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def get(self, activity_id: int) -> Optional[CachedActivity]:
+        """
+        Look up cached details.
+
+        Args:
+            activity_id: Strava activity ID
+
+        Returns:
+            CachedActivity (check `fresh` before skipping the network), or None on a miss
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT details, etag, last_modified, stored_at, stale FROM activity_details WHERE activity_id = ?
+        ''', (activity_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        blob, etag, last_modified, stored_at, stale = row
+        expired = self.max_age_seconds is not None and time.time() - stored_at > self.max_age_seconds
+        fresh = not stale and not expired
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1  # Needs a (conditional) request
+        return CachedActivity(activity_id, json.loads(zlib.decompress(blob)), etag, last_modified,
+                              stored_at, fresh)
+
+    def put(self, activity_id: int, details: Dict[str, Any], etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """
+        Store activity details.
+
+        Args:
+            activity_id: Strava activity ID
+            details: Activity details from the API
+            etag: ETag response header
+            last_modified: Last-Modified response header
+        """
+        raw = json.dumps(details, separators=(",", ":")).encode()
+        blob = zlib.compress(raw, self.compression_level)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO activity_details
+            (activity_id, details, etag, last_modified, stored_at, stale, raw_bytes, stored_bytes)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+        ''', (activity_id, blob, etag, last_modified, time.time(), len(raw), len(blob)))
+        conn.commit()
+        conn.close()
+
+    def revalidated(self, activity_id: int):
+        """Record that the server confirmed the cached copy is current (HTTP 304)."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE activity_details SET stored_at = ?, stale = 0 WHERE activity_id = ?
+        ''', (time.time(), activity_id))
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            self.revalidations += 1
+
+    def mark_stale(self, activity_id: int):
+        """Make the next lookup revalidate this activity with the server."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('UPDATE activity_details SET stale = 1 WHERE activity_id = ?', (activity_id,))
+        conn.commit()
+        conn.close()
+
+    def delete(self, activity_id: int):
+        """Drop an activity (for example after it was deleted on Strava)."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM activity_details WHERE activity_id = ?', (activity_id,))
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/revalidation counters, entries and the compression ratio."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*), SUM(raw_bytes), SUM(stored_bytes) FROM activity_details')
+        entries, raw_bytes, stored_bytes = cursor.fetchone()
+        conn.close()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "entries": entries,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "compression_ratio": round(raw_bytes / stored_bytes, 1) if stored_bytes else 0.0
+            }
@@ -7,9 +7,14 @@ including miles ridden and weather conditions.
 
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
 import math
 
+import numpy as np
+
+from wear_model import WearModel, apply_wear_model, builtin_model, load_wear_model
+
 
 class WeatherCondition(Enum):
     """Enumeration of weather conditions that affect brake pad wear."""
@@ -50,39 +55,198 @@ class RidingConditions:
     braking_frequency: float  # 1-10 scale, higher = more frequent braking
 
 
-class BrakeWearEstimator:
-    """Estimates brake pad wear based on riding conditions and distance."""
+# Integer codes used by the batch API: a code is the index into these tuples.
+# Any code outside the range (e.g. -1 for "unknown") gets a neutral 1.0 multiplier.
+WEATHER_CODES = tuple(WeatherCondition)
+TERRAIN_CODES = tuple(TerrainType)
+
+
+def _encode(values, codes) -> np.ndarray:
+    """Encode enums, enum values (strings) or integer codes as an int8 code array."""
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        return values.astype(np.int8)
+    lookup = {member: i for i, member in enumerate(codes)}
+    lookup.update({member.value: i for i, member in enumerate(codes)})
+    return np.array(
+        [lookup.get(v.lower() if isinstance(v, str) else v, -1) for v in values.ravel()],
+        dtype=np.int8
+    ).reshape(values.shape)
+
+
+def encode_weather(values) -> np.ndarray:
+    """Encode weather conditions ("wet", WeatherCondition.WET, ...) as batch codes."""
+    return _encode(values, WEATHER_CODES)
+
+
+def encode_terrain(values) -> np.ndarray:
+    """Encode terrain types ("hilly", TerrainType.HILLY, ...) as batch codes."""
+    return _encode(values, TERRAIN_CODES)
+
+
+def multiplier_lookup(multipliers: Dict, codes: Sequence) -> np.ndarray:
+    """
+    Build a code-indexed lookup array from a multiplier table.
     
-    # Weather wear multipliers (higher = more wear)
-    WEATHER_MULTIPLIERS = {
-        WeatherCondition.DRY: 1.0,
-        WeatherCondition.WET: 1.3,
-        WeatherCondition.RAINY: 1.5,
-        WeatherCondition.SNOWY: 1.8,
-        WeatherCondition.MUDDY: 2.2,
-        WeatherCondition.SANDY: 2.5,
-    }
+    The array has one extra trailing 1.0 entry that out-of-range codes are
+    mapped to by `lookup_multipliers`.
+    """
+    return np.array([multipliers.get(member, 1.0) for member in codes] + [1.0])
+
+
+def lookup_multipliers(lookup: np.ndarray, codes) -> np.ndarray:
+    """Map integer codes to multipliers, sending unknown codes to the neutral entry."""
+    codes = np.asarray(codes)
+    n_known = len(lookup) - 1
+    return lookup[np.where((codes >= 0) & (codes < n_known), codes, n_known)]
+
+
+def wear_mm_array(
+    base_wear_rate,
+    km_ridden,
+    weather_multiplier,
+    terrain_multiplier,
+    average_speed_kmh,
+    braking_frequency,
+    total_weight_kg,
+    temperature_celsius=None
+) -> np.ndarray:
+    """
+    Vectorized form of the wear formula used by `BrakeWearEstimator.estimate_wear`.
     
-    # Terrain wear multipliers
-    TERRAIN_MULTIPLIERS = {
-        TerrainType.FLAT: 0.8,
-        TerrainType.HILLY: 1.2,
-        TerrainType.MOUNTAINOUS: 1.6,
-        TerrainType.URBAN: 1.1,
-        TerrainType.OFF_ROAD: 1.4,
-    }
+    All arguments broadcast against each other. The factors are clamped and
+    multiplied in the same order as the scalar path, so the results are
+    bit-for-bit identical to it. Missing temperatures are passed as NaN.
+    
+    Returns:
+        Array of wear in millimetres
+    """
+    speed_factor = np.minimum(1.5, np.maximum(0.5, np.asarray(average_speed_kmh, dtype=float) / 30.0))
+    braking_factor = np.asarray(braking_frequency, dtype=float) / 5.0
+    weight_factor = np.minimum(1.5, np.maximum(0.8, np.asarray(total_weight_kg, dtype=float) / 100.0))
+    
+    temp_factor = 1.0
+    if temperature_celsius is not None:
+        temperature = np.asarray(temperature_celsius, dtype=float)
+        # NaN compares False on both sides, so missing temperatures keep 1.0
+        temp_factor = np.where((temperature < -10) | (temperature > 40), 1.2, 1.0)
+    
+    return (
+        base_wear_rate *
+        (np.asarray(km_ridden, dtype=float) / 1000.0) *
+        weather_multiplier *
+        terrain_multiplier *
+        speed_factor *
+        braking_factor *
+        weight_factor *
+        temp_factor
+    )
+
+
+def pad_life_arrays(total_wear_mm, miles_ridden, initial_thickness_mm, minimum_thickness_mm) -> Dict[str, np.ndarray]:
+    """
+    Vectorized remaining-life figures for wear results, rounded like `estimate_wear`.
+    
+    Args:
+        total_wear_mm: Wear in millimetres
+        miles_ridden: Distance the wear was accumulated over
+        initial_thickness_mm: New pad thickness (scalar or array)
+        minimum_thickness_mm: Replacement thickness (scalar or array)
+        
+    Returns:
+        Dictionary of arrays with wear, remaining thickness, wear percentage,
+        remaining miles and the replacement flag
+    """
+    miles = np.asarray(miles_ridden, dtype=float)
+    remaining_thickness = initial_thickness_mm - total_wear_mm
+    usable_thickness = initial_thickness_mm - minimum_thickness_mm
+    wear_percentage = np.minimum(100.0, np.maximum(0.0, (total_wear_mm / usable_thickness) * 100))
     
-    # Material wear rates (mm per 1000 km under standard conditions)
-    MATERIAL_WEAR_RATES = {
-        "organic": 0.15,
-        "semi-metallic": 0.12,
-        "ceramic": 0.08,
-        "sintered": 0.10,
+    with np.errstate(divide="ignore", invalid="ignore"):
+        wear_per_mile = total_wear_mm / miles
+        remaining_miles = (remaining_thickness - minimum_thickness_mm) / wear_per_mile
+    remaining_miles = np.where((total_wear_mm > 0) & (wear_per_mile > 0), remaining_miles, 0.0)
+    
+    return {
+        "wear_mm": np.round(total_wear_mm, 3),
+        "remaining_thickness_mm": np.round(remaining_thickness, 3),
+        "wear_percentage": np.round(wear_percentage, 1),
+        "remaining_miles": np.round(remaining_miles, 0),
+        "needs_replacement": remaining_thickness <= minimum_thickness_mm
     }
+
+
+@lru_cache(maxsize=4096)
+def wear_rate_per_mile(
+    base_wear_rate: float,
+    weather_multiplier: float,
+    terrain_multiplier: float,
+    average_speed_kmh: float,
+    braking_frequency: float,
+    total_weight_kg: float,
+    extreme_temperature: bool
+) -> float:
+    """
+    Wear in mm per mile, memoized in a bounded LRU cache.
+    
+    Keyed on the resolved rate and multipliers rather than enums or specs, so
+    estimators with different wear models never share an entry by mistake.
+    
+    Args:
+        base_wear_rate: Material wear in mm per 1000 km
+        weather_multiplier: Weather wear multiplier
+        terrain_multiplier: Terrain wear multiplier
+        average_speed_kmh: Average riding speed in km/h
+        braking_frequency: Braking frequency on 1-10 scale
+        total_weight_kg: Rider plus bike weight
+        extreme_temperature: Below -10C or above 40C
+        
+    Returns:
+        Wear in millimetres per mile
+    """
+    speed_factor = min(1.5, max(0.5, average_speed_kmh / 30.0))
+    braking_factor = braking_frequency / 5.0
+    weight_factor = min(1.5, max(0.8, total_weight_kg / 100.0))
+    temp_factor = 1.2 if extreme_temperature else 1.0
+    return (
+        base_wear_rate *
+        (1.60934 / 1000.0) *
+        weather_multiplier *
+        terrain_multiplier *
+        speed_factor *
+        braking_factor *
+        weight_factor *
+        temp_factor
+    )
+
+
+class BrakeWearEstimator:
+    """Estimates brake pad wear based on riding conditions and distance."""
+    
+    # Built-in tables (see wear_model.py); instances use the loaded wear model
+    WEATHER_MULTIPLIERS = builtin_model().weather_table(WeatherCondition)
+    TERRAIN_MULTIPLIERS = builtin_model().terrain_table(TerrainType)
+    MATERIAL_WEAR_RATES = builtin_model().material_wear_rates
     
-    def __init__(self, brake_pad_specs: BrakePadSpecs):
-        """Initialize the estimator with brake pad specifications."""
+    def __init__(self, brake_pad_specs: BrakePadSpecs, wear_model: Optional[WearModel] = None):
+        """
+        Initialize the estimator with brake pad specifications.
+        
+        Args:
+            brake_pad_specs: Brake pad specifications
+            wear_model: Wear multiplier tables (default: the model file, loaded once per
+                process, or built-in tables)
+        """
         self.brake_pad_specs = brake_pad_specs
+        self.use_wear_model(wear_model or load_wear_model())
+    
+    def use_wear_model(self, wear_model: WearModel):
+        """
+        Replace this estimator's multiplier tables with those of a wear model.
+        
+        Tables a subclass overrides at class level keep the subclass's values.
+        """
+        apply_wear_model(self, BrakeWearEstimator, wear_model, WeatherCondition, TerrainType)
         
     def estimate_wear(
         self,
@@ -170,6 +334,100 @@ class BrakeWearEstimator:
             "temp_factor": temp_factor
         }
     
+    def estimate_wear_batch(
+        self,
+        miles_ridden,
+        weather_codes,
+        terrain_codes,
+        average_speed_kmh,
+        rider_weight_kg,
+        bike_weight_kg,
+        braking_frequency,
+        temperature_celsius=None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Estimate brake pad wear for many rides in one vectorized pass.
+        
+        Every argument is a column (array-like of equal length) or a scalar that
+        broadcasts across all rides. Weather and terrain are integer codes (see
+        `encode_weather` / `encode_terrain`). Results are rounded exactly like
+        `estimate_wear`, so row i matches the scalar result for ride i.
+        
+        Args:
+            miles_ridden: Distance ridden in miles
+            weather_codes: Weather condition codes
+            terrain_codes: Terrain type codes
+            average_speed_kmh: Average riding speed in km/h
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            braking_frequency: Braking frequency on 1-10 scale
+            temperature_celsius: Ambient temperature, NaN where unknown (optional)
+            
+        Returns:
+            Dictionary of arrays with wear, remaining thickness, wear percentage,
+            remaining miles and the replacement flag
+        """
+        miles = np.asarray(miles_ridden, dtype=float)
+        base_wear_rate = self.MATERIAL_WEAR_RATES.get(
+            self.brake_pad_specs.material, 0.12
+        )
+        weather_multiplier = lookup_multipliers(
+            multiplier_lookup(self.WEATHER_MULTIPLIERS, WEATHER_CODES), weather_codes
+        )
+        terrain_multiplier = lookup_multipliers(
+            multiplier_lookup(self.TERRAIN_MULTIPLIERS, TERRAIN_CODES), terrain_codes
+        )
+        total_weight = np.asarray(rider_weight_kg, dtype=float) + np.asarray(bike_weight_kg, dtype=float)
+        
+        total_wear_mm = wear_mm_array(
+            base_wear_rate,
+            miles * 1.60934,
+            weather_multiplier,
+            terrain_multiplier,
+            average_speed_kmh,
+            braking_frequency,
+            total_weight,
+            temperature_celsius
+        )
+        
+        return pad_life_arrays(
+            total_wear_mm,
+            miles,
+            self.brake_pad_specs.initial_thickness_mm,
+            self.brake_pad_specs.minimum_thickness_mm
+        )
+    
+    def wear_per_mile(
+        self,
+        conditions: RidingConditions,
+        temperature_celsius: Optional[float] = None
+    ) -> float:
+        """
+        Unrounded wear per mile under given conditions.
+        
+        Rates are memoized on the values that determine them (see `wear_rate_per_mile`),
+        so forecasting for many customers with similar conditions reuses them.
+        
+        Args:
+            conditions: Riding conditions object
+            temperature_celsius: Ambient temperature (optional)
+            
+        Returns:
+            Wear in millimetres per mile
+        """
+        extreme_temperature = temperature_celsius is not None and (
+            temperature_celsius < -10 or temperature_celsius > 40
+        )
+        return wear_rate_per_mile(
+            self.MATERIAL_WEAR_RATES.get(self.brake_pad_specs.material, 0.12),
+            self.WEATHER_MULTIPLIERS.get(conditions.weather, 1.0),
+            self.TERRAIN_MULTIPLIERS.get(conditions.terrain, 1.0),
+            conditions.average_speed_kmh,
+            conditions.braking_frequency,
+            conditions.rider_weight_kg + conditions.bike_weight_kg,
+            extreme_temperature
+        )
+    
     def estimate_replacement_miles(
         self,
         conditions: RidingConditions,
@@ -185,12 +443,7 @@ class BrakeWearEstimator:
         Returns:
             Estimated miles until replacement needed
         """
-        # Use a small test distance to calculate wear rate
-        test_miles = 1000.0
-        test_result = self.estimate_wear(test_miles, conditions, temperature_celsius)
-        
-        # Calculate wear per mile
-        wear_per_mile = test_result["wear_mm"] / test_miles
+        wear_per_mile = self.wear_per_mile(conditions, temperature_celsius)
         
         # Calculate usable thickness
         usable_thickness = self.brake_pad_specs.initial_thickness_mm - self.brake_pad_specs.minimum_thickness_mm
@@ -202,6 +455,22 @@ class BrakeWearEstimator:
             return float('inf')  # No wear detected
 
 
+def parse_weather(weather: str) -> WeatherCondition:
+    """Parse a weather name, defaulting to dry if invalid."""
+    try:
+        return WeatherCondition(weather.lower())
+    except ValueError:
+        return WeatherCondition.DRY
+
+
+def parse_terrain(terrain: str) -> TerrainType:
+    """Parse a terrain name, defaulting to flat if invalid."""
+    try:
+        return TerrainType(terrain.lower())
+    except ValueError:
+        return TerrainType.FLAT
+
+
 def estimate_brake_pad_wear(
     miles_ridden: float,
     weather: str,
@@ -239,19 +508,9 @@ def estimate_brake_pad_wear(
     )
     
     # Create riding conditions
-    try:
-        weather_enum = WeatherCondition(weather.lower())
-    except ValueError:
-        weather_enum = WeatherCondition.DRY  # Default to dry if invalid
-        
-    try:
-        terrain_enum = TerrainType(terrain.lower())
-    except ValueError:
-        terrain_enum = TerrainType.FLAT  # Default to flat if invalid
-    
     conditions = RidingConditions(
-        weather=weather_enum,
-        terrain=terrain_enum,
+        weather=parse_weather(weather),
+        terrain=parse_terrain(terrain),
         rider_weight_kg=rider_weight_kg,
         bike_weight_kg=bike_weight_kg,
         average_speed_kmh=average_speed_kmh,
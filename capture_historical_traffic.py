@@ -39,47 +39,46 @@ def capture_historical_traffic(strava_api, google_maps_api, days_back: int = 30)
     print(f"🔍 Looking for rides from the last {days_back} days...")
     
     try:
-        # Get recent activities
+        # Walk the rides page by page; the next page downloads while this one is processed
         after_date = datetime.now() - timedelta(days=days_back)
-        activities = strava_api.get_activities(after=after_date, activity_type="Ride")
+        activities = strava_api.iter_activities(after=after_date, activity_type="Ride")
         
-        if not activities:
-            print("❌ No rides found in the specified time period.")
-            return
-        
-        print(f"📊 Found {len(activities)} rides to analyze...")
+        # Load the already captured IDs once instead of re-reading every comparison per ride
+        captured_ids = {comp.activity_id for comp in monitor.get_all_comparisons()}
         
+        found_count = 0
         captured_count = 0
         skipped_count = 0
         
-        for i, activity in enumerate(activities, 1):
+        for activity in activities:
             activity_id = activity["id"]
             activity_name = activity.get("name", "Unknown")
+            found_count += 1
             
-            print(f"\n[{i}/{len(activities)}] Analyzing: {activity_name}")
+            print(f"\n[{found_count}] Analyzing: {activity_name}")
             
             # Check if already captured
-            existing = monitor.get_all_comparisons()
-            if any(comp.activity_id == activity_id for comp in existing):
+            if activity_id in captured_ids:
                 print(f"   ⏭️  Already captured, skipping...")
                 skipped_count += 1
                 continue
             
             # Capture traffic data
-            comparison = monitor.capture_traffic_for_activity(activity_id)
+            comparison = monitor.capture_traffic_for_activity(activity_id, summary=activity)
             
             if comparison:
                 print(f"   ✅ Captured: {comparison.time_saved_minutes:.1f} minutes saved")
+                captured_ids.add(activity_id)
                 captured_count += 1
             else:
                 print(f"   ❌ Failed to capture")
-            
-            # Rate limiting
-            import time
-            time.sleep(2)
+        
+        if found_count == 0:
+            print("❌ No rides found in the specified time period.")
+            return
         
         print(f"\n📈 Capture Summary:")
-        print(f"   Total rides found: {len(activities)}")
+        print(f"   Total rides found: {found_count}")
         print(f"   New captures: {captured_count}")
         print(f"   Already captured: {skipped_count}")
         
@@ -122,10 +121,13 @@ def main():
         return
     
     # Initialize APIs
+    from activity_cache import POLLING_MAX_AGE_SECONDS, ActivityCache
     from strava_brake_wear_estimator import StravaAPI
     from traffic_comparison import GoogleMapsAPI
     
-    strava_api = StravaAPI(str(client_id), str(client_secret), str(access_token))
+    # Cached activity details make re-running the capture free for rides downloaded in the last day
+    strava_api = StravaAPI(str(client_id), str(client_secret), str(access_token),
+                           activity_cache=ActivityCache(max_age_seconds=POLLING_MAX_AGE_SECONDS))
     google_maps_api = GoogleMapsAPI(str(maps_api_key))
     
     # Capture historical traffic
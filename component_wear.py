@@ -0,0 +1,201 @@
+"""
+Multi-Component Wear Engine
+
+The ride factors the brake pad model derives from Strava data (distance,
+weather, terrain, speed, braking, weight, temperature) also drive wear on the
+chain, cassette, tires and rotors. This module computes those factors once
+for a RideTable and evaluates every registered component against them, so
+ride history is fetched, enriched and scanned once per bike, not once per
+component.
+
+A component's factor model is a base wear rate per 1000 km times the shared
+factors raised to per-component exponents (0 ignores a factor). The brake pad
+component uses exponent 1 for every factor, so it reproduces
+`StravaBrakeWearEstimator` exactly.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from strava_brake_wear_estimator import RideTable, StravaBrakeWearEstimator
+
+# Shared per-ride factors, in the order the brake pad formula multiplies them
+FACTOR_ORDER = (
+    "weather_multiplier",
+    "terrain_multiplier",
+    "speed_factor",
+    "braking_factor",
+    "weight_factor",
+    "temp_factor",
+)
+
+
+@dataclass
+class ComponentModel:
+    """Wear model for one bike component."""
+    name: str
+    unit: str  # Unit of wear, e.g. "mm" of pad or "%" chain elongation
+    wear_per_1000km: float  # Wear under standard conditions
+    wear_limit: float  # Wear at which the component is due for replacement
+    factor_exponents: Dict[str, float] = field(default_factory=dict)  # Factor -> exponent (missing = 0)
+
+    def ride_wear(self, factors: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Wear for every ride from the shared factor arrays.
+
+        Args:
+            factors: Output of StravaBrakeWearEstimator._table_factors
+
+        Returns:
+            Array of wear per ride in this component's unit
+        """
+        wear = self.wear_per_1000km * (factors["km_ridden"] / 1000.0)
+        for name in FACTOR_ORDER:
+            exponent = self.factor_exponents.get(name, 0.0)
+            if exponent == 1.0:
+                wear = wear * factors[name]
+            elif exponent:
+                wear = wear * factors[name] ** exponent
+        return wear
+
+
+def default_components(estimator: StravaBrakeWearEstimator) -> List[ComponentModel]:
+    """
+    Standard drivetrain, tire and brake components for a bike.
+
+    Brake pad wear uses the estimator's pad material and thickness, so it
+    matches the estimator's own results.
+
+    Args:
+        estimator: Estimator whose pad specs and wear model are used
+
+    Returns:
+        List of ComponentModel objects
+    """
+    specs = estimator.brake_pad_specs
+    return [
+        ComponentModel(
+            "brake_pad", "mm",
+            estimator.MATERIAL_WEAR_RATES.get(specs.material, 0.12),
+            specs.initial_thickness_mm - specs.minimum_thickness_mm,
+            {name: 1.0 for name in FACTOR_ORDER}
+        ),
+        # Rotors wear alongside the pads but last several pad sets (1.8 mm new, 1.5 mm minimum)
+        ComponentModel(
+            "rotor", "mm", 0.012, 0.3,
+            {name: 1.0 for name in FACTOR_ORDER}
+        ),
+        # Chain elongation; grit from wet and muddy roads dominates, replace at 0.5%
+        ComponentModel(
+            "chain", "%", 0.12, 0.5,
+            {"weather_multiplier": 1.5, "terrain_multiplier": 0.5, "weight_factor": 1.0}
+        ),
+        # Cassette life in percent, roughly three chains
+        ComponentModel(
+            "cassette", "%", 7.0, 100.0,
+            {"weather_multiplier": 1.0, "terrain_multiplier": 0.5, "weight_factor": 1.0}
+        ),
+        # Rear tire tread depth
+        ComponentModel(
+            "tire", "mm", 0.25, 1.5,
+            {"terrain_multiplier": 1.0, "braking_factor": 0.5, "weight_factor": 1.0, "speed_factor": 0.5}
+        ),
+    ]
+
+
+class ComponentWearEngine:
+    """Estimates wear for all of a bike's components in one pass over its rides."""
+
+    def __init__(self, estimator: StravaBrakeWearEstimator,
+                 components: Optional[List[ComponentModel]] = None):
+        """
+        Initialize the engine.
+
+        Args:
+            estimator: Estimator that computes the shared ride factors
+            components: Component models (default: default_components(estimator))
+        """
+        self.estimator = estimator
+        self.components: Dict[str, ComponentModel] = {}
+        for component in components if components is not None else default_components(estimator):
+            self.register(component)
+
+    def register(self, component: ComponentModel):
+        """Add or replace a component model."""
+        self.components[component.name] = component
+
+    def estimate_for_table(self, table: RideTable, rider_weight_kg: float = 70.0,
+                           bike_weight_kg: float = 15.0,
+                           installed_epochs: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Estimate wear for every registered component over a table of rides.
+
+        Args:
+            table: RideTable of the bike's rides
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            installed_epochs: Component name -> install time; earlier rides do not count
+
+        Returns:
+            Dictionary with ride count, distance and a per-component summary
+        """
+        factors = self.estimator._table_factors(table, rider_weight_kg, bike_weight_kg)
+        installed_epochs = installed_epochs or {}
+
+        components = {}
+        for name, component in self.components.items():
+            ride_wear = component.ride_wear(factors)
+            miles = table.distance_miles
+            if name in installed_epochs:
+                since_install = table.start_epoch >= installed_epochs[name]
+                ride_wear = np.where(since_install, ride_wear, 0.0)
+                miles = np.where(since_install, miles, 0.0)
+            components[name] = self._summarize(component, ride_wear, float(miles.sum()))
+
+        return {
+            "ride_count": len(table),
+            "total_distance_miles": round(float(table.distance_miles.sum()), 1),
+            "components": components,
+        }
+
+    def _summarize(self, component: ComponentModel, ride_wear: np.ndarray,
+                   distance_miles: float) -> Dict[str, Any]:
+        """Turn per-ride wear into a JSON-ready component summary (ride_wear as a list)."""
+        total_wear = float(ride_wear.sum())
+        remaining_miles = 0.0
+        if total_wear > 0 and distance_miles > 0:
+            remaining_miles = max(0.0, component.wear_limit - total_wear) / (total_wear / distance_miles)
+
+        return {
+            "unit": component.unit,
+            "total_wear": round(total_wear, 4),
+            "wear_limit": component.wear_limit,
+            "wear_percentage": round(min(100.0, max(0.0, total_wear / component.wear_limit * 100)), 1),
+            "distance_miles": round(distance_miles, 1),
+            "remaining_miles": round(remaining_miles, 0),
+            "needs_replacement": total_wear >= component.wear_limit,
+            "ride_wear": ride_wear.tolist(),
+        }
+
+    def get_recent_component_wear(self, days_back: int = 30, rider_weight_kg: float = 70.0,
+                                  bike_weight_kg: float = 15.0) -> Dict[str, Any]:
+        """
+        Get component wear for recent rides from Strava.
+
+        Activities are fetched and weather-enriched once for all components.
+
+        Args:
+            days_back: Number of days to look back
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+
+        Returns:
+            Dictionary with a per-component summary
+        """
+        after_date = datetime.now() - timedelta(days=days_back)
+        activities = self.estimator.strava_api.get_activities(after=after_date, activity_type="Ride")
+        rides = self.estimator.process_strava_rides(activities)
+        return self.estimate_for_table(RideTable.from_rides(rides), rider_weight_kg, bike_weight_kg)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Fake Strava Webhook Sender
+
+Plays Strava's side of a webhook subscription against a local callback URL:
+the subscription validation handshake and activity/athlete event POSTs, with
+Strava's habit of retrying deliveries that do not get a 200 in time. Useful
+for tests and for trying the dashboard's /webhook endpoint without exposing
+it to the internet.
+
+Usage:
+    python fake_strava_events.py --verify-token TOKEN create 1234567890
+"""
+
+import argparse
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+DEFAULT_CALLBACK_URL = "http://localhost:5001/webhook"
+DELIVERY_TIMEOUT = 2.0  # Strava gives up on a delivery after two seconds
+
+
+def make_event(object_id: int, aspect_type: str = "create", object_type: str = "activity",
+               owner_id: int = 1, subscription_id: int = 1, updates: Optional[Dict[str, Any]] = None,
+               event_time: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build an event payload shaped like Strava's.
+
+    Args:
+        object_id: Activity ID (or athlete ID for athlete events)
+        aspect_type: "create", "update" or "delete"
+        object_type: "activity" or "athlete"
+        owner_id: Athlete who owns the object
+        subscription_id: Webhook subscription ID
+        updates: Changed fields for updates (e.g. {"title": "New name"})
+        event_time: Unix time of the event (default: now)
+
+    Returns:
+        Event JSON
+    """
+    return {
+        "object_type": object_type,
+        "object_id": object_id,
+        "aspect_type": aspect_type,
+        "owner_id": owner_id,
+        "subscription_id": subscription_id,
+        "event_time": int(time.time()) if event_time is None else event_time,
+        "updates": updates or {}
+    }
+
+
+class FakeStravaEventSender:
+    """Sends Strava-style webhook requests to a callback URL."""
+
+    def __init__(self, callback_url: str = DEFAULT_CALLBACK_URL, verify_token: str = "",
+                 owner_id: int = 1, subscription_id: int = 1, session: Optional[requests.Session] = None):
+        """
+        Initialize the sender.
+
+        Args:
+            callback_url: Webhook endpoint to call
+            verify_token: Token the endpoint expects in the handshake
+            owner_id: Athlete ID put on events
+            subscription_id: Subscription ID put on events
+            session: HTTP session (default: a new one)
+        """
+        self.callback_url = callback_url
+        self.verify_token = verify_token
+        self.owner_id = owner_id
+        self.subscription_id = subscription_id
+        self.session = session or requests.Session()
+
+    def validate(self) -> bool:
+        """Run the subscription handshake; True if the endpoint echoed the challenge."""
+        challenge = secrets.token_hex(8)
+        response = self.session.get(self.callback_url, params={
+            "hub.mode": "subscribe",
+            "hub.verify_token": self.verify_token,
+            "hub.challenge": challenge
+        }, timeout=DELIVERY_TIMEOUT)
+        return response.status_code == 200 and response.json().get("hub.challenge") == challenge
+
+    def send(self, event: Dict[str, Any], attempts: int = 3) -> Optional[requests.Response]:
+        """
+        Deliver an event, retrying like Strava when the endpoint fails or is slow.
+
+        Returns:
+            The last response (None if every attempt timed out or could not connect)
+        """
+        response = None
+        for _ in range(attempts):
+            try:
+                response = self.session.post(self.callback_url, json=event, timeout=DELIVERY_TIMEOUT)
+            except requests.RequestException:
+                response = None
+                continue
+            if response.status_code == 200:
+                break
+        return response
+
+    def activity_created(self, activity_id: int, **kwargs) -> Optional[requests.Response]:
+        """Announce a new activity."""
+        return self.send(self._event(activity_id, "create", **kwargs))
+
+    def activity_updated(self, activity_id: int, updates: Dict[str, Any], **kwargs) -> Optional[requests.Response]:
+        """Announce changed activity fields (title, type, private)."""
+        return self.send(self._event(activity_id, "update", updates=updates, **kwargs))
+
+    def activity_deleted(self, activity_id: int, **kwargs) -> Optional[requests.Response]:
+        """Announce a deleted activity."""
+        return self.send(self._event(activity_id, "delete", **kwargs))
+
+    def athlete_deauthorized(self, **kwargs) -> Optional[requests.Response]:
+        """Announce that the athlete revoked the app's access."""
+        return self.send(self._event(self.owner_id, "update", object_type="athlete",
+                                     updates={"authorized": "false"}, **kwargs))
+
+    def _event(self, object_id: int, aspect_type: str, **kwargs) -> Dict[str, Any]:
+        kwargs.setdefault("owner_id", self.owner_id)
+        kwargs.setdefault("subscription_id", self.subscription_id)
+        return make_event(object_id, aspect_type, **kwargs)
+
+
+def main():
+    """Send one fake event from the command line."""
+    parser = argparse.ArgumentParser(description="Send fake Strava webhook events to a local endpoint")
+    parser.add_argument("aspect", choices=["validate", "create", "update", "delete", "deauthorize"])
+    parser.add_argument("object_id", type=int, nargs="?", default=0, help="Activity ID")
+    parser.add_argument("--url", default=DEFAULT_CALLBACK_URL, help="Webhook callback URL")
+    parser.add_argument("--verify-token", default="", help="Token expected by the handshake")
+    parser.add_argument("--owner-id", type=int, default=1, help="Athlete ID")
+    parser.add_argument("--subscription-id", type=int, default=1, help="Subscription ID")
+    parser.add_argument("--title", help="New title for update events")
+    args = parser.parse_args()
+
+    sender = FakeStravaEventSender(args.url, args.verify_token, args.owner_id, args.subscription_id)
+    if args.aspect == "validate":
+        print("✅ Handshake succeeded" if sender.validate() else "❌ Handshake failed")
+        return
+
+    if args.aspect == "create":
+        response = sender.activity_created(args.object_id)
+    elif args.aspect == "update":
+        response = sender.activity_updated(args.object_id, {"title": args.title} if args.title else {})
+    elif args.aspect == "delete":
+        response = sender.activity_deleted(args.object_id)
+    else:
+        response = sender.athlete_deauthorized()
+
+    if response is None:
+        print("❌ No response from the endpoint")
+    else:
+        print(f"{'✅' if response.status_code == 200 else '❌'} {response.status_code} {response.text.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Track Geometry
+
+Small helpers for measuring GPS tracks in metres, shared by stream storage
+(track simplification and path error) and traffic comparison (bike/car route
+overlap). Tracks are projected onto a local flat plane, which is accurate to
+well under a metre over a ride-sized area. Gaps in sampled tracks are filled
+the same way by the stream store and the track cache.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+
+def project_to_metres(latlng: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project coordinates onto a local flat plane in metres.
+
+    Uses an equirectangular projection around the track's mean latitude.
+
+    Args:
+        latlng: (n, 2) array of latitude/longitude degrees
+
+    Returns:
+        x and y arrays in metres
+    """
+    lat = np.radians(latlng[:, 0])
+    lng = np.radians(latlng[:, 1])
+    x = EARTH_RADIUS_M * (lng - lng.mean()) * np.cos(lat.mean())
+    y = EARTH_RADIUS_M * (lat - lat.mean())
+    return x, y
+
+
+def segment_distance(px: np.ndarray, py: np.ndarray, ax, ay, bx, by) -> np.ndarray:
+    """Distance from points to line segments a-b (broadcast over arrays)."""
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.where(length_sq > 0, ((px - ax) * dx + (py - ay) * dy) / length_sq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def fill_gaps(values: np.ndarray) -> np.ndarray:
+    """
+    Linearly interpolate NaN samples from their neighbours.
+
+    A 2-D array (e.g. latlng) is filled column by column. A column that is
+    entirely NaN is returned unchanged.
+
+    Args:
+        values: Samples in track order
+
+    Returns:
+        Array without partial gaps (the input itself when nothing was filled)
+    """
+    missing = np.isnan(values)
+    if not missing.any():
+        return values
+    if values.ndim > 1:
+        return np.column_stack([fill_gaps(column) for column in values.T])
+    if missing.all():
+        return values
+    values = values.copy()
+    values[missing] = np.interp(np.flatnonzero(missing), np.flatnonzero(~missing), values[~missing])
+    return values
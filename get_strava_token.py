@@ -6,7 +6,7 @@ This script helps you get your Strava access token for the brake wear estimator.
 """
 
 import webbrowser
-import requests
+from http_session import get_session
 import json
 
 def get_strava_token():
@@ -58,7 +58,7 @@ def get_strava_token():
     }
     
     try:
-        response = requests.post(url, data=data)
+        response = get_session().post(url, data=data)
         if response.status_code == 200:
             token_data = response.json()
             access_token = token_data["access_token"]
@@ -118,7 +118,7 @@ def test_connection():
         headers = {"Authorization": f"Bearer {STRAVA_ACCESS_TOKEN}"}
         url = "https://www.strava.com/api/v3/athlete"
         
-        response = requests.get(url, headers=headers)
+        response = get_session().get(url, headers=headers)
         
         if response.status_code == 200:
             athlete_data = response.json()
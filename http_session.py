@@ -0,0 +1,143 @@
+"""
+Shared HTTP Session
+
+All API clients (Strava, OpenWeatherMap, Google Maps, the dashboard) send
+their requests through one pooled `requests.Session`, so connections are
+kept alive and reused instead of paying a TCP and TLS handshake per call.
+
+Each API host gets its own connection pool with a size limit; when every
+connection to a host is busy, further requests wait for one to free up rather
+than opening more. Requests without an explicit timeout get DEFAULT_TIMEOUT,
+and failed connection attempts (which never reached the server) are retried
+a couple of times. Requests to Strava and Google Maps wait for their host's
+rate limiter (see rate_limiter.py), which learns from every response; HTTP
+error statuses are left to the callers. A thread can cap that wait with
+`set_max_rate_limit_wait` (the dashboard does, so its request threads fail
+fast instead of blocking until a quota window resets).
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import RateLimiter, default_rate_limiters
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT: Tuple[float, float] = (3.05, 30.0)
+
+# Maximum open connections per API host
+HOST_POOL_SIZES: Dict[str, int] = {
+    "https://www.strava.com/": 8,
+    "https://api.openweathermap.org/": 16,  # Weather lookups run on a thread pool
+    "https://maps.googleapis.com/": 8,
+}
+DEFAULT_POOL_SIZE = 4
+
+CONNECT_RETRIES = 2
+
+_thread_limits = threading.local()
+
+
+def set_max_rate_limit_wait(seconds: Optional[float]) -> Optional[float]:
+    """
+    Cap how long this thread's requests wait for a rate limiter.
+
+    Args:
+        seconds: Longest wait; requests that would wait longer raise
+            RateLimitExceeded (None waits as long as needed)
+
+    Returns:
+        The previous cap
+    """
+    previous = getattr(_thread_limits, "max_wait", None)
+    _thread_limits.max_wait = seconds
+    return previous
+
+
+@contextmanager
+def max_rate_limit_wait(seconds: Optional[float]) -> Iterator[None]:
+    """Cap rate limiter waits for requests made inside the block on this thread."""
+    previous = set_max_rate_limit_wait(seconds)
+    try:
+        yield
+    finally:
+        set_max_rate_limit_wait(previous)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout and an optional rate limiter."""
+
+    def __init__(self, *args, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 rate_limiter: Optional[RateLimiter] = None, **kwargs):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.rate_limiter is None:
+            return super().send(request, **kwargs)
+        self.rate_limiter.acquire(getattr(_thread_limits, "max_wait", None))
+        response = super().send(request, **kwargs)
+        self.rate_limiter.observe(response)
+        return response
+
+
+def create_session(timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                   host_pool_sizes: Optional[Dict[str, int]] = None,
+                   default_pool_size: int = DEFAULT_POOL_SIZE,
+                   rate_limiters: Optional[Dict[str, RateLimiter]] = None) -> requests.Session:
+    """
+    Create a pooled session.
+
+    Args:
+        timeout: Default (connect, read) timeout in seconds
+        host_pool_sizes: URL prefix -> maximum connections (default: HOST_POOL_SIZES)
+        default_pool_size: Maximum connections per host for other hosts
+        rate_limiters: URL prefix -> rate limiter (default: new Strava and Google Maps limiters)
+
+    Returns:
+        Configured requests.Session
+    """
+    # Only connection failures are retried; the request never reached the server, so any method is safe
+    retries = Retry(total=CONNECT_RETRIES, connect=CONNECT_RETRIES, read=False, status=False,
+                    backoff_factor=0.2, allowed_methods=None)
+
+    if rate_limiters is None:
+        rate_limiters = default_rate_limiters()
+
+    def adapter(pool_size: int, hosts: int, rate_limiter: Optional[RateLimiter] = None) -> TimeoutHTTPAdapter:
+        return TimeoutHTTPAdapter(timeout=timeout, rate_limiter=rate_limiter, pool_connections=hosts,
+                                  pool_maxsize=pool_size, pool_block=True, max_retries=retries)
+
+    session = requests.Session()
+    session.mount("http://", adapter(default_pool_size, 10))
+    session.mount("https://", adapter(default_pool_size, 10))
+    host_pool_sizes = host_pool_sizes or HOST_POOL_SIZES
+    for prefix in set(host_pool_sizes) | set(rate_limiters):
+        session.mount(prefix, adapter(host_pool_sizes.get(prefix, default_pool_size), 1, rate_limiters.get(prefix)))
+    return session
+
+
+def get_rate_limiter(session: requests.Session, url: str) -> Optional[RateLimiter]:
+    """The rate limiter applied to requests for this URL, if any."""
+    return getattr(session.get_adapter(url), "rate_limiter", None)
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The process-wide shared session (created on first use)."""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = create_session()
+    return _shared_session
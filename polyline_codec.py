@@ -0,0 +1,130 @@
+"""
+Encoded Polyline Codec
+
+Strava activities (`map.summary_polyline`, `map.polyline`) and Google
+Directions routes (`overview_polyline.points`) describe paths in Google's
+encoded polyline format: each coordinate delta is zigzag-encoded and written
+as 5-bit chunks, 63 added to make printable ASCII.
+
+`decode_polylines` decodes a whole batch at once with NumPy: every byte of
+every polyline is processed in a handful of array operations, and the result
+is one flat (n, 2) coordinate array plus offsets marking where each polyline
+starts (polyline i is `coords[offsets[i]:offsets[i + 1]]`).
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+PRECISION = 5  # Decimal places used by Google and Strava
+
+# A 32-bit delta never needs more than 7 five-bit chunks
+MAX_CHUNKS = 7
+
+
+def decode_polylines(polylines: Sequence[Union[str, bytes]],
+                     precision: int = PRECISION) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode many encoded polylines into one coordinate array.
+
+    Args:
+        polylines: Encoded polylines (empty strings give empty paths)
+        precision: Decimal places of the encoding
+
+    Returns:
+        (coords, offsets): an (n, 2) float array of latitude/longitude and an
+        int64 array of len(polylines) + 1 offsets into it
+
+    Raises:
+        ValueError: If a polyline is truncated or malformed
+    """
+    encoded = [p.encode("ascii") if isinstance(p, str) else bytes(p) for p in polylines]
+    lengths = np.fromiter((len(p) for p in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8) - np.uint8(63)
+    if data.size == 0:
+        return np.zeros((0, 2)), np.zeros(len(encoded) + 1, dtype=np.int64)
+    if data.max() > 63:  # Characters below 63 wrap around to large values
+        raise ValueError("Polyline contains characters outside the encoding range")
+
+    # A chunk without the 0x20 continuation bit ends a value
+    value_ends = np.flatnonzero(data < 0x20)
+    string_ends = np.cumsum(lengths)
+    if len(value_ends) == 0 or value_ends[-1] != data.size - 1:
+        raise ValueError("Polyline is truncated")
+    value_starts = np.empty_like(value_ends)
+    value_starts[0] = 0
+    value_starts[1:] = value_ends[:-1] + 1
+    value_lengths = value_ends - value_starts + 1
+    if value_lengths.max() > MAX_CHUNKS:
+        raise ValueError("Polyline value is too long")
+
+    # Assemble values chunk by chunk; only the few long values take the later passes
+    chunks = (data & 0x1f).astype(np.int64)
+    values = chunks[value_starts]
+    for k in range(1, int(value_lengths.max())):
+        longer = np.flatnonzero(value_lengths > k)
+        values[longer] |= chunks[value_starts[longer] + k] << (5 * k)
+    deltas = (values >> 1) ^ -(values & 1)
+
+    # Values per polyline: value ends up to each string end; each string must end a value
+    values_through = np.searchsorted(value_ends, string_ends - 1, side="right")
+    nonempty = lengths > 0
+    if (value_ends[np.maximum(values_through - 1, 0)] != string_ends - 1)[nonempty].any():
+        raise ValueError("Polyline is truncated")
+    value_counts = np.diff(values_through, prepend=0)
+    if (value_counts % 2).any():
+        raise ValueError("Polyline has an unpaired coordinate")
+    offsets = np.concatenate([[0], np.cumsum(value_counts // 2)])
+
+    # Running sums restart at each polyline: subtract the total reached before it
+    coords = np.cumsum(deltas.reshape(-1, 2), axis=0)
+    point_counts = np.diff(offsets)
+    previous_end = np.where(offsets[:-1] > 0, offsets[:-1] - 1, 0)
+    base = np.where((offsets[:-1] > 0)[:, None], coords[previous_end], 0)
+    coords = coords - np.repeat(base, point_counts, axis=0)
+    return coords / 10.0 ** precision, offsets
+
+
+def decode_polyline(polyline: Union[str, bytes], precision: int = PRECISION) -> np.ndarray:
+    """
+    Decode one encoded polyline.
+
+    Args:
+        polyline: Encoded polyline
+        precision: Decimal places of the encoding
+
+    Returns:
+        (n, 2) array of latitude/longitude
+    """
+    return decode_polylines([polyline], precision)[0]
+
+
+def split_polylines(coords: np.ndarray, offsets: np.ndarray) -> List[np.ndarray]:
+    """Split decode_polylines output into one array per polyline (views, no copies)."""
+    return [coords[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def encode_polyline(latlng, precision: int = PRECISION) -> str:
+    """
+    Encode coordinates as a polyline.
+
+    Args:
+        latlng: Sequence or (n, 2) array of latitude/longitude
+        precision: Decimal places of the encoding
+
+    Returns:
+        Encoded polyline
+    """
+    latlng = np.asarray(latlng, dtype=float).reshape(-1, 2)
+    # Halves round up, like Math.round in Google's reference encoder
+    fixed = np.floor(latlng * 10.0 ** precision + 0.5).astype(np.int64)
+    deltas = np.diff(fixed, axis=0, prepend=0).ravel()
+    values = (deltas << 1) ^ (deltas >> 63)
+
+    chars = []
+    for value in values.tolist():
+        while value >= 0x20:
+            chars.append(chr((0x20 | (value & 0x1f)) + 63))
+            value >>= 5
+        chars.append(chr(value + 63))
+    return "".join(chars)
@@ -0,0 +1,358 @@
+"""
+API Rate Limiting
+
+Every request through the shared HTTP session first takes a token from the
+rate limiter of its host, so loops over many activities no longer need fixed
+`time.sleep` calls between requests: they run as fast as the quota allows.
+
+Strava reports its fixed windows (15 minutes, resetting on the quarter hour,
+and one UTC day) in the X-RateLimit-Limit/X-RateLimit-Usage headers, plus the
+tighter X-ReadRateLimit-* pair for read requests. `StravaRateLimiter` spreads
+whatever is left of the 15-minute window over the time until it resets, with a
+burst allowance so short jobs run at full speed, and pauses until the reset when
+either window is used up.
+
+Google's Directions API has a per-second quota and answers OVER_QUERY_LIMIT
+(or HTTP 429) when it is exceeded. `AdaptiveRateLimiter` halves its rate and
+backs off exponentially when throttled, then creeps back up on each success;
+`GoogleMapsRateLimiter` also reads the OVER_QUERY_LIMIT status, which Google
+sends with HTTP 200.
+
+Background jobs simply wait for their turn. Interactive callers (the
+dashboard's request threads) pass a `max_wait` instead and get
+`RateLimitExceeded` straight away when the wait would be longer.
+"""
+
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional, Sequence
+
+# Strava windows: (length in seconds, default limit)
+STRAVA_WINDOWS = ((900, 200), (86400, 2000))
+STRAVA_HEADER_PAIRS = (
+    ("X-RateLimit-Limit", "X-RateLimit-Usage"),
+    ("X-ReadRateLimit-Limit", "X-ReadRateLimit-Usage"),
+)
+
+MIN_RATE = 1e-3  # Calls per second; keeps the bucket refilling
+
+
+class RateLimitExceeded(Exception):
+    """A request would have to wait longer than the caller allows."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited; retry in {retry_after:.0f} s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Thread-safe token bucket where callers reserve a token and sleep for the returned wait."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bucket (full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (the burst size)
+            clock: Time source in seconds
+        """
+        self.rate = max(rate, MIN_RATE)
+        self.capacity = max(capacity, 1.0)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1.0, max_wait: Optional[float] = None) -> float:
+        """
+        Take tokens, going into debt if needed.
+
+        Args:
+            tokens: Tokens to take
+            max_wait: Take nothing if the wait would exceed this many seconds
+
+        Returns:
+            Seconds the caller must wait before making its call (more than
+            max_wait means no tokens were taken)
+        """
+        with self.lock:
+            now = self.clock()
+            if now < self.blocked_until:
+                # Paused (quota spent or throttled): resume when the pause ends
+                return self.blocked_until - now
+            self._refill(now)
+            wait = max(0.0, (tokens - self.tokens) / self.rate)
+            if max_wait is None or wait <= max_wait:
+                self.tokens -= tokens
+            return wait
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None):
+        """Change the refill rate (and optionally the burst size) from now on."""
+        with self.lock:
+            self._refill(self.clock())
+            self.rate = max(rate, MIN_RATE)
+            if capacity is not None:
+                self.capacity = max(capacity, 1.0)
+                self.tokens = min(self.tokens, self.capacity)
+
+    def fill(self):
+        """Top the bucket up to its capacity."""
+        with self.lock:
+            self.tokens = self.capacity
+            self.updated = self.clock()
+
+    def block_until(self, until: float):
+        """Make every reservation wait until this clock time."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, until)
+
+
+def retry_after_seconds(response) -> Optional[float]:
+    """Seconds from a Retry-After header (None if absent or an HTTP date)."""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter(ABC):
+    """Base class: a token bucket plus hooks for the HTTP adapter."""
+
+    def __init__(self, bucket: TokenBucket, sleep: Callable[[float], None] = time.sleep):
+        self.bucket = bucket
+        self.sleep = sleep
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        """
+        Wait until a request may be sent.
+
+        Args:
+            max_wait: Longest acceptable wait in seconds (None waits as long as needed)
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        wait = self.bucket.reserve(max_wait=max_wait)
+        if max_wait is not None and wait > max_wait:
+            raise RateLimitExceeded(wait)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def observe(self, response):
+        """Learn from a response (quota headers, throttling)."""
+        if response.status_code == 429:
+            self.throttled(retry_after_seconds(response))
+
+    @abstractmethod
+    def throttled(self, retry_after: Optional[float] = None):
+        """Back off after the server refused a request for exceeding its quota."""
+
+
+class StravaRateLimiter(RateLimiter):
+    """Paces Strava calls from the quota reported in its response headers."""
+
+    def __init__(self, limits: Sequence[int] = tuple(limit for _, limit in STRAVA_WINDOWS),
+                 reserve_fraction: float = 0.05, burst_fraction: float = 0.25,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the limiter.
+
+        Args:
+            limits: Requests allowed per 15-minute window and per day until headers say otherwise
+            reserve_fraction: Share of each window left unused (for the dashboard and other clients)
+            burst_fraction: Share of the remaining 15-minute quota that may be spent at once
+            clock: Wall-clock time source (windows are aligned to wall-clock time)
+            sleep: Sleep function
+        """
+        self.windows = [length for length, _ in STRAVA_WINDOWS]
+        self.limits: List[int] = list(limits)
+        self.usage: List[int] = [0] * len(self.windows)
+        self.reserve_fraction = reserve_fraction
+        self.burst_fraction = burst_fraction
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.current_windows = [int(clock() // length) for length in self.windows]
+        super().__init__(TokenBucket(1.0, 1.0, clock), sleep)
+        self._update_rate(clock())
+        self.bucket.fill()
+
+    def window_reset(self, index: int, now: float) -> float:
+        """Clock time at which window `index` next resets."""
+        length = self.windows[index]
+        return (now // length + 1) * length
+
+    def remaining(self, index: int) -> float:
+        """Requests left in a window, after the reserve."""
+        return self.limits[index] * (1 - self.reserve_fraction) - self.usage[index]
+
+    def _roll_windows(self, now: float) -> bool:
+        """Start new windows whose reset has passed; True if the 15-minute window did."""
+        rolled = []
+        for i, length in enumerate(self.windows):
+            window = int(now // length)
+            rolled.append(window != self.current_windows[i])
+            if rolled[i]:
+                self.current_windows[i] = window
+                self.usage[i] = 0
+        return rolled[0]
+
+    def _update_rate(self, now: float):
+        # Spread the 15-minute remainder over the time left; stop when any window is spent
+        remaining = self.remaining(0)
+        seconds_left = max(self.window_reset(0, now) - now, 1.0)
+        self.bucket.set_rate(remaining / seconds_left, remaining * self.burst_fraction)
+        for i in range(len(self.windows)):
+            if self.remaining(i) < 0:
+                self.bucket.block_until(self.window_reset(i, now))
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        with self.lock:
+            now = self.clock()
+            rolled = self._roll_windows(now)
+            self.usage = [used + 1 for used in self.usage]  # Counted locally until headers arrive
+            self._update_rate(now)
+            if rolled:
+                self.bucket.fill()
+        try:
+            return super().acquire(max_wait)
+        except RateLimitExceeded:
+            # The request is not sent, so it does not count against the quota
+            with self.lock:
+                self.usage = [max(0, used - 1) for used in self.usage]
+                self._update_rate(self.clock())
+            raise
+
+    def observe(self, response):
+        limits, usage = self._parse_headers(response.headers)
+        if limits:
+            with self.lock:
+                now = self.clock()
+                if self._roll_windows(now):
+                    self.bucket.fill()
+                self.limits = limits
+                # Responses can arrive out of order; usage within a window only grows
+                self.usage = [max(local, reported) for local, reported in zip(self.usage, usage)]
+                self._update_rate(now)
+        super().observe(response)
+
+    def throttled(self, retry_after: Optional[float] = None):
+        with self.lock:
+            now = self.clock()
+            if retry_after is not None:
+                self.bucket.block_until(now + retry_after)
+            else:
+                # Treat the 15-minute window as spent (it may be shared with other clients)
+                self.usage[0] = max(self.usage[0], self.limits[0])
+                self.bucket.block_until(self.window_reset(0, now))
+
+    def _parse_headers(self, headers):
+        """Per window, the (limit, usage) with the least left over both header pairs, or (None, None)."""
+        pairs = []
+        for limit_header, usage_header in STRAVA_HEADER_PAIRS:
+            try:
+                limits = [int(v) for v in headers[limit_header].split(",")]
+                usage = [int(v) for v in headers[usage_header].split(",")]
+            except (KeyError, ValueError):
+                continue
+            if len(limits) == len(usage) == len(self.windows):
+                pairs.append((limits, usage))
+        if not pairs:
+            return None, None
+
+        limits, usage = [], []
+        for i in range(len(self.windows)):
+            limit, used = min(((l[i], u[i]) for l, u in pairs), key=lambda pair: pair[0] - pair[1])
+            limits.append(limit)
+            usage.append(used)
+        return limits, usage
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Rate limiter for quotas without headers: halves its rate when throttled, recovers on success."""
+
+    def __init__(self, max_rate: float, min_rate: float = 0.5, recovery_step: float = 0.1,
+                 base_backoff: float = 1.0, max_backoff: float = 64.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_rate: Highest calls per second (the published quota)
+            min_rate: Lowest calls per second after repeated throttling
+            recovery_step: Calls per second added back after each successful call
+            base_backoff: First pause in seconds after being throttled
+            max_backoff: Longest pause in seconds
+            clock: Time source
+            sleep: Sleep function
+        """
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.recovery_step = recovery_step
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.rate = max_rate
+        self.consecutive_throttles = 0
+        self.lock = threading.Lock()
+        super().__init__(TokenBucket(max_rate, max_rate, clock), sleep)
+
+    def observe(self, response):
+        if response.status_code == 429:
+            self.throttled(retry_after_seconds(response))
+        elif response.status_code < 400:
+            self.succeeded()
+
+    def succeeded(self):
+        """Record a call that was not throttled."""
+        with self.lock:
+            self.consecutive_throttles = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.recovery_step)
+                self.bucket.set_rate(self.rate)
+
+    def throttled(self, retry_after: Optional[float] = None):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.bucket.set_rate(self.rate)
+            if retry_after is None:
+                # Exponential backoff with jitter so parallel callers spread out
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** self.consecutive_throttles)
+                retry_after = backoff * random.uniform(0.5, 1.0)
+            self.consecutive_throttles += 1
+            self.bucket.block_until(self.clock() + retry_after)
+
+
+class GoogleMapsRateLimiter(AdaptiveRateLimiter):
+    """Adaptive limiter that also treats Google's OVER_QUERY_LIMIT status as throttling."""
+
+    def observe(self, response):
+        if response.status_code == 200 and "json" in response.headers.get("Content-Type", ""):
+            try:
+                status = response.json().get("status")
+            except ValueError:
+                status = None
+            if status == "OVER_QUERY_LIMIT":
+                self.throttled()
+                return
+        super().observe(response)
+
+
+def default_rate_limiters():
+    """Fresh limiters for the API hosts, keyed by URL prefix."""
+    return {
+        "https://www.strava.com/": StravaRateLimiter(),
+        "https://maps.googleapis.com/": GoogleMapsRateLimiter(max_rate=10.0),
+    }
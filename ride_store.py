@@ -0,0 +1,379 @@
+"""
+Local Ride Store
+
+Keeps Strava activity summaries and their sample streams in SQLite so rides
+can be analysed without calling the Strava API. Summaries are stored and
+returned in the same shape as the API's activity JSON, and `StoredStravaAPI`
+serves them through the `StravaAPI` interface, so the estimators and
+`StravaMonitor` work from the store unchanged (e.g. offline, or after a bulk
+export backfill).
+"""
+
+import io
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from braking_events import STREAM_KEYS
+from strava_brake_wear_estimator import StravaAPI
+from stream_storage import DEFAULT_TOLERANCE_M, MAGIC as STREAM_MAGIC, decode_streams, encode_streams
+
+# Streams kept in the simplified map track
+TRACK_STREAMS = ("latlng", "distance", "altitude")
+
+# Summary fields kept per activity, as named in Strava's activity JSON
+SUMMARY_FIELDS = (
+    "name",
+    "type",
+    "start_date",
+    "distance",
+    "moving_time",
+    "elapsed_time",
+    "total_elevation_gain",
+    "average_speed",
+    "max_speed",
+    "gear_id",
+    "gear_name",  # Only known for exported rides, whose gear is named rather than identified
+)
+
+
+def _start_epoch(start_date: str) -> int:
+    """Epoch seconds of a Strava ISO start date."""
+    return int(datetime.fromisoformat(start_date.replace("Z", "+00:00")).timestamp())
+
+
+def _unpack_legacy_streams(blob: bytes) -> Dict[str, np.ndarray]:
+    """Read streams stored as a compressed .npz before stream_storage existed."""
+    with np.load(io.BytesIO(blob)) as data:
+        return {key: data[key] for key in data.files}
+
+
+class RideStore:
+    """SQLite store of activity summaries and streams."""
+
+    def __init__(self, db_path: str = "traffic_comparisons.db",
+                 track_tolerance_m: Optional[float] = DEFAULT_TOLERANCE_M):
+        """
+        Initialize the store.
+
+        Streams are stored at full resolution, since braking and terrain
+        analysis need every sample. A separate simplified copy of the track
+        (latlng, distance, altitude) is kept for map rendering.
+
+        Args:
+            db_path: Path to SQLite database (shared with StravaMonitor by default)
+            track_tolerance_m: Simplification tolerance for the map track (None keeps every point)
+        """
+        self.db_path = db_path
+        self.track_tolerance_m = track_tolerance_m
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up SQLite tables for ride summaries and streams."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ride_summaries (
+                activity_id INTEGER PRIMARY KEY,
+                athlete_id INTEGER,
+                name TEXT,
+                type TEXT,
+                start_date TEXT,
+                start_epoch INTEGER,
+                distance REAL,
+                moving_time INTEGER,
+                elapsed_time INTEGER,
+                total_elevation_gain REAL,
+                average_speed REAL,
+                max_speed REAL,
+                gear_id TEXT,
+                gear_name TEXT,
+                start_lat REAL,
+                start_lng REAL,
+                end_lat REAL,
+                end_lng REAL,
+                source TEXT,
+                stored_at TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_ride_summaries_start
+            ON ride_summaries (athlete_id, start_epoch)
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ride_streams (
+                activity_id INTEGER PRIMARY KEY,
+                sample_count INTEGER,
+                streams BLOB,
+                stored_points INTEGER,
+                raw_bytes INTEGER,
+                max_error_m REAL,
+                track BLOB
+            )
+        ''')
+
+        # Stores created before gear names were kept lack the column
+        cursor.execute('PRAGMA table_info(ride_summaries)')
+        if "gear_name" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE ride_summaries ADD COLUMN gear_name TEXT')
+
+        # Stores created before compressed streams lack the compression and track columns
+        cursor.execute('PRAGMA table_info(ride_streams)')
+        existing = [row[1] for row in cursor.fetchall()]
+        for column, column_type in (("stored_points", "INTEGER"), ("raw_bytes", "INTEGER"),
+                                    ("max_error_m", "REAL"), ("track", "BLOB")):
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE ride_streams ADD COLUMN {column} {column_type}')
+
+        conn.commit()
+        conn.close()
+
+    def save_activities(self, activities: Iterable[Dict[str, Any]], athlete_id: Optional[int] = None,
+                        source: str = "api") -> int:
+        """
+        Store activity summaries, replacing any with the same ID.
+
+        Args:
+            activities: Activity dicts in Strava API shape
+            athlete_id: Owner of the activities (default: activity["athlete"]["id"] if present)
+            source: Where the activities came from, e.g. "api" or "export"
+
+        Returns:
+            Number of activities stored
+        """
+        stored_at = datetime.now().isoformat()
+        rows = []
+        for activity in activities:
+            start = activity.get("start_latlng") or (None, None)
+            end = activity.get("end_latlng") or (None, None)
+            owner = athlete_id if athlete_id is not None else (activity.get("athlete") or {}).get("id")
+            rows.append((
+                activity["id"], owner,
+                *(activity.get(name) for name in SUMMARY_FIELDS[:3]),
+                _start_epoch(activity["start_date"]),
+                *(activity.get(name) for name in SUMMARY_FIELDS[3:]),
+                start[0], start[1], end[0], end[1], source, stored_at
+            ))
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO ride_summaries
+            (activity_id, athlete_id, name, type, start_date, start_epoch, distance, moving_time,
+             elapsed_time, total_elevation_gain, average_speed, max_speed, gear_id, gear_name,
+             start_lat, start_lng, end_lat, end_lng, source, stored_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def save_streams(self, activity_id: int, streams: Dict[str, np.ndarray]):
+        """
+        Store sample streams for an activity, compressed, plus its simplified map track.
+
+        Args:
+            activity_id: Strava activity ID
+            streams: Stream type -> array, all of the same length
+        """
+        self.save_streams_many([(activity_id, streams)])
+
+    def save_streams_many(self, items: Iterable[Tuple[int, Dict[str, np.ndarray]]]) -> int:
+        """
+        Store streams for many activities in one transaction.
+
+        Args:
+            items: (activity_id, streams) pairs
+
+        Returns:
+            Number of activities stored
+        """
+        rows = []
+        for activity_id, streams in items:
+            encoded = encode_streams(streams, None)
+            track = None
+            if "latlng" in streams:
+                track = encode_streams(
+                    {key: streams[key] for key in TRACK_STREAMS if key in streams}, self.track_tolerance_m
+                )
+            rows.append((
+                activity_id, encoded.source_points, encoded.blob,
+                track.stored_points if track else None, encoded.raw_bytes,
+                track.max_error_m if track else None, track.blob if track else None
+            ))
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO ride_streams
+            (activity_id, sample_count, streams, stored_points, raw_bytes, max_error_m, track)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.commit()
+        conn.close()
+        return len(rows)
+
+    def get_activities(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                       activity_type: Optional[str] = "Ride",
+                       athlete_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get stored activities in Strava API shape, oldest first.
+
+        Args:
+            after: Only activities starting after this time
+            before: Only activities starting before this time
+            activity_type: Only this type (None for all)
+            athlete_id: Only this athlete's activities (None for all)
+
+        Returns:
+            List of activity dicts
+        """
+        query = 'SELECT * FROM ride_summaries WHERE 1 = 1'
+        params: List[Any] = []
+        if after:
+            query += ' AND start_epoch > ?'
+            params.append(int(after.timestamp()))
+        if before:
+            query += ' AND start_epoch < ?'
+            params.append(int(before.timestamp()))
+        if activity_type:
+            query += ' AND type = ?'
+            params.append(activity_type)
+        if athlete_id is not None:
+            query += ' AND athlete_id = ?'
+            params.append(athlete_id)
+
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(query + ' ORDER BY start_epoch, activity_id', params)
+        rows = cursor.fetchall()
+        conn.close()
+        return [self._row_to_activity(row) for row in rows]
+
+    def get_activity(self, activity_id: int) -> Optional[Dict[str, Any]]:
+        """Get one stored activity in Strava API shape, or None."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM ride_summaries WHERE activity_id = ?', (activity_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._row_to_activity(row) if row else None
+
+    def get_streams(self, activity_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """Get stored stream arrays for an activity, or None."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT streams FROM ride_streams WHERE activity_id = ?', (activity_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return self._decode(row[0]) if row else None
+
+    def get_track(self, activity_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Get the simplified track of an activity for map and elevation rendering.
+
+        Returns:
+            latlng, distance and altitude arrays (the full streams for rides
+            stored before tracks were kept separately), or None
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT track, streams FROM ride_streams WHERE activity_id = ?', (activity_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row:
+            return None
+        return self._decode(row[0] if row[0] is not None else row[1])
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict[str, np.ndarray]:
+        """Decode a stored streams blob, in either format."""
+        return decode_streams(blob) if blob[:len(STREAM_MAGIC)] == STREAM_MAGIC else _unpack_legacy_streams(blob)
+
+    def get_stream_storage_stats(self) -> Dict[str, Any]:
+        """
+        Summarize how much stream storage compression saves.
+
+        Returns:
+            Dictionary with ride count, point and byte totals, the compression
+            ratio of the full streams, and the map tracks' point count, size
+            and worst path error
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*), SUM(sample_count), SUM(raw_bytes), SUM(LENGTH(streams)),
+                   SUM(stored_points), SUM(LENGTH(track)), MAX(max_error_m)
+            FROM ride_streams WHERE raw_bytes IS NOT NULL
+        ''')
+        rides, source_points, raw_bytes, stored_bytes, track_points, track_bytes, max_error = cursor.fetchone()
+        conn.close()
+        return {
+            "rides": rides,
+            "source_points": source_points or 0,
+            "raw_bytes": raw_bytes or 0,
+            "stored_bytes": stored_bytes or 0,
+            "compression_ratio": round(raw_bytes / stored_bytes, 1) if stored_bytes else 0.0,
+            "track_points": track_points or 0,
+            "track_bytes": track_bytes or 0,
+            "max_error_m": round(max_error or 0.0, 2),
+        }
+
+    def _row_to_activity(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a ride_summaries row to Strava activity JSON."""
+        activity = {"id": row["activity_id"]}
+        activity.update({name: row[name] for name in SUMMARY_FIELDS})
+        activity["start_latlng"] = [row["start_lat"], row["start_lng"]] if row["start_lat"] is not None else []
+        activity["end_latlng"] = [row["end_lat"], row["end_lng"]] if row["end_lat"] is not None else []
+        if row["athlete_id"] is not None:
+            activity["athlete"] = {"id": row["athlete_id"]}
+        return activity
+
+
+class StoredStravaAPI(StravaAPI):
+    """StravaAPI that answers from a RideStore instead of the network."""
+
+    def __init__(self, store: RideStore, athlete_id: Optional[int] = None):
+        """
+        Initialize the offline client.
+
+        Args:
+            store: Store to read activities from
+            athlete_id: Only serve this athlete's activities (None for all)
+        """
+        super().__init__("", "", "offline")
+        self.store = store
+        self.athlete_id = athlete_id
+
+    def get_activities(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                       activity_type: str = "Ride", per_page: int = 200) -> List[Dict[str, Any]]:
+        """Get stored activities, matching StravaAPI.get_activities."""
+        return self.store.get_activities(after, before, activity_type, self.athlete_id)
+
+    def iter_activity_pages(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                            activity_type: str = "Ride", per_page: int = 200) -> Iterator[List[Dict[str, Any]]]:
+        """Stored activities as pages, matching StravaAPI.iter_activity_pages."""
+        activities = self.get_activities(after, before, activity_type, per_page)
+        for start in range(0, len(activities), per_page):
+            yield activities[start:start + per_page]
+
+    def get_activity_details(self, activity_id: int) -> Dict[str, Any]:
+        """Get a stored activity, matching StravaAPI.get_activity_details."""
+        activity = self.store.get_activity(activity_id)
+        if activity is None:
+            raise Exception(f"Activity {activity_id} is not in the ride store")
+        return activity
+
+    def get_activity_streams(self, activity_id: int,
+                             keys: Tuple[str, ...] = STREAM_KEYS) -> Dict[str, Any]:
+        """Get stored streams in the API's key_by_type shape."""
+        streams = self.store.get_streams(activity_id)
+        if streams is None:
+            raise Exception(f"No streams stored for activity {activity_id}")
+        return {key: {"data": streams[key].tolist()} for key in keys + ("latlng",) if key in streams}
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Brake Wear Benchmarks
+
+Times optimized code paths against the implementations they replaced.
+Run with `python run_benchmarks.py` (optionally naming benchmarks to run).
+"""
+
+import itertools
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from brake_wear_estimator import (
+    BrakePadSpecs, BrakeWearEstimator, RidingConditions, TerrainType, WeatherCondition,
+    estimate_brake_pad_wear, wear_rate_per_mile
+)
+
+
+def time_call(func, repeat: int = 3) -> float:
+    """Best wall-clock time of several runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def synthetic_activities(n: int, seed: int = 0):
+    """Strava-style activity dicts with random distance, climbing and speed."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "id": 1000 + i,
+            "name": f"Ride {i}",
+            "type": "Ride",
+            "distance": float(rng.uniform(0, 80000)),
+            "total_elevation_gain": float(rng.uniform(0, 2500)),
+            "average_speed": float(rng.uniform(2, 12)),
+            "max_speed": float(rng.uniform(10, 25)),
+            "moving_time": int(rng.integers(600, 14400)),
+            "start_date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T07:{i % 60:02d}:00Z",
+            "start_latlng": [47.6, -122.3],
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_replacement_miles(estimator: BrakeWearEstimator, conditions: RidingConditions,
+                             temperature_celsius=None) -> float:
+    """The previous estimate_replacement_miles: a full estimate on a 1000-mile ride."""
+    test_miles = 1000.0
+    test_result = estimator.estimate_wear(test_miles, conditions, temperature_celsius)
+    wear_per_mile = test_result["wear_mm"] / test_miles
+    usable_thickness = estimator.brake_pad_specs.initial_thickness_mm - estimator.brake_pad_specs.minimum_thickness_mm
+    if wear_per_mile > 0:
+        return usable_thickness / wear_per_mile
+    return float('inf')
+
+
+def bench_replacement_miles(customers: int = 50000, profiles: int = 500):
+    """Replacement forecasts for many customers sharing a few hundred riding profiles."""
+    rng = np.random.default_rng(0)
+    estimator = BrakeWearEstimator(BrakePadSpecs("organic", 5.0, 4.0, 1.0))
+    weathers, terrains = list(WeatherCondition), list(TerrainType)
+    pool = [
+        RidingConditions(
+            weather=weathers[rng.integers(len(weathers))],
+            terrain=terrains[rng.integers(len(terrains))],
+            rider_weight_kg=float(rng.choice([60.0, 70.0, 80.0, 90.0])),
+            bike_weight_kg=float(rng.choice([9.0, 12.0, 15.0])),
+            average_speed_kmh=float(rng.choice([15.0, 20.0, 25.0, 30.0])),
+            braking_frequency=float(rng.integers(1, 10))
+        )
+        for _ in range(profiles)
+    ]
+    work = [pool[i] for i in rng.integers(profiles, size=customers)]
+
+    legacy = time_call(lambda: [legacy_replacement_miles(estimator, c) for c in work])
+    wear_rate_per_mile.cache_clear()
+    cached = time_call(lambda: [estimator.estimate_replacement_miles(c) for c in work])
+
+    drift = max(
+        abs(legacy_replacement_miles(estimator, c) - estimator.estimate_replacement_miles(c)) /
+        estimator.estimate_replacement_miles(c)
+        for c in pool
+    )
+    info = wear_rate_per_mile.cache_info()
+    print(f"estimate_replacement_miles x{customers} ({profiles} profiles)")
+    print(f"  legacy: {legacy * 1000:8.1f} ms")
+    print(f"  cached: {cached * 1000:8.1f} ms  ({legacy / cached:.1f}x, cache hits {info.hits}, misses {info.misses})")
+    print(f"  max relative change from removing the 3-decimal rounding: {drift:.2%}")
+
+
+def bench_track_cache(tracks: int = 100, points: int = 3600):
+    """Reopening ride tracks from the binary cache vs. parsing the GPX each time."""
+    from strava_export_ingest import read_track_points
+    from synthetic_tracks import make_gpx
+    from track_cache import TrackCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(tracks):
+            paths.append(os.path.join(tmp, f"{i}.gpx"))
+            with open(paths[-1], "wb") as f:
+                f.write(make_gpx(points))
+
+        def parse_all():
+            for path in paths:
+                with open(path, "rb") as f:
+                    read_track_points(f, path)
+
+        cache = TrackCache(os.path.join(tmp, "cache"))
+        first = time_call(lambda: cache.get_many(paths), repeat=1)
+        parsed = time_call(parse_all)
+        cached = time_call(lambda: [track.points() for track in cache.get_many(paths)])
+        gpx_bytes = sum(os.path.getsize(path) for path in paths)
+        cache_bytes = sum(os.path.getsize(cache.get(path).path) for path in paths)
+
+    print(f"read {tracks} tracks x {points} points")
+    print(f"  GPX parse:  {parsed * 1000:8.1f} ms  ({gpx_bytes / 1e6:.1f} MB)")
+    print(f"  first fill: {first * 1000:8.1f} ms")
+    print(f"  cached:     {cached * 1000:8.1f} ms  ({parsed / cached:.0f}x, {cache_bytes / 1e6:.1f} MB)")
+
+
+def naive_decode_polyline(polyline: str, precision: int = 5):
+    """Reference pure-Python polyline decoder, one character at a time."""
+    coords, index, lat, lng = [], 0, 0, 0
+    factor = 10 ** precision
+    while index < len(polyline):
+        for axis in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(polyline[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            delta = ~(result >> 1) if result & 1 else result >> 1
+            if axis == 0:
+                lat += delta
+            else:
+                lng += delta
+        coords.append((lat / factor, lng / factor))
+    return coords
+
+
+def bench_polyline(polylines: int = 2000, points: int = 500):
+    """Batch polyline decoding vs. the pure-Python reference decoder."""
+    from polyline_codec import decode_polylines, encode_polyline
+
+    rng = np.random.default_rng(0)
+    encoded = [
+        encode_polyline(np.column_stack([
+            47.6 + np.cumsum(rng.normal(0, 2e-4, points)),
+            -122.3 + np.cumsum(rng.normal(0, 2e-4, points))
+        ]))
+        for _ in range(polylines)
+    ]
+    total = polylines * points
+
+    naive = time_call(lambda: [naive_decode_polyline(p) for p in encoded], repeat=1)
+    batch = time_call(lambda: decode_polylines(encoded))
+    print(f"decode {polylines} polylines x {points} points")
+    print(f"  naive: {naive * 1000:8.1f} ms  ({total / naive / 1e6:.2f} M points/s)")
+    print(f"  batch: {batch * 1000:8.1f} ms  ({total / batch / 1e6:.2f} M points/s, {naive / batch:.0f}x)")
+
+
+def start_local_https_server(directory: str):
+    """Serve a small JSON body over HTTPS with keep-alive, using a throwaway certificate."""
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+         "-days", "1", "-subj", "/CN=localhost", "-addext", "subjectAltName=IP:127.0.0.1"],
+        check=True, capture_output=True
+    )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+        def do_GET(self):
+            body = b'{"data": [{"temp": 15.0}]}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, cert
+
+
+def bench_http_session(rides_per_cycle: int = 5, cycles: int = 5):
+    """Monitor-cycle HTTPS latency: a new connection per request vs. the pooled session."""
+    import requests
+    from http_session import create_session
+
+    # One activity list, then details, weather and a car route per ride
+    requests_per_cycle = 1 + 3 * rides_per_cycle
+    with tempfile.TemporaryDirectory() as tmp:
+        server, cert = start_local_https_server(tmp)
+        url = f"https://127.0.0.1:{server.server_address[1]}/api/v3/athlete/activities"
+        session = create_session()
+        try:
+            unpooled = time_call(lambda: [requests.get(url, verify=cert) for _ in range(requests_per_cycle)], cycles)
+            first = time_call(lambda: [session.get(url, verify=cert) for _ in range(requests_per_cycle)], 1)
+            pooled = time_call(lambda: [session.get(url, verify=cert) for _ in range(requests_per_cycle)], cycles)
+        finally:
+            session.close()
+            server.shutdown()
+
+    print(f"monitor cycle, {requests_per_cycle} HTTPS requests to a local server")
+    print(f"  new connection each: {unpooled * 1000:8.1f} ms  ({unpooled / requests_per_cycle * 1000:.2f} ms/request)")
+    print(f"  pooled, cold:        {first * 1000:8.1f} ms")
+    print(f"  pooled, warm:        {pooled * 1000:8.1f} ms  ({pooled / requests_per_cycle * 1000:.2f} ms/request)")
+    print(f"  saved per cycle:     {(unpooled - pooled) * 1000:8.1f} ms locally; each real API round trip adds"
+          " 1-2 RTTs of TCP/TLS setup on top")
+
+
+def bench_stream_storage(points: int = 20000, tolerance_m: float = 2.0):
+    """Compressed stream blobs: size against raw float64 arrays, and decode time."""
+    from stream_storage import decode_streams, encode_streams
+
+    rng = np.random.default_rng(0)
+    t = np.arange(points, dtype=float)
+    heading = np.cumsum(rng.normal(0, 0.05, points))
+    step = 6.0 / 111_000  # About 6 m per second in degrees
+    streams = {
+        "time": t,
+        "distance": t * 6.0,
+        "altitude": 50 + 20 * np.sin(t / 300),
+        "velocity_smooth": np.full(points, 6.0),
+        "latlng": np.column_stack([
+            47.6 + np.cumsum(np.cos(heading)) * step,
+            -122.3 + np.cumsum(np.sin(heading)) * step / np.cos(np.radians(47.6)),
+        ]),
+    }
+    encoded = encode_streams(streams, tolerance_m)
+    decoded = time_call(lambda: decode_streams(encoded.blob), repeat=20)
+    print(f"store a {points}-point ride's streams (map track tolerance {tolerance_m} m)")
+    print(f"  blob:   {len(encoded.blob) / 1e3:8.1f} kB  ({encoded.compression_ratio:.1f}x smaller)")
+    print(f"  decode: {decoded * 1000:8.2f} ms")
+
+
+def bench_braking_events(samples: int = 20000, repeat: int = 10):
+    """Braking event detection on one long 1 Hz stream."""
+    from braking_events import detect_braking_events
+
+    rng = np.random.default_rng(1)
+    t = np.arange(samples, dtype=float)
+    v = np.clip(8 + np.cumsum(rng.normal(0, 0.2, samples)) * 0.05, 0, 20)
+    alt = 100 + np.cumsum(rng.normal(0, 0.05, samples))
+
+    detect = time_call(lambda: detect_braking_events(t, v, alt), repeat)
+    print(f"detect braking events in {samples} samples")
+    print(f"  vectorized: {detect * 1000:8.2f} ms  ({samples / detect / 1e6:.1f} M samples/s)")
+
+
+def bench_monte_carlo(draws: int = 100_000):
+    """Remaining-miles percentiles from one vectorized pass of Monte Carlo draws."""
+    from wear_monte_carlo import MonteCarloWearEstimator
+
+    estimator = MonteCarloWearEstimator(BrakePadSpecs("organic", 5.0, 4.0, 1.0))
+    conditions = RidingConditions(
+        weather=WeatherCondition.WET, terrain=TerrainType.HILLY, rider_weight_kg=75.0,
+        bike_weight_kg=12.0, average_speed_kmh=22.0, braking_frequency=6.0
+    )
+    sampled = time_call(lambda: estimator.estimate_remaining_miles(conditions, current_wear_mm=0.5,
+                                                                   draws=draws, seed=42))
+    print(f"Monte Carlo remaining miles, {draws} draws")
+    print(f"  vectorized: {sampled * 1000:8.1f} ms  ({draws / sampled / 1e6:.1f} M draws/s)")
+
+
+def bench_scenario_grid(sample: int = 2000):
+    """A 1M-cell what-if grid in one broadcast vs. estimate_brake_pad_wear per cell."""
+    from scenario_grid import evaluate_scenario_grid
+
+    sweep = {
+        "miles_ridden": np.linspace(100, 5000, 25),
+        "weather": ["dry", "wet", "rainy", "snowy", "muddy"],
+        "terrain": ["flat", "hilly", "mountainous", "urban"],
+        "brake_material": ["organic", "semi-metallic", "ceramic", "sintered"],
+        "rider_weight_kg": np.linspace(50, 120, 10),
+        "average_speed_kmh": np.linspace(10, 40, 10),
+        "braking_frequency": np.linspace(1, 10, 5),
+    }
+    cells = int(np.prod([len(values) for values in sweep.values()]))
+    grid = time_call(lambda: evaluate_scenario_grid(**sweep))
+    # The scalar path is timed on the first cells and scaled up
+    scalar = time_call(lambda: [
+        estimate_brake_pad_wear(**dict(zip(sweep, values)))
+        for values in itertools.islice(itertools.product(*sweep.values()), sample)
+    ], repeat=1) * cells / sample
+    print(f"what-if grid of {cells} cells")
+    print(f"  scalar calls: {scalar * 1000:8.1f} ms  (extrapolated from {sample} cells)")
+    print(f"  broadcast:    {grid * 1000:8.1f} ms  ({scalar / grid:.0f}x)")
+
+
+def bench_wear_calibration(lifecycles: int = 2000, rides_per_lifecycle: int = 40):
+    """Fitting wear multipliers to thousands of logged pad lifecycles."""
+    from strava_brake_wear_estimator import (
+        BrakePadSpecs as StravaPadSpecs, TERRAIN_CODES, WEATHER_CODES, RideTable, StravaAPI,
+        StravaBrakeWearEstimator
+    )
+    from wear_calibration import PadLifecycle, fit_wear_model
+    from wear_model import builtin_model
+
+    rng = np.random.default_rng(5)
+    pool = RideTable.from_activities(synthetic_activities(2000, seed=5))
+    pool.weather_code[:] = rng.integers(0, len(WEATHER_CODES), len(pool))
+    pool.terrain_code[:] = rng.integers(0, len(TERRAIN_CODES), len(pool))
+
+    def make_estimator():
+        return StravaBrakeWearEstimator(StravaPadSpecs("sintered", 5.0, 4.0, 1.0), StravaAPI("id", "secret", "token"))
+
+    truth = make_estimator()
+    model = builtin_model()
+    model.weather_multipliers["wet"] = 1.7
+    model.terrain_multipliers["mountainous"] = 2.0
+    truth.use_wear_model(model)
+    logged = []
+    for _ in range(lifecycles):
+        rides = pool.take(rng.choice(len(pool), rides_per_lifecycle, replace=False))
+        logged.append(PadLifecycle("sintered", rides, truth._table_factors(rides)["wear_mm"].sum()))
+
+    fitted = time_call(lambda: fit_wear_model(logged, make_estimator(), version="bench"), repeat=1)
+    print(f"fit wear multipliers to {lifecycles} lifecycles x {rides_per_lifecycle} rides")
+    print(f"  fit_wear_model: {fitted * 1000:8.1f} ms")
+
+
+def bench_terrain_profile(rides: int = 365, samples: int = 3600):
+    """Grade profiles for a year of one-hour rides at 1 Hz."""
+    from terrain_profile import profile_many
+
+    rng = np.random.default_rng(4)
+    streams = [
+        (np.cumsum(rng.uniform(4.0, 10.0, samples)), 200 + np.cumsum(rng.normal(0, 0.3, samples)))
+        for _ in range(rides)
+    ]
+    profiled = time_call(lambda: profile_many(streams), repeat=1)
+    print(f"profile terrain of {rides} rides x {samples} samples")
+    print(f"  profile_many: {profiled * 1000:8.1f} ms  ({profiled / rides * 1000:.2f} ms/ride)")
+
+
+def bench_activity_pages(pages: int = 4, round_trip: float = 0.05, work: float = 0.05):
+    """Walking activity pages with the next page prefetched vs. fetched on demand."""
+    from strava_brake_wear_estimator import StravaAPI
+
+    per_page = 10
+
+    class SlowPagedStravaAPI(StravaAPI):
+        def get_activity_page(self, page, after=None, before=None, activity_type="Ride", per_page=200):
+            time.sleep(round_trip)
+            start = (page - 1) * per_page
+            return [{"id": i} for i in range(start, min(start + per_page, pages * per_page))]
+
+    api = SlowPagedStravaAPI("id", "secret", "token")
+
+    def on_demand():
+        page_number = 1
+        while True:
+            page = api.get_activity_page(page_number, per_page=per_page)
+            if not page:
+                break
+            time.sleep(work)
+            page_number += 1
+
+    def prefetched():
+        for _ in api.iter_activity_pages(per_page=per_page):
+            time.sleep(work)
+
+    sequential = time_call(on_demand, repeat=1)
+    overlapped = time_call(prefetched, repeat=1)
+    print(f"walk {pages} pages, {round_trip * 1000:.0f} ms per request and {work * 1000:.0f} ms of work per page")
+    print(f"  on demand:  {sequential * 1000:8.1f} ms")
+    print(f"  prefetched: {overlapped * 1000:8.1f} ms  ({sequential / overlapped:.2f}x)")
+
+
+def bench_weather_enrichment(rides: int = 40, round_trip: float = 0.05):
+    """Weather lookups for a batch of rides: one at a time vs. the thread pool."""
+    from strava_brake_wear_estimator import (
+        BrakePadSpecs as StravaPadSpecs, StravaAPI, StravaBrakeWearEstimator, WeatherAPI
+    )
+
+    class SlowWeatherAPI(WeatherAPI):
+        def get_weather_for_ride(self, lat, lon, date):
+            time.sleep(round_trip)
+            return {"temp": 12.0, "weather": [{"id": 500}], "rain": {"1h": 3.0}}
+
+    estimator = StravaBrakeWearEstimator(StravaPadSpecs("sintered", 5.0, 4.0, 1.0),
+                                         StravaAPI("id", "secret", "token"), SlowWeatherAPI("key"))
+    activities = synthetic_activities(rides)
+    sequential = time_call(lambda: estimator.process_strava_rides(activities, max_workers=1), repeat=1)
+    pooled = time_call(lambda: estimator.process_strava_rides(activities, max_workers=8), repeat=1)
+    print(f"weather for {rides} rides, {round_trip * 1000:.0f} ms per lookup")
+    print(f"  sequential: {sequential * 1000:8.1f} ms")
+    print(f"  8 at once:  {pooled * 1000:8.1f} ms  ({sequential / pooled:.1f}x)")
+
+
+BENCHMARKS = {
+    "replacement_miles": bench_replacement_miles,
+    "track_cache": bench_track_cache,
+    "polyline": bench_polyline,
+    "http_session": bench_http_session,
+    "stream_storage": bench_stream_storage,
+    "braking_events": bench_braking_events,
+    "monte_carlo": bench_monte_carlo,
+    "scenario_grid": bench_scenario_grid,
+    "wear_calibration": bench_wear_calibration,
+    "terrain_profile": bench_terrain_profile,
+    "activity_pages": bench_activity_pages,
+    "weather_enrichment": bench_weather_enrichment,
+}
+
+
+if __name__ == "__main__":
+    print("⏱️  Brake Wear Benchmarks")
+    print("=" * 50)
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -50,6 +50,7 @@ def main():
         if choice == "1":
             print("\n🚴‍♂️ Starting Strava monitor...")
             print("This will continuously check for new activities every 5 minutes.")
+            print("(With WEBHOOK_DB set, rides pushed by Strava are captured within seconds.)")
             print("When you finish a ride, it will automatically capture traffic data.")
             print("Press Ctrl+C to stop monitoring.")
             print()
@@ -57,7 +58,9 @@ def main():
             try:
                 start_monitor(
                     str(client_id), str(client_secret), 
-                    str(access_token), str(maps_api_key)
+                    str(access_token), str(maps_api_key),
+                    webhook_db_path=os.environ.get('WEBHOOK_DB'),
+                    service_db_path=os.environ.get('SERVICE_DB', 'service_schedule.db')
                 )
             except KeyboardInterrupt:
                 print("\n🛑 Monitor stopped.")
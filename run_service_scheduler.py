@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Service Scheduler Runner
+
+Runs the nightly service-due job over every authorized athlete and prints
+the most urgent bikes. Meant to be started from cron; an interrupted run
+resumes if restarted the same night; the next night starts afresh.
+"""
+
+import os
+import sys
+
+from service_scheduler import ServiceScheduler
+from wear_ledger import WearLedger
+
+
+def load_config():
+    """Load configuration from config.py file."""
+    try:
+        from config import STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET
+        return STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET
+    except ImportError as e:
+        print(f"❌ Error loading config: {e}")
+        return None, None
+
+
+def main():
+    """Run the scheduler once and print the due list."""
+    print("🗓️  Nightly Service-Due Scheduler")
+    print("=" * 40)
+
+    client_id, client_secret = load_config()
+    if not all([client_id, client_secret]):
+        print("❌ Missing required configuration. Please check your config.py file.")
+        sys.exit(1)
+
+    scheduler = ServiceScheduler(
+        client_id, client_secret,
+        WearLedger(os.environ.get('WEAR_LEDGER_DB', 'wear_ledger.db')),
+        db_path=os.environ.get('SERVICE_DB', 'service_schedule.db'),
+        max_workers=int(os.environ.get('SERVICE_WORKERS', '8')),
+        window_seconds=float(os.environ.get('SERVICE_WINDOW_SECONDS', str(4 * 3600))),
+        terrain_from_streams=os.environ.get('SERVICE_TERRAIN_FROM_STREAMS', '') == '1'
+    )
+    summary = scheduler.run()
+    print(f"Run {summary['run_id']}: {summary['processed']} processed, "
+          f"{summary['failed']} failed, {summary['remaining']} left for next run")
+
+    print("\nMost urgent bikes:")
+    for due in scheduler.get_due_list(limit=20):
+        when = due.projected_due_date or "not ridden recently"
+        print(f"  [{due.urgency:>8}] athlete {due.athlete_id} bike {due.gear_id or '-'}: "
+              f"{due.wear_percentage:.0f}% worn, due {when}")
+
+
+if __name__ == "__main__":
+    main()
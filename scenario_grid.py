@@ -0,0 +1,202 @@
+"""
+What-If Scenario Grid
+
+This module compares brake pad options for a customer by sweeping the
+Cartesian product of parameter lists (pad materials, rider weights, weather
+mixes, ...) through the wear formula in one broadcasted NumPy computation.
+Each parameter gets its own array axis, so the grid is never materialized as
+Python objects, and a million-cell sweep runs in a fraction of a second.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from brake_wear_estimator import pad_life_arrays, parse_terrain, parse_weather, wear_mm_array
+from wear_model import WearModel, load_wear_model
+
+# Sweepable parameters and their defaults (as in estimate_brake_pad_wear)
+GRID_DEFAULTS = {
+    "miles_ridden": 1000.0,
+    "weather": "dry",
+    "terrain": "flat",
+    "brake_material": "organic",
+    "rider_weight_kg": 70.0,
+    "bike_weight_kg": 15.0,
+    "average_speed_kmh": 25.0,
+    "braking_frequency": 5.0,
+    "temperature_celsius": None,
+}
+
+RESULT_COLUMNS = ("wear_mm", "remaining_thickness_mm", "wear_percentage", "remaining_miles", "needs_replacement")
+
+
+class ScenarioTable:
+    """
+    Results of a scenario sweep, one row per grid cell.
+
+    Rows are numbered in C order over the parameter axes (the last parameter
+    varies fastest). Parameter columns are expanded lazily from the axes.
+    """
+
+    def __init__(self, axes: Dict[str, List[Any]], results: Dict[str, np.ndarray]):
+        """
+        Initialize the table.
+
+        Args:
+            axes: Parameter name -> list of swept values, in axis order
+            results: Result column name -> flat array with one entry per cell
+        """
+        self.axes = axes
+        self.results = results
+        self.shape = tuple(len(values) for values in axes.values())
+
+    def __len__(self) -> int:
+        return int(np.prod(self.shape))
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a result or parameter column as a flat array.
+
+        Args:
+            name: Result column or parameter name
+
+        Returns:
+            Array with one entry per cell
+        """
+        if name in self.results:
+            return self.results[name]
+        axis = list(self.axes).index(name)
+        return np.asarray(self.axes[name], dtype=object)[self.axis_index(axis)]
+
+    def axis_index(self, axis: int) -> np.ndarray:
+        """Position along one parameter axis for every cell."""
+        positions = np.arange(self.shape[axis]).reshape(
+            [1] * axis + [-1] + [1] * (len(self.shape) - axis - 1)
+        )
+        return np.broadcast_to(positions, self.shape).ravel()
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """
+        Get one cell's parameters and results.
+
+        Args:
+            index: Flat cell index
+
+        Returns:
+            Dictionary of parameter values and results
+        """
+        positions = np.unravel_index(index, self.shape)
+        row = {name: values[int(p)] for (name, values), p in zip(self.axes.items(), positions)}
+        row.update({name: column[index].item() for name, column in self.results.items()})
+        return row
+
+    def rank(self, by: str = "remaining_miles", descending: bool = True, top: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """
+        Rank grid cells by a result column.
+
+        Ties keep grid order.
+
+        Args:
+            by: Result column to rank by
+            descending: Highest values first
+            top: Number of rows to return (None for all)
+
+        Returns:
+            List of row dictionaries, best first
+        """
+        key = self.results[by].astype(float)
+        if descending:
+            key = -key
+        if top is not None and top < len(key):
+            candidates = np.argpartition(key, top - 1)[:top]
+            # argpartition does not order ties, so include every cell tied with the cutoff
+            candidates = np.flatnonzero(key <= key[candidates].max())
+        else:
+            candidates = np.arange(len(key))
+        order = candidates[np.lexsort((candidates, key[candidates]))][:top]
+        return [self.row(int(i)) for i in order]
+
+
+def _axis_array(values: Sequence, axis: int, ndim: int) -> np.ndarray:
+    """Shape a parameter's values to lie along one axis of the grid."""
+    return np.asarray(values, dtype=float).reshape([1] * axis + [-1] + [1] * (ndim - axis - 1))
+
+
+def evaluate_scenario_grid(
+    initial_thickness_mm: float = 4.0,
+    minimum_thickness_mm: float = 1.0,
+    wear_model: Optional[WearModel] = None,
+    **parameters
+) -> ScenarioTable:
+    """
+    Evaluate brake pad wear for every combination of parameter values.
+
+    Any parameter of `estimate_brake_pad_wear` may be given as a single value
+    or a list of values to sweep; missing ones use the same defaults. Invalid
+    weather and terrain names fall back to dry and flat. Every cell matches
+    `estimate_brake_pad_wear` called with that cell's values.
+
+    Example:
+        evaluate_scenario_grid(brake_material=["organic", "sintered"],
+                               weather=["dry", "wet"], rider_weight_kg=[60, 80, 100])
+
+    Args:
+        initial_thickness_mm: New pad thickness
+        minimum_thickness_mm: Replacement thickness
+        wear_model: Wear multiplier tables (default: the model file, or built-in tables)
+        **parameters: Values or lists of values for the parameters in GRID_DEFAULTS
+
+    Returns:
+        ScenarioTable with one row per combination
+    """
+    unknown = set(parameters) - set(GRID_DEFAULTS)
+    if unknown:
+        raise TypeError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+
+    model = wear_model or load_wear_model()
+    axes = {}
+    for name, default in GRID_DEFAULTS.items():
+        values = parameters.get(name, default)
+        axes[name] = list(values) if isinstance(values, (list, tuple, np.ndarray)) else [values]
+
+    ndim = len(axes)
+    index = {name: axis for axis, name in enumerate(axes)}
+
+    def axis_values(name, values):
+        return _axis_array(values, index[name], ndim)
+
+    miles = axis_values("miles_ridden", axes["miles_ridden"])
+    weather_multiplier = axis_values("weather", [
+        model.weather_multipliers.get(parse_weather(w).value, 1.0) for w in axes["weather"]
+    ])
+    terrain_multiplier = axis_values("terrain", [
+        model.terrain_multipliers.get(parse_terrain(t).value, 1.0) for t in axes["terrain"]
+    ])
+    base_wear_rate = axis_values("brake_material", [
+        model.material_wear_rates.get(m, 0.12) for m in axes["brake_material"]
+    ])
+    total_weight = axis_values("rider_weight_kg", axes["rider_weight_kg"]) + \
+        axis_values("bike_weight_kg", axes["bike_weight_kg"])
+
+    temperature = None
+    if any(t is not None for t in axes["temperature_celsius"]):
+        temperature = axis_values("temperature_celsius", [
+            np.nan if t is None else t for t in axes["temperature_celsius"]
+        ])
+
+    shape = tuple(len(values) for values in axes.values())
+    total_wear_mm = np.broadcast_to(wear_mm_array(
+        base_wear_rate,
+        miles * 1.60934,
+        weather_multiplier,
+        terrain_multiplier,
+        axis_values("average_speed_kmh", axes["average_speed_kmh"]),
+        axis_values("braking_frequency", axes["braking_frequency"]),
+        total_weight,
+        temperature
+    ), shape)
+
+    life = pad_life_arrays(total_wear_mm, miles, initial_thickness_mm, minimum_thickness_mm)
+    results = {name: np.broadcast_to(life[name], shape).ravel() for name in RESULT_COLUMNS}
+    return ScenarioTable(axes, results)
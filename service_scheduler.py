@@ -0,0 +1,557 @@
+"""
+Nightly Service-Due Scheduler
+
+This module runs the shop's nightly brake pad job. It walks every athlete who
+authorized the app, brings their per-bike wear ledger up to date with only the
+rides since the last run, projects when each bike's pads will be due from the
+recent riding cadence, and writes a due list ordered by urgency.
+
+Athletes are processed in parallel on a thread pool (the work is mostly Strava
+and weather HTTP calls). Progress is committed per athlete, so an interrupted
+or out-of-time run resumes where it stopped instead of starting over.
+"""
+
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from strava_brake_wear_estimator import (
+    BrakePadSpecs, RideTable, StravaAPI, StravaBrakeWearEstimator, WeatherAPI
+)
+from wear_ledger import LedgerEntry, WearLedger
+from wear_model import WearModel, load_wear_model
+
+# Urgency levels, most urgent first
+URGENCY_LEVELS = ("overdue", "due_soon", "upcoming", "ok")
+
+
+@dataclass
+class AthleteAccount:
+    """An athlete who authorized the app, with their pad setup."""
+    athlete_id: int
+    access_token: str
+    refresh_token: str
+    expires_at: int
+    rider_weight_kg: float = 70.0
+    bike_weight_kg: float = 15.0
+    brake_material: str = "organic"
+    initial_thickness_mm: float = 4.0
+    minimum_thickness_mm: float = 1.0
+
+
+@dataclass
+class ServiceDue:
+    """Projected pad replacement for one bike."""
+    athlete_id: int
+    gear_id: str
+    wear_percentage: float
+    remaining_miles: float
+    miles_per_day: float
+    days_until_due: Optional[float]  # None when the bike has not been ridden recently
+    projected_due_date: Optional[str]
+    urgency: str
+
+
+class AthleteTokenStore:
+    """SQLite table of authorized athletes and their Strava tokens."""
+
+    def __init__(self, db_path: str = "service_schedule.db"):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up the athlete token table."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS athlete_tokens (
+                athlete_id INTEGER PRIMARY KEY,
+                access_token TEXT,
+                refresh_token TEXT,
+                expires_at INTEGER,
+                rider_weight_kg REAL DEFAULT 70.0,
+                bike_weight_kg REAL DEFAULT 15.0,
+                brake_material TEXT DEFAULT 'organic',
+                initial_thickness_mm REAL DEFAULT 4.0,
+                minimum_thickness_mm REAL DEFAULT 1.0,
+                last_processed_at TEXT,
+                updated_at TEXT
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def save_tokens(self, athlete_id: int, access_token: str, refresh_token: str, expires_at: int):
+        """
+        Store or update an athlete's tokens, keeping their pad setup.
+
+        Args:
+            athlete_id: Strava athlete ID
+            access_token: Strava access token
+            refresh_token: Strava refresh token
+            expires_at: Access token expiry (epoch seconds)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT INTO athlete_tokens (athlete_id, access_token, refresh_token, expires_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (athlete_id) DO UPDATE SET
+                access_token = excluded.access_token,
+                refresh_token = excluded.refresh_token,
+                expires_at = excluded.expires_at,
+                updated_at = excluded.updated_at
+        ''', (athlete_id, access_token, refresh_token, expires_at, datetime.now().isoformat()))
+
+        conn.commit()
+        conn.close()
+
+    def save_account(self, account: AthleteAccount):
+        """Store an athlete's tokens and pad setup."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO athlete_tokens
+            (athlete_id, access_token, refresh_token, expires_at, rider_weight_kg, bike_weight_kg,
+             brake_material, initial_thickness_mm, minimum_thickness_mm, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            account.athlete_id, account.access_token, account.refresh_token, account.expires_at,
+            account.rider_weight_kg, account.bike_weight_kg, account.brake_material,
+            account.initial_thickness_mm, account.minimum_thickness_mm, datetime.now().isoformat()
+        ))
+
+        conn.commit()
+        conn.close()
+
+    def delete_athlete(self, athlete_id: int):
+        """Forget an athlete who deauthorized the app, with their tokens."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('DELETE FROM athlete_tokens WHERE athlete_id = ?', (athlete_id,))
+
+        conn.commit()
+        conn.close()
+
+    def get_accounts(self) -> List[AthleteAccount]:
+        """Get every authorized athlete, least recently processed first."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT athlete_id, access_token, refresh_token, expires_at, rider_weight_kg,
+                   bike_weight_kg, brake_material, initial_thickness_mm, minimum_thickness_mm
+            FROM athlete_tokens
+            ORDER BY last_processed_at IS NOT NULL, last_processed_at, athlete_id
+        ''')
+
+        rows = cursor.fetchall()
+        conn.close()
+        return [AthleteAccount(*row) for row in rows]
+
+
+class ServiceScheduler:
+    """Nightly job that updates wear for every athlete and builds the due list."""
+
+    def __init__(self, client_id: str, client_secret: str, ledger: WearLedger,
+                 db_path: str = "service_schedule.db", weather_api: Optional[WeatherAPI] = None,
+                 max_workers: int = 8, window_seconds: float = 4 * 3600,
+                 cadence_days: int = 28, initial_days_back: int = 90,
+                 api_factory: Optional[Callable[[AthleteAccount], StravaAPI]] = None,
+                 terrain_from_streams: bool = False, wear_model: Optional[WearModel] = None,
+                 resume_within_hours: float = 12.0):
+        """
+        Initialize the scheduler.
+
+        Args:
+            client_id: Strava API client ID
+            client_secret: Strava API client secret
+            ledger: Wear ledger holding per-bike totals
+            db_path: Path to the scheduler's SQLite database
+            weather_api: Optional weather API client for ride enrichment
+            max_workers: Athletes processed at once
+            window_seconds: Time budget per run; athletes not started by then wait for the next run
+            cadence_days: Recent riding window used to project due dates
+            initial_days_back: History fetched for athletes without a ledger yet
+            api_factory: Builds the Strava client for an athlete (default: StravaAPI with their token)
+            terrain_from_streams: Profile each new ride's terrain from its altitude stream
+            wear_model: Wear multiplier tables shared by every athlete's estimator
+                (default: the model file, or built-in tables)
+            resume_within_hours: Only unfinished runs started this recently are resumed;
+                older ones (an earlier night's) are expired and a fresh run starts
+        """
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.ledger = ledger
+        self.db_path = db_path
+        self.weather_api = weather_api
+        self.max_workers = max_workers
+        self.window_seconds = window_seconds
+        self.cadence_days = cadence_days
+        self.initial_days_back = initial_days_back
+        self.terrain_from_streams = terrain_from_streams
+        self.wear_model = wear_model or load_wear_model()
+        self.resume_within = timedelta(hours=resume_within_hours)
+        self.api_factory = api_factory or (
+            lambda account: StravaAPI(client_id, client_secret, account.access_token)
+        )
+        self.tokens = AthleteTokenStore(db_path)
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up run tracking and due-list tables."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduler_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT,
+                finished_at TEXT,
+                status TEXT
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS run_progress (
+                run_id INTEGER,
+                athlete_id INTEGER,
+                status TEXT,
+                error TEXT,
+                finished_at TEXT,
+                PRIMARY KEY (run_id, athlete_id)
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS service_due (
+                athlete_id INTEGER,
+                gear_id TEXT,
+                wear_percentage REAL,
+                remaining_miles REAL,
+                miles_per_day REAL,
+                days_until_due REAL,
+                projected_due_date TEXT,
+                urgency TEXT,
+                urgency_rank INTEGER,
+                run_id INTEGER,
+                updated_at TEXT,
+                PRIMARY KEY (athlete_id, gear_id)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def run(self, resume: bool = True, window_seconds: Optional[float] = None,
+            now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Process every athlete not yet done in the current run.
+
+        Args:
+            resume: Continue tonight's unfinished run instead of starting a new one
+            window_seconds: Override the time budget for this run
+            now: Start time of this run (default: now)
+
+        Returns:
+            Dictionary with run_id and processed/failed/remaining counts
+        """
+        now = now or datetime.now(timezone.utc)
+        run_id = self._open_run(resume, now)
+        done = self._finished_athletes(run_id)
+        pending = [account for account in self.tokens.get_accounts() if account.athlete_id not in done]
+        deadline = time.monotonic() + (window_seconds if window_seconds is not None else self.window_seconds)
+
+        processed = failed = 0
+        queue = iter(pending)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                # Keep the pool busy, but start no new athletes after the deadline
+                while len(in_flight) < self.max_workers and time.monotonic() < deadline:
+                    account = next(queue, None)
+                    if account is None:
+                        break
+                    in_flight[executor.submit(self.process_athlete, account, now)] = account
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    account = in_flight.pop(future)
+                    try:
+                        self._record_success(run_id, account.athlete_id, future.result())
+                        processed += 1
+                    except Exception as e:
+                        self._record_failure(run_id, account.athlete_id, str(e))
+                        failed += 1
+
+        remaining = len(pending) - processed - failed
+        self._close_run(run_id, "complete" if remaining == 0 else "incomplete")
+        return {"run_id": run_id, "processed": processed, "failed": failed, "remaining": remaining}
+
+    def process_athlete(self, account: AthleteAccount, now: Optional[datetime] = None) -> List[ServiceDue]:
+        """
+        Apply an athlete's new rides to their ledger and project due dates.
+
+        Args:
+            account: The athlete to process
+            now: Current time (default: now)
+
+        Returns:
+            ServiceDue for each of the athlete's bikes
+        """
+        now = now or datetime.now(timezone.utc)
+        strava_api = self.api_factory(account)
+        if account.refresh_token and account.expires_at <= now.timestamp() + 300:
+            strava_api.refresh_token(account.refresh_token)
+            token_data = strava_api.token_data
+            self.tokens.save_tokens(
+                account.athlete_id, strava_api.access_token,
+                token_data.get("refresh_token", account.refresh_token),
+                token_data.get("expires_at", 0)
+            )
+
+        specs = BrakePadSpecs(
+            material=account.brake_material,
+            compound_hardness=5.0,
+            initial_thickness_mm=account.initial_thickness_mm,
+            minimum_thickness_mm=account.minimum_thickness_mm
+        )
+        estimator = StravaBrakeWearEstimator(specs, strava_api, self.weather_api, wear_model=self.wear_model,
+                                             terrain_from_streams=self.terrain_from_streams)
+
+        # One fetch covers every bike: start from the bike updated longest ago
+        entries = self.ledger.get_all_entries(account.athlete_id)
+        if entries:
+            after_epoch = min(
+                entry.last_ride_epoch - 1 if entry.last_ride_epoch is not None else entry.pads_installed_epoch
+                for entry in entries
+            )
+            after_date = datetime.fromtimestamp(after_epoch, tz=timezone.utc)
+        else:
+            after_date = now - timedelta(days=self.initial_days_back)
+
+        activities = strava_api.get_activities(after=after_date, activity_type="Ride")
+        rides = RideTable.from_rides(estimator.process_strava_rides(activities))
+
+        # Bikes with their own recorded pads are scored and projected with those
+        bike_specs = self.ledger.get_bike_specs(account.athlete_id)
+        gear_estimators = {
+            gear_id: StravaBrakeWearEstimator(bike_specs[gear_id], strava_api, wear_model=self.wear_model)
+            for gear_id in bike_specs
+        }
+
+        # Totals scored with other pads or another wear model are re-scored before adding rides
+        for entry in entries:
+            gear_estimator = gear_estimators.get(entry.gear_id, estimator)
+            if self.ledger.needs_rebuild(entry, gear_estimator):
+                self.ledger.rebuild(account.athlete_id, entry.gear_id, gear_estimator)
+
+        for gear_id in rides.gear_ids:
+            mask = rides.gear_mask(gear_id)
+            if mask.any():
+                self.ledger.apply_rides(
+                    account.athlete_id, gear_id, rides.take(mask), gear_estimators.get(gear_id, estimator),
+                    account.rider_weight_kg, account.bike_weight_kg
+                )
+
+        return [
+            self.project_due(entry, bike_specs.get(entry.gear_id, specs), now)
+            for entry in self.ledger.get_all_entries(account.athlete_id)
+        ]
+
+    def project_due(self, entry: LedgerEntry, specs: BrakePadSpecs, now: datetime) -> ServiceDue:
+        """
+        Project when a bike's pads reach minimum thickness.
+
+        Wear per mile comes from the ledger totals, miles per day from the
+        rides in the last `cadence_days` (or since the pads were fitted).
+
+        Args:
+            entry: Ledger entry for the bike
+            specs: Pad specs for the bike
+            now: Current time
+
+        Returns:
+            ServiceDue for the bike
+        """
+        now_epoch = int(now.timestamp())
+        window_start = max(entry.pads_installed_epoch, now_epoch - self.cadence_days * 86400)
+        recent = self.ledger.load_rides(entry.athlete_id, entry.gear_id, since_epoch=window_start)
+        window_days = max(1.0, (now_epoch - window_start) / 86400)
+        miles_per_day = float(recent.distance_miles.sum()) / window_days
+
+        usable_thickness = specs.initial_thickness_mm - specs.minimum_thickness_mm
+        remaining_mm = max(0.0, usable_thickness - entry.cumulative_wear_mm)
+        wear_percentage = min(100.0, max(0.0, entry.cumulative_wear_mm / usable_thickness * 100))
+
+        remaining_miles = 0.0
+        if entry.cumulative_wear_mm > 0 and entry.cumulative_distance_miles > 0:
+            remaining_miles = remaining_mm / (entry.cumulative_wear_mm / entry.cumulative_distance_miles)
+
+        days_until_due = None
+        if remaining_mm <= 0:
+            days_until_due = 0.0
+        elif miles_per_day > 0 and entry.cumulative_wear_mm > 0:
+            days_until_due = remaining_miles / miles_per_day
+
+        if days_until_due is None:
+            urgency = "ok"
+        elif days_until_due <= 0:
+            urgency = "overdue"
+        elif days_until_due <= 14:
+            urgency = "due_soon"
+        elif days_until_due <= 60:
+            urgency = "upcoming"
+        else:
+            urgency = "ok"
+
+        return ServiceDue(
+            athlete_id=entry.athlete_id,
+            gear_id=entry.gear_id,
+            wear_percentage=round(wear_percentage, 1),
+            remaining_miles=round(remaining_miles, 0),
+            miles_per_day=round(miles_per_day, 2),
+            days_until_due=round(days_until_due, 1) if days_until_due is not None else None,
+            projected_due_date=(now + timedelta(days=days_until_due)).date().isoformat()
+            if days_until_due is not None else None,
+            urgency=urgency
+        )
+
+    def get_due_list(self, limit: Optional[int] = None) -> List[ServiceDue]:
+        """
+        Get the due list, most urgent first.
+
+        Args:
+            limit: Maximum number of bikes (None for all)
+
+        Returns:
+            List of ServiceDue objects
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        query = '''
+            SELECT athlete_id, gear_id, wear_percentage, remaining_miles, miles_per_day,
+                   days_until_due, projected_due_date, urgency
+            FROM service_due
+            ORDER BY urgency_rank, days_until_due IS NULL, days_until_due, wear_percentage DESC
+        '''
+        if limit is not None:
+            cursor.execute(query + ' LIMIT ?', (limit,))
+        else:
+            cursor.execute(query)
+
+        rows = cursor.fetchall()
+        conn.close()
+        return [ServiceDue(*row) for row in rows]
+
+    def _open_run(self, resume: bool, now: datetime) -> int:
+        """Reuse tonight's unfinished run, or start a new one."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            if resume:
+                cursor.execute('''
+                    SELECT run_id, started_at FROM scheduler_runs
+                    WHERE status NOT IN ('complete', 'expired') ORDER BY run_id DESC LIMIT 1
+                ''')
+                row = cursor.fetchone()
+                if row:
+                    started_at = datetime.fromisoformat(row[1])
+                    if started_at.tzinfo is None:
+                        started_at = started_at.astimezone()  # Runs recorded in local time
+                    if now - started_at <= self.resume_within:
+                        cursor.execute("UPDATE scheduler_runs SET status = 'running' WHERE run_id = ?", (row[0],))
+                        conn.commit()
+                        return row[0]
+
+            # An earlier night's leftovers are not carried into a new run
+            cursor.execute('''
+                UPDATE scheduler_runs SET status = 'expired' WHERE status NOT IN ('complete', 'expired')
+            ''')
+            cursor.execute('''
+                INSERT INTO scheduler_runs (started_at, status) VALUES (?, 'running')
+            ''', (now.isoformat(),))
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def _close_run(self, run_id: int, status: str):
+        """Mark a run complete or incomplete."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE scheduler_runs SET status = ?, finished_at = ? WHERE run_id = ?
+        ''', (status, datetime.now().isoformat(), run_id))
+        conn.commit()
+        conn.close()
+
+    def _finished_athletes(self, run_id: int) -> set:
+        """Athletes already processed successfully in a run."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT athlete_id FROM run_progress WHERE run_id = ? AND status = 'done'
+        ''', (run_id,))
+        done = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return done
+
+    def _record_success(self, run_id: int, athlete_id: int, due: List[ServiceDue]):
+        """Commit an athlete's due rows and progress in one transaction."""
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('DELETE FROM service_due WHERE athlete_id = ?', (athlete_id,))
+            cursor.executemany('''
+                INSERT INTO service_due
+                (athlete_id, gear_id, wear_percentage, remaining_miles, miles_per_day, days_until_due,
+                 projected_due_date, urgency, urgency_rank, run_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (d.athlete_id, d.gear_id, d.wear_percentage, d.remaining_miles, d.miles_per_day,
+                 d.days_until_due, d.projected_due_date, d.urgency, URGENCY_LEVELS.index(d.urgency),
+                 run_id, now)
+                for d in due
+            ])
+            cursor.execute('''
+                INSERT OR REPLACE INTO run_progress (run_id, athlete_id, status, error, finished_at)
+                VALUES (?, ?, 'done', NULL, ?)
+            ''', (run_id, athlete_id, now))
+            cursor.execute('''
+                UPDATE athlete_tokens SET last_processed_at = ? WHERE athlete_id = ?
+            ''', (now, athlete_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _record_failure(self, run_id: int, athlete_id: int, error: str):
+        """Record a failed athlete so the run can retry it on resume."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO run_progress (run_id, athlete_id, status, error, finished_at)
+            VALUES (?, ?, 'failed', ?, ?)
+        ''', (run_id, athlete_id, error, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
@@ -7,14 +7,27 @@ including weather conditions, elevation data, and ride metrics.
 
 import requests
 import json
-from datetime import datetime, timedelta
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Union, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
 import math
 import os
 from urllib.parse import urlencode
 
+import numpy as np
+
+from activity_cache import ActivityCache
+from http_session import get_session
+from braking_events import (
+    STREAM_KEYS, detect_braking_events, streams_to_arrays, velocity_from_distance, wear_from_braking_energy
+)
+from terrain_profile import TERRAIN_STREAM_KEYS, TerrainProfile, profile_terrain
+from wear_model import WearModel, apply_wear_model, builtin_model, load_wear_model
+from weather_cache import WeatherCache
+
 
 class WeatherCondition(Enum):
     """Enumeration of weather conditions that affect brake pad wear."""
@@ -59,12 +72,334 @@ class StravaRide:
     terrain_type: Optional[TerrainType] = None
     temperature_celsius: Optional[float] = None
     precipitation_mm: Optional[float] = None
+    terrain_multiplier: Optional[float] = None  # Grade-profile mix; overrides terrain_type when set
+    gear_id: Optional[str] = None  # Strava bike ID
+
+
+# Integer codes used by RideTable: a code is the index into these tuples.
+WEATHER_CODES = tuple(WeatherCondition)
+TERRAIN_CODES = tuple(TerrainType)
+UNKNOWN_CODE = -1
+
+# Gear ID used for rides recorded without a bike
+NO_GEAR = ""
+
+
+def _parse_start_epoch(start_date: str) -> int:
+    """Convert a Strava ISO-8601 start date to epoch seconds."""
+    return int(datetime.fromisoformat(start_date.replace("Z", "+00:00")).timestamp())
+
+
+def classify_terrain_codes(elevation_gain_feet, distance_miles) -> np.ndarray:
+    """
+    Vectorized terrain classification by elevation gain per mile.
+    
+    Uses the same thresholds as StravaBrakeWearEstimator._determine_terrain_type.
+    
+    Returns:
+        Array of terrain codes
+    """
+    elevation_gain_feet = np.asarray(elevation_gain_feet, dtype=float)
+    distance_miles = np.asarray(distance_miles, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        elevation_per_mile = elevation_gain_feet / distance_miles
+    codes = np.select(
+        [distance_miles == 0, elevation_per_mile < 50, elevation_per_mile < 200],
+        [TERRAIN_CODES.index(TerrainType.FLAT), TERRAIN_CODES.index(TerrainType.FLAT),
+         TERRAIN_CODES.index(TerrainType.HILLY)],
+        default=TERRAIN_CODES.index(TerrainType.MOUNTAINOUS)
+    )
+    return codes.astype(np.int8)
+
+
+class RideTable:
+    """
+    Columnar (struct-of-arrays) collection of Strava rides.
+    
+    Each ride field is stored as one typed NumPy array, weather and terrain as
+    int8 codes (UNKNOWN_CODE when missing) and start dates as epoch seconds.
+    Bikes are stored as gear_code, an index into the table's `gear_ids` list.
+    StravaRide objects are only created on demand by `ride()` or iteration.
+    """
+    
+    COLUMNS = {
+        "id": np.int64,
+        "distance_miles": np.float64,
+        "total_elevation_gain_feet": np.float64,
+        "average_speed_mph": np.float64,
+        "max_speed_mph": np.float64,
+        "moving_time_seconds": np.int32,
+        "start_epoch": np.int64,
+        "weather_code": np.int8,
+        "terrain_code": np.int8,
+        "temperature_celsius": np.float64,  # NaN when unknown
+        "precipitation_mm": np.float32,  # NaN when unknown
+        "terrain_multiplier": np.float64,  # NaN to use terrain_code
+        "gear_code": np.int32,  # Index into gear_ids
+    }
+    
+    def __init__(self, columns: Dict[str, Any], names: Optional[List[str]] = None,
+                 gear_ids: Optional[List[str]] = None):
+        """
+        Initialize the table from column arrays.
+        
+        Args:
+            columns: Mapping of column name (see COLUMNS) to array-like
+            names: Optional ride names, one per ride
+            gear_ids: Gear ID for each gear_code (default: every ride has no gear)
+        """
+        for column, dtype in self.COLUMNS.items():
+            setattr(self, column, np.ascontiguousarray(columns[column], dtype=dtype))
+        self.names = list(names) if names is not None else ["Unknown Ride"] * len(self.id)
+        self.gear_ids = list(gear_ids) if gear_ids is not None else [NO_GEAR]
+    
+    def __len__(self) -> int:
+        return len(self.id)
+    
+    def __iter__(self) -> Iterator[StravaRide]:
+        for index in range(len(self)):
+            yield self.ride(index)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the numeric columns."""
+        return sum(getattr(self, column).nbytes for column in self.COLUMNS)
+    
+    def column(self, name: str) -> np.ndarray:
+        """Get a column array by name."""
+        return getattr(self, name)
+    
+    def ride(self, index: int) -> StravaRide:
+        """
+        Materialize a single ride as a StravaRide.
+        
+        Args:
+            index: Row index
+            
+        Returns:
+            StravaRide for that row
+        """
+        weather_code = int(self.weather_code[index])
+        terrain_code = int(self.terrain_code[index])
+        temperature = float(self.temperature_celsius[index])
+        precipitation = float(self.precipitation_mm[index])
+        terrain_multiplier = float(self.terrain_multiplier[index])
+        return StravaRide(
+            id=int(self.id[index]),
+            name=self.names[index],
+            distance_miles=float(self.distance_miles[index]),
+            total_elevation_gain_feet=float(self.total_elevation_gain_feet[index]),
+            average_speed_mph=float(self.average_speed_mph[index]),
+            max_speed_mph=float(self.max_speed_mph[index]),
+            moving_time_seconds=int(self.moving_time_seconds[index]),
+            start_date=datetime.fromtimestamp(int(self.start_epoch[index]), tz=timezone.utc),
+            weather_condition=WEATHER_CODES[weather_code] if weather_code != UNKNOWN_CODE else None,
+            terrain_type=TERRAIN_CODES[terrain_code] if terrain_code != UNKNOWN_CODE else None,
+            temperature_celsius=None if math.isnan(temperature) else temperature,
+            precipitation_mm=None if math.isnan(precipitation) else precipitation,
+            terrain_multiplier=None if math.isnan(terrain_multiplier) else terrain_multiplier,
+            gear_id=self.gear_ids[self.gear_code[index]] or None
+        )
+    
+    def take(self, indices) -> "RideTable":
+        """
+        Select rows by index array or boolean mask.
+        
+        Args:
+            indices: Integer indices or boolean mask
+            
+        Returns:
+            New RideTable with the selected rows
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        columns = {column: getattr(self, column)[indices] for column in self.COLUMNS}
+        return RideTable(columns, [self.names[i] for i in indices.tolist()], self.gear_ids)
+    
+    def gear_mask(self, gear_id: Optional[str]) -> np.ndarray:
+        """Boolean mask of rides on one bike (None for rides without gear)."""
+        gear_id = gear_id or NO_GEAR
+        if gear_id not in self.gear_ids:
+            return np.zeros(len(self), dtype=bool)
+        return self.gear_code == self.gear_ids.index(gear_id)
+    
+    @classmethod
+    def from_rides(cls, rides: Iterable[StravaRide]) -> "RideTable":
+        """
+        Build a table from StravaRide objects.
+        
+        Args:
+            rides: Iterable of StravaRide objects
+            
+        Returns:
+            RideTable with one row per ride
+        """
+        columns: Dict[str, List[Any]] = {column: [] for column in cls.COLUMNS}
+        names = []
+        gear_codes: Dict[str, int] = {}
+        for ride in rides:
+            columns["id"].append(ride.id)
+            columns["distance_miles"].append(ride.distance_miles)
+            columns["total_elevation_gain_feet"].append(ride.total_elevation_gain_feet)
+            columns["average_speed_mph"].append(ride.average_speed_mph)
+            columns["max_speed_mph"].append(ride.max_speed_mph)
+            columns["moving_time_seconds"].append(ride.moving_time_seconds)
+            columns["start_epoch"].append(int(ride.start_date.timestamp()))
+            columns["weather_code"].append(
+                WEATHER_CODES.index(ride.weather_condition) if ride.weather_condition else UNKNOWN_CODE
+            )
+            columns["terrain_code"].append(
+                TERRAIN_CODES.index(ride.terrain_type) if ride.terrain_type else UNKNOWN_CODE
+            )
+            columns["temperature_celsius"].append(
+                ride.temperature_celsius if ride.temperature_celsius is not None else np.nan
+            )
+            columns["precipitation_mm"].append(
+                ride.precipitation_mm if ride.precipitation_mm is not None else np.nan
+            )
+            columns["terrain_multiplier"].append(
+                ride.terrain_multiplier if ride.terrain_multiplier is not None else np.nan
+            )
+            columns["gear_code"].append(gear_codes.setdefault(ride.gear_id or NO_GEAR, len(gear_codes)))
+            names.append(ride.name)
+        return cls(columns, names, list(gear_codes) or None)
+    
+    @classmethod
+    def from_activities(cls, activities: Iterable[Dict[str, Any]]) -> "RideTable":
+        """
+        Build a table straight from Strava activity JSON.
+        
+        Unit conversions and terrain classification match
+        StravaBrakeWearEstimator.process_strava_ride; weather is left unknown.
+        
+        Args:
+            activities: Iterable of raw activity dicts from the Strava API
+            
+        Returns:
+            RideTable with one row per activity
+        """
+        ids, names, distance, elevation, average_speed, max_speed = [], [], [], [], [], []
+        moving_time, start_epoch, gear_code = [], [], []
+        gear_codes: Dict[str, int] = {}
+        for activity in activities:
+            ids.append(activity["id"])
+            names.append(activity.get("name", "Unknown Ride"))
+            distance.append(activity.get("distance", 0))
+            elevation.append(activity.get("total_elevation_gain", 0))
+            average_speed.append(activity.get("average_speed", 0))
+            max_speed.append(activity.get("max_speed", 0))
+            moving_time.append(activity.get("moving_time", 0))
+            start_epoch.append(_parse_start_epoch(activity.get("start_date", "")))
+            gear_code.append(gear_codes.setdefault(activity.get("gear_id") or NO_GEAR, len(gear_codes)))
+        
+        # Convert meters to miles, m/s to mph and meters to feet
+        distance_miles = np.array(distance, dtype=float) * 0.000621371
+        elevation_gain_feet = np.array(elevation, dtype=float) * 3.28084
+        count = len(ids)
+        return cls({
+            "id": ids,
+            "distance_miles": distance_miles,
+            "total_elevation_gain_feet": elevation_gain_feet,
+            "average_speed_mph": np.array(average_speed, dtype=float) * 2.23694,
+            "max_speed_mph": np.array(max_speed, dtype=float) * 2.23694,
+            "moving_time_seconds": moving_time,
+            "start_epoch": start_epoch,
+            "weather_code": np.full(count, UNKNOWN_CODE),
+            "terrain_code": classify_terrain_codes(elevation_gain_feet, distance_miles),
+            "temperature_celsius": np.full(count, np.nan),
+            "precipitation_mm": np.full(count, np.nan),
+            "terrain_multiplier": np.full(count, np.nan),
+            "gear_code": gear_code,
+        }, names, list(gear_codes) or None)
+    
+    @classmethod
+    def from_activity_pages(cls, pages: Iterable[List[Dict[str, Any]]]) -> "RideTable":
+        """
+        Build a table from pages of Strava activity JSON.
+        
+        Each page is converted to columns as it arrives, so the raw JSON for only
+        one page is held at a time.
+        
+        Args:
+            pages: Iterable of activity lists (one list per API page)
+            
+        Returns:
+            RideTable with one row per activity
+        """
+        return cls.concat([cls.from_activities(page) for page in pages])
+    
+    @classmethod
+    def concat(cls, tables: List["RideTable"]) -> "RideTable":
+        """Concatenate several tables into one."""
+        if not tables:
+            return cls.from_activities([])
+        columns = {
+            column: np.concatenate([table.column(column) for table in tables])
+            for column in cls.COLUMNS
+        }
+        names = [name for table in tables for name in table.names]
+        
+        # Merge the gear vocabularies and remap each table's codes into it
+        gear_codes: Dict[str, int] = {}
+        remapped = []
+        for table in tables:
+            mapping = np.array([gear_codes.setdefault(g, len(gear_codes)) for g in table.gear_ids], dtype=np.int32)
+            remapped.append(mapping[table.gear_code])
+        columns["gear_code"] = np.concatenate(remapped)
+        return cls(columns, names, list(gear_codes))
+
+
+class WearAccumulator:
+    """
+    Folds per-ride wear results into running totals in constant memory.
+    
+    Optionally keeps the `top_n` rides with the most wear in a bounded heap.
+    """
+    
+    def __init__(self, top_n: int = 0):
+        """
+        Initialize the accumulator.
+        
+        Args:
+            top_n: Number of worst rides to keep (0 keeps none)
+        """
+        self.top_n = top_n
+        self.total_wear_mm = 0.0
+        self.total_distance_miles = 0.0
+        self.ride_count = 0
+        self._worst: List[Tuple[float, int, Dict[str, Union[float, str]]]] = []
+    
+    def add(self, ride_wear: Dict[str, Union[float, str]], distance_miles: float):
+        """
+        Add one ride's wear result.
+        
+        Args:
+            ride_wear: Result of StravaBrakeWearEstimator.estimate_wear_for_ride
+            distance_miles: Distance of the ride in miles
+        """
+        self.total_wear_mm += float(ride_wear["wear_mm"])
+        self.total_distance_miles += distance_miles
+        self.ride_count += 1
+        
+        if self.top_n > 0:
+            # The ride count breaks ties so dicts are never compared
+            item = (float(ride_wear["wear_mm"]), self.ride_count, ride_wear)
+            if len(self._worst) < self.top_n:
+                heapq.heappush(self._worst, item)
+            elif item[0] > self._worst[0][0]:
+                heapq.heapreplace(self._worst, item)
+    
+    def worst_rides(self) -> List[Dict[str, Union[float, str]]]:
+        """Get the kept worst rides, most wear first."""
+        return [ride_wear for _, _, ride_wear in sorted(self._worst, key=lambda item: (-item[0], item[1]))]
 
 
 class StravaAPI:
     """Handles Strava API authentication and data retrieval."""
     
-    def __init__(self, client_id: str, client_secret: str, access_token: Optional[str] = None):
+    def __init__(self, client_id: str, client_secret: str, access_token: Optional[str] = None,
+                 session: Optional[requests.Session] = None, activity_cache: Optional[ActivityCache] = None):
         """
         Initialize Strava API client.
         
@@ -72,10 +407,15 @@ class StravaAPI:
             client_id: Strava API client ID
             client_secret: Strava API client secret
             access_token: Optional access token (if already authenticated)
+            session: HTTP session (default: the shared pooled session)
+            activity_cache: Optional ActivityCache for get_activity_details
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.access_token = access_token
+        self.session = session or get_session()
+        self.activity_cache = activity_cache
+        self.token_data: Dict[str, Any] = {}  # Last token response (refresh token rotates)
         self.base_url = "https://www.strava.com/api/v3"
         
     def authenticate(self, authorization_code: str) -> str:
@@ -96,9 +436,10 @@ class StravaAPI:
             "grant_type": "authorization_code"
         }
         
-        response = requests.post(url, data=data)
+        response = self.session.post(url, data=data)
         if response.status_code == 200:
             token_data = response.json()
+            self.token_data = token_data
             self.access_token = token_data["access_token"]
             return self.access_token
         else:
@@ -122,19 +463,40 @@ class StravaAPI:
             "grant_type": "refresh_token"
         }
         
-        response = requests.post(url, data=data)
+        response = self.session.post(url, data=data)
         if response.status_code == 200:
             token_data = response.json()
+            self.token_data = token_data
             self.access_token = token_data["access_token"]
             return self.access_token
         else:
             raise Exception(f"Token refresh failed: {response.text}")
     
+    def get_athlete(self) -> Dict[str, Any]:
+        """
+        Get the authenticated athlete's profile, including their bikes.
+        
+        Returns:
+            Athlete data, e.g. {"id": ..., "bikes": [{"id": "b123", "name": ...}, ...]}
+        """
+        if not self.access_token:
+            raise Exception("Not authenticated. Call authenticate() first.")
+        
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        response = self.session.get(f"{self.base_url}/athlete", headers=headers)
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Failed to get athlete: {response.text}")
+    
     def get_activities(self, after: Optional[datetime] = None, before: Optional[datetime] = None, 
                       activity_type: str = "Ride", per_page: int = 200) -> List[Dict[str, Any]]:
         """
         Get activities from Strava API.
         
+        Every page in the window is fetched; use iter_activities to process long
+        histories without holding them in memory.
+        
         Args:
             after: Get activities after this date
             before: Get activities before this date
@@ -144,13 +506,31 @@ class StravaAPI:
         Returns:
             List of activity data
         """
+        return list(self.iter_activities(after, before, activity_type, per_page))
+    
+    def get_activity_page(self, page: int, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                          activity_type: str = "Ride", per_page: int = 200) -> List[Dict[str, Any]]:
+        """
+        Get one page of activities from Strava API.
+        
+        Args:
+            page: Page number (starting at 1)
+            after: Get activities after this date
+            before: Get activities before this date
+            activity_type: Type of activity (Ride, Run, etc.)
+            per_page: Number of activities per page
+            
+        Returns:
+            List of activity data (shorter than per_page on the last page)
+        """
         if not self.access_token:
             raise Exception("Not authenticated. Call authenticate() first.")
         
         headers = {"Authorization": f"Bearer {self.access_token}"}
         params = {
             "type": activity_type,
-            "per_page": per_page
+            "per_page": per_page,
+            "page": page
         }
         
         if after:
@@ -159,13 +539,71 @@ class StravaAPI:
             params["before"] = int(before.timestamp())
         
         url = f"{self.base_url}/athlete/activities"
-        response = requests.get(url, headers=headers, params=params)
+        response = self.session.get(url, headers=headers, params=params)
         
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Failed to get activities: {response.text}")
     
+    def iter_activity_pages(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                            activity_type: str = "Ride", per_page: int = 200) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily walk the pages of activities in a window.
+        
+        While the caller works on one page, the next is downloaded on a background
+        thread, so at most two pages are held at a time. Closing the generator (or
+        breaking out of a loop over it) cancels the prefetch and requests no more pages.
+        
+        Args:
+            after: Get activities after this date
+            before: Get activities before this date
+            activity_type: Type of activity (Ride, Run, etc.)
+            per_page: Number of activities per page
+            
+        Yields:
+            Non-empty lists of activity data, in Strava's page order
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="strava-page")
+        pending = None
+        try:
+            page_number = 1
+            pending = executor.submit(self.get_activity_page, page_number, after, before, activity_type, per_page)
+            while pending is not None:
+                page = pending.result()
+                pending = None
+                if len(page) >= per_page:
+                    page_number += 1
+                    pending = executor.submit(self.get_activity_page, page_number, after, before,
+                                              activity_type, per_page)
+                if page:
+                    yield page
+        finally:
+            if pending is not None:
+                pending.cancel()
+            executor.shutdown(wait=False)
+    
+    def iter_activities(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                        activity_type: str = "Ride", per_page: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over every activity in a window, prefetching pages.
+        
+        Args:
+            after: Get activities after this date
+            before: Get activities before this date
+            activity_type: Type of activity (Ride, Run, etc.)
+            per_page: Number of activities per page
+            
+        Yields:
+            Activity data
+        """
+        pages = self.iter_activity_pages(after, before, activity_type, per_page)
+        try:
+            for page in pages:
+                yield from page
+        finally:
+            pages.close()
+    
     def get_activity_details(self, activity_id: int) -> Dict[str, Any]:
         """
         Get detailed activity data including segments and weather.
@@ -176,30 +614,73 @@ class StravaAPI:
         Returns:
             Detailed activity data
         """
+        cached = self.activity_cache.get(activity_id) if self.activity_cache else None
+        if cached and cached.fresh:
+            return cached.details
+        
         if not self.access_token:
             raise Exception("Not authenticated. Call authenticate() first.")
         
         headers = {"Authorization": f"Bearer {self.access_token}"}
+        if cached:
+            headers.update(cached.conditional_headers())
         url = f"{self.base_url}/activities/{activity_id}"
         
-        response = requests.get(url, headers=headers)
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            self.activity_cache.revalidated(activity_id)
+            return cached.details
+        elif response.status_code == 200:
+            details = response.json()
+            if self.activity_cache:
+                self.activity_cache.put(activity_id, details, response.headers.get("ETag"),
+                                        response.headers.get("Last-Modified"))
+            return details
+        else:
+            raise Exception(f"Failed to get activity details: {response.text}")
+    
+    def get_activity_streams(self, activity_id: int,
+                             keys: Tuple[str, ...] = STREAM_KEYS) -> Dict[str, Any]:
+        """
+        Get sample streams (time, distance, altitude, speed, ...) for an activity.
+        
+        Args:
+            activity_id: Strava activity ID
+            keys: Stream types to request
+            
+        Returns:
+            Streams keyed by type, e.g. {"time": {"data": [...]}, ...}
+        """
+        if not self.access_token:
+            raise Exception("Not authenticated. Call authenticate() first.")
+        
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        url = f"{self.base_url}/activities/{activity_id}/streams"
+        params = {"keys": ",".join(keys), "key_by_type": "true"}
+        
+        response = self.session.get(url, headers=headers, params=params)
         if response.status_code == 200:
             return response.json()
         else:
-            raise Exception(f"Failed to get activity details: {response.text}")
+            raise Exception(f"Failed to get activity streams: {response.text}")
 
 
 class WeatherAPI:
     """Handles weather data retrieval for ride dates and locations."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[WeatherCache] = None,
+                 session: Optional[requests.Session] = None):
         """
         Initialize weather API client.
         
         Args:
             api_key: OpenWeatherMap API key
+            cache: Optional WeatherCache shared between lookups (and processes)
+            session: HTTP session (default: the shared pooled session)
         """
         self.api_key = api_key
+        self.cache = cache
+        self.session = session or get_session()
         self.base_url = "https://api.openweathermap.org/data/2.5"
     
     def get_weather_for_ride(self, lat: float, lon: float, date: datetime) -> Dict[str, Any]:
@@ -214,6 +695,11 @@ class WeatherAPI:
         Returns:
             Weather data dictionary
         """
+        if self.cache:
+            cached = self.cache.get(lat, lon, date)
+            if cached is not None:
+                return cached
+        
         # Convert to Unix timestamp
         timestamp = int(date.timestamp())
         
@@ -226,11 +712,14 @@ class WeatherAPI:
             "units": "metric"
         }
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         if response.status_code == 200:
             data = response.json()
             if data.get("data"):
-                return data["data"][0]
+                weather_data = data["data"][0]
+                if self.cache:
+                    self.cache.put(lat, lon, date, weather_data)
+                return weather_data
         
         return {}
 
@@ -238,41 +727,34 @@ class WeatherAPI:
 class StravaBrakeWearEstimator:
     """Estimates brake pad wear based on Strava ride data."""
     
-    # Weather wear multipliers (higher = more wear)
-    WEATHER_MULTIPLIERS = {
-        WeatherCondition.DRY: 1.0,
-        WeatherCondition.WET: 1.3,
-        WeatherCondition.RAINY: 1.5,
-        WeatherCondition.SNOWY: 1.8,
-        WeatherCondition.MUDDY: 2.2,
-        WeatherCondition.SANDY: 2.5,
-    }
+    # Recorded alongside stored wear so stale totals can be rebuilt when the model changes
+    WEAR_MODEL_VERSION = builtin_model().version
     
-    # Terrain wear multipliers based on elevation gain per mile
+    # Built-in tables (see wear_model.py); instances use the loaded wear model
+    WEATHER_MULTIPLIERS = builtin_model().weather_table(WeatherCondition)
+    TERRAIN_MULTIPLIERS = builtin_model().terrain_table(TerrainType)
+    MATERIAL_WEAR_RATES = builtin_model().material_wear_rates
+    
+    # Terrain types by elevation gain per mile
     ELEVATION_TERRAIN_THRESHOLDS = {
         0: TerrainType.FLAT,      # 0-50 ft/mile
         50: TerrainType.HILLY,    # 50-200 ft/mile
         200: TerrainType.MOUNTAINOUS,  # 200+ ft/mile
     }
     
-    TERRAIN_MULTIPLIERS = {
-        TerrainType.FLAT: 0.8,
-        TerrainType.HILLY: 1.2,
-        TerrainType.MOUNTAINOUS: 1.6,
-        TerrainType.URBAN: 1.1,
-        TerrainType.OFF_ROAD: 1.4,
-    }
-    
-    # Material wear rates (mm per 1000 km under standard conditions)
-    MATERIAL_WEAR_RATES = {
-        "organic": 0.15,
-        "semi-metallic": 0.12,
-        "ceramic": 0.08,
-        "sintered": 0.10,
+    # Terrain whose multiplier applies to each slice of a grade profile
+    # (brakes work on descents, so climbs count as flat)
+    GRADE_BAND_TERRAIN = {
+        "flat": TerrainType.FLAT,
+        "climbing": TerrainType.FLAT,
+        "2-4%": TerrainType.HILLY,
+        "4-8%": TerrainType.MOUNTAINOUS,
+        "8%+": TerrainType.MOUNTAINOUS,
     }
     
     def __init__(self, brake_pad_specs: BrakePadSpecs, strava_api: StravaAPI, 
-                 weather_api: Optional[WeatherAPI] = None):
+                 weather_api: Optional[WeatherAPI] = None, max_weather_requests: int = 8,
+                 wear_model: Optional[WearModel] = None, terrain_from_streams: bool = False):
         """
         Initialize the estimator.
         
@@ -280,10 +762,28 @@ class StravaBrakeWearEstimator:
             brake_pad_specs: Brake pad specifications
             strava_api: Strava API client
             weather_api: Optional weather API client
+            max_weather_requests: Maximum weather lookups in flight at once
+            wear_model: Wear multiplier tables (default: the model file, loaded once per
+                process, or built-in tables)
+            terrain_from_streams: Fetch each processed ride's distance/altitude streams and
+                set its terrain multiplier from the grade profile (one extra request per ride)
         """
         self.brake_pad_specs = brake_pad_specs
         self.strava_api = strava_api
         self.weather_api = weather_api
+        self.max_weather_requests = max_weather_requests
+        self.terrain_from_streams = terrain_from_streams
+        self.use_wear_model(wear_model or load_wear_model())
+    
+    def use_wear_model(self, wear_model: WearModel):
+        """
+        Replace this estimator's multiplier tables with those of a wear model.
+        
+        Tables a subclass overrides at class level (including WEAR_MODEL_VERSION)
+        keep the subclass's values. Ledger totals scored with another model
+        version report `needs_rebuild`.
+        """
+        apply_wear_model(self, StravaBrakeWearEstimator, wear_model, WeatherCondition, TerrainType)
     
     def _determine_terrain_type(self, elevation_gain_feet: float, distance_miles: float) -> TerrainType:
         """
@@ -308,6 +808,61 @@ class StravaBrakeWearEstimator:
         else:
             return TerrainType.MOUNTAINOUS
     
+    def terrain_multiplier_for_profile(self, profile: TerrainProfile) -> float:
+        """
+        Blend terrain multipliers by the share of distance in each grade band.
+        
+        Args:
+            profile: Grade profile of the ride
+            
+        Returns:
+            Distance-weighted terrain multiplier
+        """
+        shares = dict(profile.descent_shares, flat=profile.flat_share, climbing=profile.climbing_share)
+        return sum(
+            share * self.TERRAIN_MULTIPLIERS.get(self.GRADE_BAND_TERRAIN[band], 1.0)
+            for band, share in shares.items()
+        )
+    
+    def apply_terrain_profile(self, ride: StravaRide, streams: Any, window_m: float = 100.0) -> Optional[TerrainProfile]:
+        """
+        Set a ride's terrain multiplier from its altitude and distance streams.
+        
+        Args:
+            ride: StravaRide to update
+            streams: Strava streams response or dict of arrays (needs distance and altitude)
+            window_m: Grade smoothing window in metres
+            
+        Returns:
+            TerrainProfile of the ride, or None (ride unchanged) if a stream is missing or empty
+        """
+        arrays = streams_to_arrays(streams)
+        if any(len(arrays.get(key, ())) < 2 for key in TERRAIN_STREAM_KEYS):
+            return None
+        profile = profile_terrain(arrays["distance"], arrays["altitude"], window_m)
+        ride.terrain_multiplier = self.terrain_multiplier_for_profile(profile)
+        return profile
+    
+    def profile_ride_terrain(self, ride: StravaRide) -> Optional[TerrainProfile]:
+        """
+        Fetch a ride's distance and altitude streams and apply its terrain profile.
+        
+        Rides whose streams cannot be fetched (manual entries, API errors) keep
+        the summary terrain type.
+        
+        Args:
+            ride: StravaRide to update
+            
+        Returns:
+            TerrainProfile of the ride, or None if no profile could be built
+        """
+        try:
+            streams = self.strava_api.get_activity_streams(ride.id, TERRAIN_STREAM_KEYS)
+        except Exception as e:
+            print(f"   ⚠️  No terrain streams for ride {ride.id}: {e}")
+            return None
+        return self.apply_terrain_profile(ride, streams)
+    
     def _determine_weather_condition(self, weather_data: Dict[str, Any]) -> WeatherCondition:
         """
         Determine weather condition from weather API data.
@@ -408,7 +963,7 @@ class StravaBrakeWearEstimator:
             temperature_celsius = weather_data.get("temp")
             precipitation_mm = weather_data.get("rain", {}).get("1h", 0)
         
-        return StravaRide(
+        ride = StravaRide(
             id=activity_data["id"],
             name=activity_data.get("name", "Unknown Ride"),
             distance_miles=distance_miles,
@@ -420,8 +975,39 @@ class StravaBrakeWearEstimator:
             weather_condition=weather_condition,
             terrain_type=terrain_type,
             temperature_celsius=temperature_celsius,
-            precipitation_mm=precipitation_mm
+            precipitation_mm=precipitation_mm,
+            gear_id=activity_data.get("gear_id")
         )
+        if self.terrain_from_streams:
+            self.profile_ride_terrain(ride)
+        return ride
+    
+    def process_strava_rides(self, activities: Iterable[Dict[str, Any]],
+                             max_workers: Optional[int] = None) -> List[StravaRide]:
+        """
+        Process many activities, fetching their weather concurrently.
+        
+        Weather lookups (and terrain streams with `terrain_from_streams`) are the
+        slow part of process_strava_ride, so they run on a thread pool with at
+        most `max_workers` requests in flight. The returned rides are in the
+        same order as the activities.
+        
+        Args:
+            activities: Raw activity data from Strava API
+            max_workers: Maximum concurrent weather lookups (default: max_weather_requests)
+            
+        Returns:
+            List of processed StravaRide objects
+        """
+        activities = list(activities)
+        max_workers = max_workers or self.max_weather_requests
+        
+        fetches = self.weather_api or self.terrain_from_streams
+        if not fetches or max_workers <= 1 or len(activities) <= 1:
+            return [self.process_strava_ride(activity) for activity in activities]
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(activities))) as executor:
+            return list(executor.map(self.process_strava_ride, activities))
     
     def estimate_wear_for_ride(self, ride: StravaRide, rider_weight_kg: float = 70.0, 
                               bike_weight_kg: float = 15.0) -> Dict[str, Union[float, str]]:
@@ -449,6 +1035,8 @@ class StravaBrakeWearEstimator:
             ride.weather_condition or WeatherCondition.DRY, 1.0
         )
         terrain_multiplier = self.TERRAIN_MULTIPLIERS.get(ride.terrain_type or TerrainType.FLAT, 1.0)
+        if ride.terrain_multiplier is not None:
+            terrain_multiplier = ride.terrain_multiplier
         
         # Speed factor (higher speeds = more wear)
         speed_factor = min(1.5, max(0.5, ride.average_speed_mph / 30.0))
@@ -495,19 +1083,231 @@ class StravaBrakeWearEstimator:
             "temp_factor": temp_factor
         }
     
-    def estimate_total_wear(self, rides: List[StravaRide], rider_weight_kg: float = 70.0,
+    def _table_factors(self, table: RideTable, rider_weight_kg: float = 70.0,
+                       bike_weight_kg: float = 15.0, base_wear_rate=None) -> Dict[str, np.ndarray]:
+        """
+        Compute the wear factors for every ride in a table in one vectorized pass.
+        
+        Mirrors estimate_wear_for_ride (including its DRY/FLAT defaults for
+        unknown weather and terrain), so the unrounded wear is identical.
+        
+        Args:
+            table: RideTable of rides
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            base_wear_rate: Per-ride material wear rates (default: this estimator's pads)
+            
+        Returns:
+            Dictionary of per-ride factor arrays plus unrounded "wear_mm"
+        """
+        if base_wear_rate is None:
+            base_wear_rate = self.MATERIAL_WEAR_RATES.get(
+                self.brake_pad_specs.material, 0.12
+            )
+        
+        # Unknown codes fall back to DRY / FLAT like the per-ride path
+        weather_lookup = np.array([self.WEATHER_MULTIPLIERS.get(c, 1.0) for c in WEATHER_CODES])
+        terrain_lookup = np.array([self.TERRAIN_MULTIPLIERS.get(t, 1.0) for t in TERRAIN_CODES])
+        weather_codes = np.where(
+            table.weather_code == UNKNOWN_CODE, WEATHER_CODES.index(WeatherCondition.DRY), table.weather_code
+        )
+        terrain_codes = np.where(
+            table.terrain_code == UNKNOWN_CODE, TERRAIN_CODES.index(TerrainType.FLAT), table.terrain_code
+        )
+        weather_multiplier = weather_lookup[weather_codes]
+        terrain_multiplier = np.where(
+            np.isnan(table.terrain_multiplier), terrain_lookup[terrain_codes], table.terrain_multiplier
+        )
+        
+        speed_factor = np.minimum(1.5, np.maximum(0.5, table.average_speed_mph / 30.0))
+        
+        braking_frequency = np.minimum(
+            10.0,
+            3.0 +
+            np.minimum(3.0, table.total_elevation_gain_feet / 1000.0) +
+            np.minimum(2.0, table.average_speed_mph / 20.0) +
+            np.where(table.distance_miles < 10, 1.5, 1.0)
+        )
+        braking_factor = braking_frequency / 5.0
+        
+        total_weight = rider_weight_kg + bike_weight_kg
+        weight_factor = np.full(len(table), min(1.5, max(0.8, total_weight / 100.0)))
+        
+        temperature = table.temperature_celsius
+        temp_factor = np.where((temperature < -10) | (temperature > 40), 1.2, 1.0)
+        
+        km_ridden = table.distance_miles * 1.60934
+        wear_mm = (
+            base_wear_rate *
+            (km_ridden / 1000.0) *
+            weather_multiplier *
+            terrain_multiplier *
+            speed_factor *
+            braking_factor *
+            weight_factor *
+            temp_factor
+        )
+        
+        return {
+            "km_ridden": km_ridden,
+            "weather_multiplier": weather_multiplier,
+            "terrain_multiplier": terrain_multiplier,
+            "speed_factor": speed_factor,
+            "braking_factor": braking_factor,
+            "weight_factor": weight_factor,
+            "temp_factor": temp_factor,
+            "wear_mm": wear_mm
+        }
+    
+    def estimate_wear_for_table(self, table: RideTable, rider_weight_kg: float = 70.0,
+                                bike_weight_kg: float = 15.0) -> Dict[str, np.ndarray]:
+        """
+        Estimate brake pad wear for every ride in a RideTable.
+        
+        Args:
+            table: RideTable of rides
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            
+        Returns:
+            Dictionary of per-ride arrays, rounded like estimate_wear_for_ride
+        """
+        factors = self._table_factors(table, rider_weight_kg, bike_weight_kg)
+        return {
+            "ride_id": table.id,
+            "wear_mm": np.round(factors["wear_mm"], 4),
+            "weather_multiplier": factors["weather_multiplier"],
+            "terrain_multiplier": factors["terrain_multiplier"],
+            "speed_factor": np.round(factors["speed_factor"], 2),
+            "braking_factor": np.round(factors["braking_factor"], 2),
+            "weight_factor": np.round(factors["weight_factor"], 2),
+            "temp_factor": factors["temp_factor"]
+        }
+    
+    def _table_ride_details(self, table: RideTable,
+                            table_wear: Dict[str, np.ndarray]) -> List[Dict[str, Union[float, str]]]:
+        """Convert per-ride wear arrays into estimate_wear_for_ride-style dicts."""
+        weather_names = [c.value for c in WEATHER_CODES]
+        terrain_names = [t.value for t in TERRAIN_CODES]
+        columns = [
+            table_wear["ride_id"].tolist(), table.names, table_wear["wear_mm"].tolist(),
+            table.weather_code.tolist(), table.terrain_code.tolist(),
+            table_wear["weather_multiplier"].tolist(), table_wear["terrain_multiplier"].tolist(),
+            table_wear["speed_factor"].tolist(), table_wear["braking_factor"].tolist(),
+            table_wear["weight_factor"].tolist(), table_wear["temp_factor"].tolist()
+        ]
+        return [
+            {
+                "ride_id": ride_id,
+                "ride_name": name,
+                "wear_mm": wear_mm,
+                "weather_condition": weather_names[weather_code] if weather_code != UNKNOWN_CODE else "unknown",
+                "terrain_type": terrain_names[terrain_code] if terrain_code != UNKNOWN_CODE else "unknown",
+                "weather_multiplier": weather_multiplier,
+                "terrain_multiplier": terrain_multiplier,
+                "speed_factor": speed_factor,
+                "braking_factor": braking_factor,
+                "weight_factor": weight_factor,
+                "temp_factor": temp_factor
+            }
+            for (ride_id, name, wear_mm, weather_code, terrain_code, weather_multiplier,
+                 terrain_multiplier, speed_factor, braking_factor, weight_factor, temp_factor) in zip(*columns)
+        ]
+    
+    def estimate_wear_from_streams(self, ride: StravaRide, streams: Any, rider_weight_kg: float = 70.0,
+                                   bike_weight_kg: float = 15.0) -> Dict[str, Union[float, int, str]]:
+        """
+        Estimate brake pad wear for a ride from the braking work in its streams.
+        
+        Replaces the summary heuristics (terrain, speed, braking frequency and
+        weight factors) with braking energy measured from the time, velocity,
+        altitude and distance streams. The ride's terrain multiplier is set from
+        the grade profile of the same streams, so the ledger and later summary
+        estimates use it too.
+        
+        Args:
+            ride: StravaRide object (for weather and temperature)
+            streams: Strava streams response or dict of arrays
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            
+        Returns:
+            Dictionary with wear estimates and braking statistics
+            
+        Raises:
+            ValueError: If the streams have neither speed nor distance over time
+        """
+        arrays = streams_to_arrays(streams)
+        
+        # Manual and some device uploads have no velocity_smooth stream
+        speed_source = "velocity_smooth"
+        velocity = arrays.get("velocity_smooth")
+        if velocity is None and "time" in arrays and "distance" in arrays:
+            speed_source = "distance"
+            velocity = velocity_from_distance(arrays["time"], arrays["distance"])
+        if velocity is None or "time" not in arrays:
+            raise ValueError(f"Activity {ride.id} has no time with velocity_smooth or distance streams")
+        self.apply_terrain_profile(ride, arrays)
+        
+        events = detect_braking_events(
+            arrays["time"],
+            velocity,
+            arrays.get("altitude"),
+            arrays.get("distance"),
+            total_mass_kg=rider_weight_kg + bike_weight_kg
+        )
+        
+        base_wear_rate = self.MATERIAL_WEAR_RATES.get(
+            self.brake_pad_specs.material, 0.12
+        )
+        weather_multiplier = self.WEATHER_MULTIPLIERS.get(
+            ride.weather_condition or WeatherCondition.DRY, 1.0
+        )
+        temp_factor = 1.0
+        if ride.temperature_celsius is not None:
+            if ride.temperature_celsius < -10 or ride.temperature_celsius > 40:
+                temp_factor = 1.2
+        
+        wear_mm = wear_from_braking_energy(
+            events.total_energy_joules, base_wear_rate, weather_multiplier, temp_factor
+        )
+        
+        return {
+            "ride_id": ride.id,
+            "ride_name": ride.name,
+            "wear_mm": round(wear_mm, 4),
+            "braking_events": len(events),
+            "speed_source": speed_source,
+            "braking_energy_kj": round(events.total_energy_joules / 1000.0, 1),
+            "max_event_energy_kj": round(float(events.energy_joules.max()) / 1000.0, 1) if len(events) else 0.0,
+            "weather_condition": ride.weather_condition.value if ride.weather_condition else "unknown",
+            "weather_multiplier": weather_multiplier,
+            "terrain_multiplier": ride.terrain_multiplier,
+            "temp_factor": temp_factor
+        }
+    
+    def estimate_total_wear(self, rides: Union[List[StravaRide], RideTable], rider_weight_kg: float = 70.0,
                            bike_weight_kg: float = 15.0) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
         """
         Estimate total brake pad wear across multiple rides.
         
         Args:
-            rides: List of StravaRide objects
+            rides: List of StravaRide objects or a RideTable
             rider_weight_kg: Rider weight in kilograms
             bike_weight_kg: Bike weight in kilograms
             
         Returns:
             Dictionary with total wear estimates
         """
+        if isinstance(rides, RideTable):
+            table_wear = self.estimate_wear_for_table(rides, rider_weight_kg, bike_weight_kg)
+            return self._summarize_wear(
+                float(table_wear["wear_mm"].sum()),
+                float(rides.distance_miles.sum()),
+                len(rides),
+                self._table_ride_details(rides, table_wear)
+            )
+        
         total_wear_mm = 0.0
         total_distance_miles = 0.0
         ride_details = []
@@ -518,18 +1318,98 @@ class StravaBrakeWearEstimator:
             total_distance_miles += ride.distance_miles
             ride_details.append(ride_wear)
         
+        return self._summarize_wear(total_wear_mm, total_distance_miles, len(rides), ride_details)
+    
+    def iter_ride_wear(self, rides: Iterable[StravaRide], rider_weight_kg: float = 70.0,
+                       bike_weight_kg: float = 15.0,
+                       accumulator: Optional[WearAccumulator] = None) -> Iterator[Dict[str, Union[float, str]]]:
+        """
+        Lazily yield per-ride wear estimates for any iterable of rides.
+        
+        Args:
+            rides: Iterable or generator of StravaRide objects
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            accumulator: Optional WearAccumulator to fold each ride into as it is yielded
+            
+        Yields:
+            Dictionary with wear estimates for each ride
+        """
+        for ride in rides:
+            ride_wear = self.estimate_wear_for_ride(ride, rider_weight_kg, bike_weight_kg)
+            if accumulator is not None:
+                accumulator.add(ride_wear, ride.distance_miles)
+            yield ride_wear
+    
+    def estimate_total_wear_streaming(self, rides: Iterable[StravaRide], rider_weight_kg: float = 70.0,
+                                      bike_weight_kg: float = 15.0,
+                                      top_n: int = 0) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
+        """
+        Estimate total brake pad wear in a single pass over an iterable of rides.
+        
+        Unlike estimate_total_wear, the rides are never held in memory, so this
+        works for arbitrarily long generators (e.g. backfills).
+        
+        Args:
+            rides: Iterable or generator of StravaRide objects
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            top_n: Number of worst rides to return in ride_details (0 for none)
+            
+        Returns:
+            Dictionary with total wear estimates; ride_details holds only the
+            top_n rides with the most wear
+        """
+        accumulator = WearAccumulator(top_n)
+        for _ in self.iter_ride_wear(rides, rider_weight_kg, bike_weight_kg, accumulator):
+            pass
+        return self.summarize_accumulator(accumulator)
+    
+    def summarize_accumulator(self, accumulator: WearAccumulator) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
+        """
+        Turn a filled WearAccumulator into the total wear summary.
+        
+        Args:
+            accumulator: Accumulator filled by iter_ride_wear
+            
+        Returns:
+            Dictionary with total wear estimates
+        """
+        return self._summarize_wear(
+            accumulator.total_wear_mm, accumulator.total_distance_miles,
+            accumulator.ride_count, accumulator.worst_rides()
+        )
+    
+    def _summarize_wear(self, total_wear_mm: float, total_distance_miles: float, ride_count: int,
+                        ride_details: List[Dict[str, Union[float, str]]],
+                        brake_pad_specs: Optional[BrakePadSpecs] = None) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
+        """
+        Turn accumulated wear and distance into the total wear summary.
+        
+        Args:
+            total_wear_mm: Total wear across the rides
+            total_distance_miles: Total distance across the rides
+            ride_count: Number of rides
+            ride_details: Per-ride wear dictionaries
+            brake_pad_specs: Pads the wear applies to (default: this estimator's pads)
+            
+        Returns:
+            Dictionary with total wear estimates
+        """
+        specs = brake_pad_specs or self.brake_pad_specs
+        
         # Calculate remaining thickness
-        remaining_thickness = self.brake_pad_specs.initial_thickness_mm - total_wear_mm
+        remaining_thickness = specs.initial_thickness_mm - total_wear_mm
         
         # Calculate wear percentage
-        usable_thickness = self.brake_pad_specs.initial_thickness_mm - self.brake_pad_specs.minimum_thickness_mm
+        usable_thickness = specs.initial_thickness_mm - specs.minimum_thickness_mm
         wear_percentage = min(100.0, max(0.0, (total_wear_mm / usable_thickness) * 100))
         
         # Estimate remaining miles
         remaining_miles = 0.0
         if total_wear_mm > 0:
             wear_per_mile = total_wear_mm / total_distance_miles
-            remaining_thickness_usable = remaining_thickness - self.brake_pad_specs.minimum_thickness_mm
+            remaining_thickness_usable = remaining_thickness - specs.minimum_thickness_mm
             if wear_per_mile > 0:
                 remaining_miles = remaining_thickness_usable / wear_per_mile
         
@@ -539,11 +1419,76 @@ class StravaBrakeWearEstimator:
             "wear_percentage": round(wear_percentage, 1),
             "total_distance_miles": round(total_distance_miles, 1),
             "remaining_miles": round(remaining_miles, 0),
-            "needs_replacement": remaining_thickness <= self.brake_pad_specs.minimum_thickness_mm,
-            "ride_count": len(rides),
+            "needs_replacement": remaining_thickness <= specs.minimum_thickness_mm,
+            "ride_count": ride_count,
             "ride_details": ride_details
         }
     
+    def estimate_wear_by_gear(self, table: RideTable,
+                              gear_specs: Optional[Dict[str, BrakePadSpecs]] = None,
+                              rider_weight_kg: float = 70.0, bike_weight_kg: float = 15.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Estimate total brake pad wear separately for each bike.
+        
+        Rides are grouped by gear_code with a single bincount reduction. Every
+        call scores the whole table; WearLedger (wear_ledger.py) is the per-bike
+        cache that only adds new rides to each bike's stored totals.
+        
+        Args:
+            table: RideTable of the athlete's rides
+            gear_specs: Pad specs per gear ID (bikes not listed use this estimator's pads)
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            
+        Returns:
+            Dictionary of gear ID (NO_GEAR for rides without gear) to wear summary
+        """
+        gear_specs = gear_specs or {}
+        n_gears = len(table.gear_ids)
+        specs_by_code = [gear_specs.get(gear_id, self.brake_pad_specs) for gear_id in table.gear_ids]
+        rates = np.array([self.MATERIAL_WEAR_RATES.get(specs.material, 0.12) for specs in specs_by_code])
+        
+        # Per-ride wear is rounded like estimate_total_wear before summing
+        wear_mm = np.round(self._table_factors(
+            table, rider_weight_kg, bike_weight_kg, base_wear_rate=rates[table.gear_code]
+        )["wear_mm"], 4)
+        ride_count = np.bincount(table.gear_code, minlength=n_gears)
+        total_wear = np.bincount(table.gear_code, weights=wear_mm, minlength=n_gears)
+        total_distance = np.bincount(table.gear_code, weights=table.distance_miles, minlength=n_gears)
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        for code, gear_id in enumerate(table.gear_ids):
+            if ride_count[code] == 0:
+                continue
+            summary = self._summarize_wear(
+                float(total_wear[code]), float(total_distance[code]), int(ride_count[code]), [],
+                specs_by_code[code]
+            )
+            summary["gear_id"] = gear_id or None
+            results[gear_id] = summary
+        return results
+    
+    def get_recent_rides_wear_by_gear(self, days_back: int = 30,
+                                      gear_specs: Optional[Dict[str, BrakePadSpecs]] = None,
+                                      rider_weight_kg: float = 70.0,
+                                      bike_weight_kg: float = 15.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Get brake pad wear for recent rides from Strava, per bike.
+        
+        Args:
+            days_back: Number of days to look back
+            gear_specs: Pad specs per gear ID (bikes not listed use this estimator's pads)
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            
+        Returns:
+            Dictionary of gear ID to wear summary
+        """
+        after_date = datetime.now() - timedelta(days=days_back)
+        activities = self.strava_api.get_activities(after=after_date, activity_type="Ride")
+        table = RideTable.from_rides(self.process_strava_rides(activities))
+        return self.estimate_wear_by_gear(table, gear_specs, rider_weight_kg, bike_weight_kg)
+    
     def get_recent_rides_wear(self, days_back: int = 30, rider_weight_kg: float = 70.0,
                              bike_weight_kg: float = 15.0) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
         """
@@ -560,12 +1505,54 @@ class StravaBrakeWearEstimator:
         after_date = datetime.now() - timedelta(days=days_back)
         activities = self.strava_api.get_activities(after=after_date, activity_type="Ride")
         
-        rides = []
-        for activity in activities:
-            ride = self.process_strava_ride(activity)
-            rides.append(ride)
+        rides = self.process_strava_rides(activities)
         
         return self.estimate_total_wear(rides, rider_weight_kg, bike_weight_kg)
+    
+    def get_ledger_wear(self, ledger, athlete_id: int, gear_id: Optional[str] = None,
+                        rider_weight_kg: float = 70.0, bike_weight_kg: float = 15.0,
+                        days_back: int = 30) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
+        """
+        Get brake pad wear for one bike from a persistent wear ledger.
+        
+        Only rides after the last ride already in the ledger are downloaded and
+        scored, so the cost depends on the number of new rides, not on history length.
+        
+        Args:
+            ledger: WearLedger holding the running totals
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID to track (None for rides without gear)
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+            days_back: How far back to start when the bike has no ledger yet
+            
+        Returns:
+            Dictionary with total wear estimates for the current pads; ride_details
+            and new_ride_count cover only the rides applied by this call
+        """
+        entry = ledger.get_entry(athlete_id, gear_id)
+        if entry and entry.last_ride_epoch is not None:
+            after_date = datetime.fromtimestamp(entry.last_ride_epoch - 1, tz=timezone.utc)
+        elif entry:
+            after_date = datetime.fromtimestamp(entry.pads_installed_epoch, tz=timezone.utc)
+        else:
+            after_date = datetime.now() - timedelta(days=days_back)
+        
+        activities = self.strava_api.get_activities(after=after_date, activity_type="Ride")
+        rides = RideTable.from_rides(self.process_strava_rides(
+            activity for activity in activities if activity.get("gear_id") == gear_id
+        ))
+        new_rides = ledger.apply_rides(athlete_id, gear_id, rides, self, rider_weight_kg, bike_weight_kg)
+        
+        entry = ledger.get_entry(athlete_id, gear_id)
+        result = self._summarize_wear(
+            entry.cumulative_wear_mm if entry else 0.0,
+            entry.cumulative_distance_miles if entry else 0.0,
+            entry.ride_count if entry else 0,
+            self._table_ride_details(new_rides, self.estimate_wear_for_table(new_rides, rider_weight_kg, bike_weight_kg))
+        )
+        result["new_ride_count"] = len(new_rides)
+        return result
 
 
 def estimate_brake_pad_wear_from_strava(
@@ -576,7 +1563,9 @@ def estimate_brake_pad_wear_from_strava(
     rider_weight_kg: float = 70.0,
     bike_weight_kg: float = 15.0,
     days_back: int = 30,
-    weather_api_key: Optional[str] = None
+    weather_api_key: Optional[str] = None,
+    weather_cache_path: Optional[str] = "weather_cache.db",
+    max_weather_requests: int = 8
 ) -> Dict[str, Union[float, bool, int, List[Dict[str, Union[float, str]]]]]:
     """
     Convenience function to estimate brake pad wear from Strava data.
@@ -590,6 +1579,8 @@ def estimate_brake_pad_wear_from_strava(
         bike_weight_kg: Bike weight in kilograms
         days_back: Number of days to analyze
         weather_api_key: Optional OpenWeatherMap API key for weather data
+        weather_cache_path: SQLite file for cached weather lookups (None disables caching)
+        max_weather_requests: Maximum weather lookups in flight at once
         
     Returns:
         Dictionary with wear estimates
@@ -608,10 +1599,11 @@ def estimate_brake_pad_wear_from_strava(
     # Create weather API client if key provided
     weather_api = None
     if weather_api_key:
-        weather_api = WeatherAPI(weather_api_key)
+        weather_cache = WeatherCache(weather_cache_path) if weather_cache_path else None
+        weather_api = WeatherAPI(weather_api_key, weather_cache)
     
     # Create estimator
-    estimator = StravaBrakeWearEstimator(brake_specs, strava_api, weather_api)
+    estimator = StravaBrakeWearEstimator(brake_specs, strava_api, weather_api, max_weather_requests)
     
     # Get wear estimates
     return estimator.get_recent_rides_wear(days_back, rider_weight_kg, bike_weight_kg)
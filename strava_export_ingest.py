@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Strava Bulk Export Ingestion
+
+Loads a Strava bulk export archive (the zip from Settings > My Account >
+Download or Delete Your Account) into the local RideStore, so years of
+history can be backfilled without one `get_activity_details` call per ride.
+
+The archive is read in place: `activities.csv` is streamed from the zip and
+each GPX/FIT track is decompressed and parsed straight from its zip member by
+a process pool. Tracks supply the start/end coordinates the CSV lacks and,
+optionally, compact sample streams for braking and terrain analysis.
+Everything runs offline. FIT files need the optional `fitparse` package and
+are skipped without it.
+"""
+
+import csv
+import gzip
+import io
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geometry import EARTH_RADIUS_M
+from ride_store import RideStore
+
+try:
+    import fitparse
+except ImportError:
+    fitparse = None  # FIT tracks are skipped
+
+# Activity types ingested by default (the estimators only score rides)
+RIDE_TYPES = ("Ride", "EBikeRide", "GravelRide", "MountainBikeRide", "VirtualRide")
+
+# "Activity Date" in activities.csv, always UTC
+EXPORT_DATE_FORMAT = "%b %d, %Y, %I:%M:%S %p"
+
+SEMICIRCLES_TO_DEGREES = 180.0 / 2 ** 31
+
+# Summaries and streams are written to SQLite in batches of this many activities
+WRITE_BATCH_SIZE = 500
+
+
+@dataclass
+class IngestReport:
+    """Outcome of ingesting one export archive."""
+    activities_stored: int = 0
+    tracks_parsed: int = 0
+    streams_stored: int = 0
+    tracks_skipped: int = 0  # Missing files, or FIT without fitparse
+    errors: List[str] = field(default_factory=list)
+
+
+def _parse_export_date(value: str) -> Optional[str]:
+    """Convert an export "Activity Date" to Strava's ISO start_date."""
+    try:
+        started = datetime.strptime(value.strip(), EXPORT_DATE_FORMAT)
+    except ValueError:
+        return None
+    return started.replace(tzinfo=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _number(value: str) -> Optional[float]:
+    """Parse a CSV number, treating blanks as missing."""
+    value = (value or "").replace(",", "").strip()
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _activity_id(value: str) -> Optional[int]:
+    """Parse an export "Activity ID", treating blanks and junk as missing."""
+    try:
+        return int(value.strip())
+    except ValueError:
+        return None
+
+
+def read_activities_csv(archive: zipfile.ZipFile) -> Iterator[Dict[str, Any]]:
+    """
+    Stream activities.csv from an export archive as Strava-shaped dicts.
+
+    The export repeats several headers (Distance, Elapsed Time); the later
+    copy is in SI units, which is what the API returns, so the last column
+    with each name is used. A lone Distance column is in kilometres.
+
+    Args:
+        archive: Open export archive
+
+    Yields:
+        Activity dicts with an extra "filename" key for the track file; id is
+        None when the Activity ID cell is blank or not a number
+    """
+    name = next(n for n in archive.namelist() if n.rsplit("/", 1)[-1] == "activities.csv")
+    with archive.open(name) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        header = next(reader)
+        column = {title: index for index, title in enumerate(header)}  # Last occurrence wins
+        distance_in_km = header.count("Distance") == 1
+
+        def get(row, title):
+            index = column.get(title)
+            return row[index] if index is not None and index < len(row) else ""
+
+        for row in reader:
+            if not row:
+                continue
+            distance = _number(get(row, "Distance")) or 0.0
+            if distance_in_km:
+                distance *= 1000.0
+            moving_time = _number(get(row, "Moving Time")) or _number(get(row, "Elapsed Time")) or 0.0
+            average_speed = _number(get(row, "Average Speed"))
+            if average_speed is None:
+                average_speed = distance / moving_time if moving_time > 0 else 0.0
+
+            yield {
+                "id": _activity_id(get(row, "Activity ID")),
+                "name": get(row, "Activity Name") or "Unknown Ride",
+                "type": get(row, "Activity Type"),
+                "start_date": _parse_export_date(get(row, "Activity Date")),
+                "distance": distance,
+                "moving_time": int(moving_time),
+                "elapsed_time": int(_number(get(row, "Elapsed Time")) or moving_time),
+                "total_elevation_gain": _number(get(row, "Elevation Gain")) or 0.0,
+                "average_speed": average_speed,
+                "max_speed": _number(get(row, "Max Speed")) or 0.0,
+                # The export names gear rather than giving Strava's gear_id (see gear_ids_by_name)
+                "gear_id": None,
+                "gear_name": get(row, "Activity Gear") or None,
+                "filename": get(row, "Filename"),
+            }
+
+
+def gear_ids_by_name(athlete: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Map gear names to Strava gear IDs from the athlete's profile (GET /athlete).
+
+    Args:
+        athlete: Athlete JSON with "bikes" and "shoes" lists
+
+    Returns:
+        Dictionary of gear name to gear ID
+    """
+    return {
+        gear["name"]: gear["id"]
+        for gear in (athlete.get("bikes") or []) + (athlete.get("shoes") or [])
+        if gear.get("name") and gear.get("id")
+    }
+
+
+def haversine_steps(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Distance in metres between consecutive points (first step is 0)."""
+    lat, lng = np.radians(lat), np.radians(lng)
+    a = (np.sin(np.diff(lat) / 2) ** 2 +
+         np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2)
+    return np.concatenate([[0.0], 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))])
+
+
+def track_to_streams(epoch: np.ndarray, lat: np.ndarray, lng: np.ndarray,
+                     altitude: np.ndarray, distance: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Build Strava-style streams from track points.
+
+    Args:
+        epoch: Sample times in epoch seconds
+        lat: Latitudes in degrees
+        lng: Longitudes in degrees
+        altitude: Altitudes in metres (NaN where missing)
+        distance: Cumulative distance in metres (default: from the coordinates)
+
+    Returns:
+        time, distance, altitude, velocity_smooth and latlng arrays
+    """
+    time = epoch - epoch[0]
+    if distance is None:
+        distance = np.cumsum(haversine_steps(lat, lng))
+    dt = np.diff(time)
+    speed = np.divide(np.diff(distance), dt, out=np.zeros_like(dt, dtype=float), where=dt > 0)
+    velocity = np.concatenate([[0.0], speed])
+    if len(velocity) >= 5:
+        # Strava smooths velocity over a few samples; a 5-point moving average is close enough
+        velocity = np.convolve(velocity, np.ones(5) / 5, mode="same")
+    return {
+        "time": time,
+        "distance": distance,
+        "altitude": altitude,
+        "velocity_smooth": velocity,
+        "latlng": np.column_stack([lat, lng]),
+    }
+
+
+def read_gpx_points(stream) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Read the timed points of a GPX track incrementally.
+
+    Args:
+        stream: Binary file object with GPX XML
+
+    Returns:
+        epoch, lat, lng and altitude arrays, or None if the file has no timed points
+    """
+    epoch, lat, lng, altitude = [], [], [], []
+    point_time = point_ele = None
+    for _, element in ET.iterparse(stream, events=("end",)):
+        tag = element.tag.rsplit("}", 1)[-1]
+        if tag == "metadata":
+            point_time = point_ele = None  # File timestamp, not a track point
+        elif tag == "ele":
+            point_ele = float(element.text)
+        elif tag == "time":
+            point_time = element.text
+        elif tag == "trkpt":
+            if point_time:
+                started = datetime.fromisoformat(point_time.strip().replace("Z", "+00:00"))
+                epoch.append(started.timestamp())
+                lat.append(float(element.get("lat")))
+                lng.append(float(element.get("lon")))
+                altitude.append(point_ele if point_ele is not None else np.nan)
+            point_time = point_ele = None
+            element.clear()
+    if not epoch:
+        return None
+    return {"epoch": np.array(epoch), "lat": np.array(lat), "lng": np.array(lng), "altitude": np.array(altitude)}
+
+
+def read_fit_points(stream) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Read the positioned records of a FIT activity file with fitparse.
+
+    Args:
+        stream: Binary file object with FIT data
+
+    Returns:
+        epoch, lat, lng and altitude arrays (plus the recorded distance when
+        every record has one), or None if the file has no positions
+    """
+    epoch, lat, lng, altitude, distance = [], [], [], [], []
+    for record in fitparse.FitFile(stream).get_messages("record"):
+        values = record.get_values()
+        if values.get("position_lat") is None or values.get("timestamp") is None:
+            continue
+        epoch.append(values["timestamp"].replace(tzinfo=timezone.utc).timestamp())
+        lat.append(values["position_lat"] * SEMICIRCLES_TO_DEGREES)
+        lng.append(values["position_long"] * SEMICIRCLES_TO_DEGREES)
+        ele = values.get("enhanced_altitude", values.get("altitude"))
+        altitude.append(ele if ele is not None else np.nan)
+        distance.append(values.get("distance"))
+    if not epoch:
+        return None
+    points = {"epoch": np.array(epoch), "lat": np.array(lat), "lng": np.array(lng), "altitude": np.array(altitude)}
+    if None not in distance:
+        points["distance"] = np.array(distance, dtype=float)
+    return points
+
+
+def read_track_points(stream, filename: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Read a GPX or FIT track, gzipped or not, picking the parser by file name.
+
+    Args:
+        stream: Binary file object with the track file
+        filename: Name of the track file, e.g. "activities/123.fit.gz"
+
+    Returns:
+        Track point arrays, or None if the file has no usable points
+    """
+    lower = filename.lower()
+    if lower.endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream)
+    return read_fit_points(stream) if ".fit" in lower else read_gpx_points(stream)
+
+
+def parse_gpx(stream) -> Optional[Dict[str, np.ndarray]]:
+    """Parse a GPX track into streams (None if it has no timed points)."""
+    points = read_gpx_points(stream)
+    return track_to_streams(**points) if points else None
+
+
+def parse_fit(stream) -> Optional[Dict[str, np.ndarray]]:
+    """Parse a FIT activity file into streams (None if it has no positions)."""
+    points = read_fit_points(stream)
+    return track_to_streams(**points) if points else None
+
+
+# The archive a pool worker reads from, opened by _open_worker_archive
+_worker_archive: Optional[zipfile.ZipFile] = None
+
+
+def _open_worker_archive(zip_path: str):
+    """Pool initializer: give each worker its own handle (and file offset) on the archive."""
+    global _worker_archive
+    _worker_archive = zipfile.ZipFile(zip_path)
+
+
+def _parse_track(job: Tuple[int, str, bool, Optional[str]]
+                 ) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """Parse one track file from the worker's archive (runs in a worker process)."""
+    return _parse_member(_worker_archive, *job)
+
+
+def _parse_member(archive: zipfile.ZipFile, activity_id: int, member: str, include_streams: bool,
+                  track_cache_dir: Optional[str]) -> Tuple[int, Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Parse one track file from the archive.
+
+    Args:
+        archive: Open export archive
+        activity_id: Activity the track belongs to
+        member: Name of the track file in the archive
+        include_streams: Return the streams as well as the coordinates
+        track_cache_dir: Also write the track to a TrackCache here
+
+    Returns:
+        (activity_id, track info or None, error or None). Track info holds the
+        start/end coordinates and, if requested, the streams.
+    """
+    lower = member.lower()
+    if ".fit" in lower and fitparse is None:
+        return activity_id, None, None
+    try:
+        with archive.open(member) as raw:
+            points = read_track_points(raw, member)
+    except Exception as e:
+        return activity_id, None, f"{member}: {e}"
+    if points is None:
+        return activity_id, None, None
+    if track_cache_dir:
+        from track_cache import TrackCache
+        TrackCache(track_cache_dir).put(str(activity_id), points)
+    streams = track_to_streams(**points)
+
+    latlng = streams["latlng"]
+    track = {
+        "start_latlng": latlng[0].tolist(),
+        "end_latlng": latlng[-1].tolist(),
+    }
+    if include_streams:
+        track["streams"] = streams
+    return activity_id, track, None
+
+
+def ingest_export(zip_path: str, store: RideStore, athlete_id: Optional[int] = None,
+                  activity_types: Optional[Sequence[str]] = RIDE_TYPES,
+                  include_streams: bool = False, track_cache_dir: Optional[str] = None,
+                  max_workers: Optional[int] = None, chunksize: int = 8,
+                  gear_ids: Optional[Dict[str, str]] = None) -> IngestReport:
+    """
+    Load a Strava bulk export archive into a RideStore.
+
+    Args:
+        zip_path: Path to the export zip
+        store: Store to write summaries (and streams) to
+        athlete_id: Athlete the export belongs to
+        activity_types: Activity types to keep (None for all)
+        include_streams: Also store compact sample streams from the tracks
+        track_cache_dir: Also write each track to a TrackCache here, keyed by activity ID
+        max_workers: Process pool size (1 parses in this process, None uses all cores)
+        chunksize: Track files handed to a worker at a time
+        gear_ids: Gear name to Strava gear ID (see gear_ids_by_name); rides on gear
+            not listed keep only their gear_name
+
+    Returns:
+        IngestReport with counts and per-file errors
+    """
+    report = IngestReport()
+    # The archive is opened once per call (and once per pool worker), and closed
+    # with it, so a new export written to the same path is always read afresh
+    with zipfile.ZipFile(zip_path) as archive:
+        members = set(archive.namelist())
+        activities = {}
+        for activity in read_activities_csv(archive):
+            if activity_types and activity["type"] not in activity_types:
+                continue
+            if activity["id"] is None:
+                report.errors.append(f"activity {activity['name']!r} ({activity['type']}): unreadable Activity ID")
+                continue
+            if activity["start_date"] is None:
+                report.errors.append(f"activity {activity['id']}: unreadable Activity Date")
+                continue
+            if gear_ids and activity["gear_name"]:
+                activity["gear_id"] = gear_ids.get(activity["gear_name"])
+            activities[activity["id"]] = activity
+
+        jobs = []
+        for activity_id, activity in activities.items():
+            filename = activity.pop("filename")
+            if filename in members:
+                jobs.append((activity_id, filename, include_streams, track_cache_dir))
+            elif filename:
+                report.tracks_skipped += 1
+
+        if max_workers == 1 or len(jobs) <= 1:
+            results = (_parse_member(archive, *job) for job in jobs)
+            executor = None
+        else:
+            executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_open_worker_archive,
+                                           initargs=(zip_path,))
+            results = executor.map(_parse_track, jobs, chunksize=chunksize)
+
+        streams_batch = []
+        try:
+            for activity_id, track, error in results:
+                if error:
+                    report.errors.append(error)
+                if track is None:
+                    report.tracks_skipped += error is None
+                    continue
+                report.tracks_parsed += 1
+                activities[activity_id]["start_latlng"] = track["start_latlng"]
+                activities[activity_id]["end_latlng"] = track["end_latlng"]
+                if "streams" in track:
+                    streams_batch.append((activity_id, track["streams"]))
+                    if len(streams_batch) >= WRITE_BATCH_SIZE:
+                        report.streams_stored += store.save_streams_many(streams_batch)
+                        streams_batch = []
+        finally:
+            # Workers exit here, releasing their archive handles
+            if executor is not None:
+                executor.shutdown()
+
+    if streams_batch:
+        report.streams_stored += store.save_streams_many(streams_batch)
+    rows = list(activities.values())
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        report.activities_stored += store.save_activities(
+            rows[start:start + WRITE_BATCH_SIZE], athlete_id, source="export"
+        )
+    return report
+
+
+def main():
+    """Ingest an export archive from the command line."""
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if not args:
+        print("Usage: python strava_export_ingest.py export.zip [db_path] [--streams] [--gear]")
+        sys.exit(1)
+
+    print("📦 Strava Export Ingestion")
+    print("=" * 40)
+    gear_ids = None
+    if "--gear" in sys.argv:
+        # Resolve the export's gear names to gear IDs with the athlete's Strava profile
+        from config import STRAVA_ACCESS_TOKEN, STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET
+        from strava_brake_wear_estimator import StravaAPI
+        strava_api = StravaAPI(STRAVA_CLIENT_ID, STRAVA_CLIENT_SECRET, STRAVA_ACCESS_TOKEN)
+        gear_ids = gear_ids_by_name(strava_api.get_athlete())
+    store = RideStore(args[1]) if len(args) > 1 else RideStore()
+    report = ingest_export(args[0], store, include_streams="--streams" in sys.argv, gear_ids=gear_ids)
+    print(f"✅ Stored {report.activities_stored} activities "
+          f"({report.tracks_parsed} tracks parsed, {report.streams_stored} with streams, "
+          f"{report.tracks_skipped} skipped)")
+    for error in report.errors[:20]:
+        print(f"   ⚠️  {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,10 +11,10 @@ import time
 import json
 import sqlite3
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import requests
+from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, asdict
-from traffic_comparison import GoogleMapsAPI, TrafficComparison
+from http_session import get_session
+from traffic_comparison import GoogleMapsAPI, TrafficComparison, has_capture_fields, route_overlap
 
 @dataclass
 class StoredTrafficComparison:
@@ -37,6 +37,8 @@ class StoredTrafficComparison:
     start_lng: float
     end_lat: float
     end_lng: float
+    route_overlap_percentage: Optional[float] = None  # Share of the bike route the car route also uses
+    route_max_deviation_meters: Optional[float] = None
 
 class StravaMonitor:
     """Monitors Strava for new activities and captures traffic data."""
@@ -83,10 +85,19 @@ class StravaMonitor:
                 start_lat REAL,
                 start_lng REAL,
                 end_lat REAL,
-                end_lng REAL
+                end_lng REAL,
+                route_overlap_percentage REAL,
+                route_max_deviation_meters REAL
             )
         ''')
         
+        # Databases created before route overlap was stored lack its columns
+        cursor.execute('PRAGMA table_info(traffic_comparisons)')
+        existing = [row[1] for row in cursor.fetchall()]
+        for column in ("route_overlap_percentage", "route_max_deviation_meters"):
+            if column not in existing:
+                cursor.execute(f'ALTER TABLE traffic_comparisons ADD COLUMN {column} REAL')
+        
         # Add table for pending activities that need traffic capture
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS pending_captures (
@@ -102,10 +113,15 @@ class StravaMonitor:
                 end_lat REAL,
                 end_lng REAL,
                 discovered_at TEXT,
-                retry_count INTEGER DEFAULT 0
+                retry_count INTEGER DEFAULT 0,
+                summary_polyline TEXT
             )
         ''')
         
+        cursor.execute('PRAGMA table_info(pending_captures)')
+        if "summary_polyline" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE pending_captures ADD COLUMN summary_polyline TEXT')
+        
         conn.commit()
         conn.close()
     
@@ -113,7 +129,7 @@ class StravaMonitor:
         """Check if internet connection is available."""
         try:
             # Try to connect to a reliable service
-            requests.get("https://www.google.com", timeout=5)
+            get_session().get("https://www.google.com", timeout=5)
             return True
         except:
             return False
@@ -129,6 +145,25 @@ class StravaMonitor:
         conn.close()
         return result[0] if result[0] else None
     
+    def get_known_activity_ids(self) -> Set[int]:
+        """
+        Get IDs of activities already captured or waiting in pending captures.
+        
+        Webhook captures arrive out of order, so polling skips activities by ID
+        rather than stopping at the newest captured one.
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT activity_id FROM traffic_comparisons
+            UNION SELECT activity_id FROM pending_captures
+        ''')
+        known = {row[0] for row in cursor.fetchall()}
+        
+        conn.close()
+        return known
+    
     def store_pending_activity(self, activity: Dict):
         """Store activity for later traffic capture when offline."""
         conn = sqlite3.connect(self.db_path)
@@ -158,12 +193,13 @@ class StravaMonitor:
             cursor.execute('''
                 INSERT OR REPLACE INTO pending_captures 
                 (activity_id, activity_name, ride_date, bike_time_minutes, distance_miles,
-                 bike_speed_mph, start_lat, start_lng, end_lat, end_lng, discovered_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 bike_speed_mph, start_lat, start_lng, end_lat, end_lng, discovered_at, summary_polyline)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 activity_id, activity_name, start_date.isoformat(),
                 bike_time_minutes, distance_miles, bike_speed_mph,
-                start_lat, start_lng, end_lat, end_lng, datetime.now().isoformat()
+                start_lat, start_lng, end_lat, end_lng, datetime.now().isoformat(),
+                (activity.get("map") or {}).get("summary_polyline")
             ))
             
             conn.commit()
@@ -182,7 +218,7 @@ class StravaMonitor:
         cursor.execute('''
             SELECT activity_id, activity_name, ride_date, bike_time_minutes,
                    distance_miles, bike_speed_mph, start_lat, start_lng, end_lat, end_lng,
-                   discovered_at, retry_count
+                   discovered_at, retry_count, summary_polyline
             FROM pending_captures
             WHERE retry_count < 3
             ORDER BY discovered_at ASC
@@ -205,7 +241,8 @@ class StravaMonitor:
                 "end_lat": row[8],
                 "end_lng": row[9],
                 "discovered_at": row[10],
-                "retry_count": row[11]
+                "retry_count": row[11],
+                "map": {"summary_polyline": row[12]}
             })
         
         return pending
@@ -235,8 +272,6 @@ class StravaMonitor:
                     self.increment_retry_count(pending_activity["activity_id"])
                     print(f"      ⚠️  Failed, will retry: {pending_activity['activity_name']}")
                 
-                time.sleep(2)  # Rate limiting
-                
             except Exception as e:
                 print(f"      ❌ Error processing pending: {e}")
                 self.increment_retry_count(pending_activity["activity_id"])
@@ -264,6 +299,7 @@ class StravaMonitor:
             distance_miles = pending_activity["distance_miles"]
             bike_speed_mph = pending_activity["bike_speed_mph"]
             car_speed_mph = distance_miles / (car_time_minutes / 60.0) if car_time_minutes > 0 else 0
+            overlap = route_overlap(pending_activity, route_data)
             
             # Create stored comparison
             comparison = StoredTrafficComparison(
@@ -284,7 +320,9 @@ class StravaMonitor:
                 start_lat=pending_activity["start_lat"],
                 start_lng=pending_activity["start_lng"],
                 end_lat=pending_activity["end_lat"],
-                end_lng=pending_activity["end_lng"]
+                end_lng=pending_activity["end_lng"],
+                route_overlap_percentage=overlap["overlap_percentage"] if overlap else None,
+                route_max_deviation_meters=overlap["max_deviation_meters"] if overlap else None
             )
             
             # Store in database
@@ -329,33 +367,38 @@ class StravaMonitor:
             (activity_id, activity_name, ride_date, bike_time_minutes, car_time_minutes,
              time_saved_minutes, time_saved_percentage, distance_miles, bike_speed_mph,
              car_speed_mph, traffic_conditions, route_summary, captured_at,
-             start_lat, start_lng, end_lat, end_lng)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             start_lat, start_lng, end_lat, end_lng, route_overlap_percentage, route_max_deviation_meters)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             comparison.activity_id, comparison.activity_name, comparison.ride_date,
             comparison.bike_time_minutes, comparison.car_time_minutes,
             comparison.time_saved_minutes, comparison.time_saved_percentage,
             comparison.distance_miles, comparison.bike_speed_mph, comparison.car_speed_mph,
             comparison.traffic_conditions, comparison.route_summary, comparison.captured_at,
-            comparison.start_lat, comparison.start_lng, comparison.end_lat, comparison.end_lng
+            comparison.start_lat, comparison.start_lng, comparison.end_lat, comparison.end_lng,
+            comparison.route_overlap_percentage, comparison.route_max_deviation_meters
         ))
         
         conn.commit()
         conn.close()
     
-    def capture_traffic_for_activity(self, activity_id: int) -> Optional[StoredTrafficComparison]:
+    def capture_traffic_for_activity(self, activity_id: int,
+                                     summary: Optional[Dict] = None) -> Optional[StoredTrafficComparison]:
         """
         Capture traffic data for a specific activity.
         
         Args:
             activity_id: Strava activity ID
+            summary: Activity from get_activities; details are only fetched if it lacks a needed field
             
         Returns:
             StoredTrafficComparison object or None if failed
         """
         try:
-            # Get activity details from Strava
-            activity = self.strava_api.get_activity_details(activity_id)
+            if has_capture_fields(summary):
+                activity = summary
+            else:
+                activity = self.strava_api.get_activity_details(activity_id)
             
             if not activity:
                 print(f"❌ Could not get activity details for {activity_id}")
@@ -396,6 +439,7 @@ class StravaMonitor:
             distance_miles = distance_meters * 0.000621371
             bike_speed_mph = distance_miles / (bike_time_minutes / 60.0) if bike_time_minutes > 0 else 0
             car_speed_mph = distance_miles / (car_time_minutes / 60.0) if car_time_minutes > 0 else 0
+            overlap = route_overlap(activity, route_data)
             
             # Create stored comparison
             comparison = StoredTrafficComparison(
@@ -416,7 +460,9 @@ class StravaMonitor:
                 start_lat=start_lat,
                 start_lng=start_lng,
                 end_lat=end_lat,
-                end_lng=end_lng
+                end_lng=end_lng,
+                route_overlap_percentage=overlap["overlap_percentage"] if overlap else None,
+                route_max_deviation_meters=overlap["max_deviation_meters"] if overlap else None
             )
             
             # Store in database
@@ -454,15 +500,11 @@ class StravaMonitor:
                 days_back = 30  # Default to 30 days if config not available
             
             after_date = datetime.now() - timedelta(days=days_back)
-            activities = self.strava_api.get_activities(after=after_date)
-            # Filter for both regular and e-bike rides
-            activities = [a for a in activities if a.get("type") in ("Ride", "EBikeRide")]
-            
-            if not activities:
-                return []
+            # Stream pages lazily; filter for both regular and e-bike rides
+            activities = (a for a in self.strava_api.iter_activities(after=after_date)
+                          if a.get("type") in ("Ride", "EBikeRide"))
             
-            # Get last processed activity ID
-            last_processed = self.get_last_processed_activity()
+            known_ids = self.get_known_activity_ids()
             
             new_comparisons = []
             
@@ -470,14 +512,14 @@ class StravaMonitor:
                 activity_id = activity["id"]
                 
                 # Skip if already processed
-                if last_processed and activity_id <= last_processed:
+                if activity_id in known_ids:
                     continue
                 
                 print(f"🚴‍♂️ New activity detected: {activity.get('name', 'Unknown')}")
                 print(f"   Capturing traffic data...")
                 
                 # Try to capture traffic data
-                comparison = self.capture_traffic_for_activity(activity_id)
+                comparison = self.capture_traffic_for_activity(activity_id, summary=activity)
                 
                 if comparison:
                     new_comparisons.append(comparison)
@@ -486,9 +528,6 @@ class StravaMonitor:
                     # Store for later capture if we're having connection issues
                     print(f"   📱 Storing for later capture...")
                     self.store_pending_activity(activity)
-                
-                # Rate limiting
-                time.sleep(2)
             
             return new_comparisons
             
@@ -521,34 +560,30 @@ class StravaMonitor:
                     days_back = 30  # Default to 30 days
             
             after_date = datetime.now() - timedelta(days=days_back)
-            activities = self.strava_api.get_activities(after=after_date)
-            # Filter for both regular and e-bike rides
-            activities = [a for a in activities if a.get("type") in ("Ride", "EBikeRide")]
-            
-            if not activities:
-                print(f"   No activities found in the last {days_back} days")
-                return []
+            # Stream pages lazily so long histories are never held in memory;
+            # filter for both regular and e-bike rides
+            activities = (a for a in self.strava_api.iter_activities(after=after_date)
+                          if a.get("type") in ("Ride", "EBikeRide"))
             
-            print(f"   Found {len(activities)} activities in the last {days_back} days")
-            
-            # Get last processed activity ID
-            last_processed = self.get_last_processed_activity()
+            known_ids = self.get_known_activity_ids()
             
             new_comparisons = []
+            found_count = 0
             processed_count = 0
             
             for activity in activities:
                 activity_id = activity["id"]
+                found_count += 1
                 
                 # Skip if already processed
-                if last_processed and activity_id <= last_processed:
+                if activity_id in known_ids:
                     continue
                 
                 processed_count += 1
-                print(f"🚴‍♂️ Processing activity {processed_count}/{len(activities)}: {activity.get('name', 'Unknown')}")
+                print(f"🚴‍♂️ Processing activity {processed_count}: {activity.get('name', 'Unknown')}")
                 
                 # Try to capture traffic data
-                comparison = self.capture_traffic_for_activity(activity_id)
+                comparison = self.capture_traffic_for_activity(activity_id, summary=activity)
                 
                 if comparison:
                     new_comparisons.append(comparison)
@@ -557,10 +592,12 @@ class StravaMonitor:
                     # Store for later capture if we're having connection issues
                     print(f"   📱 Storing for later capture...")
                     self.store_pending_activity(activity)
-                
-                # Rate limiting
-                time.sleep(2)
             
+            if found_count == 0:
+                print(f"   No activities found in the last {days_back} days")
+                return []
+            
+            print(f"   Found {found_count} activities in the last {days_back} days")
             print(f"   Processed {processed_count} new activities")
             return new_comparisons
             
@@ -597,6 +634,110 @@ class StravaMonitor:
         except KeyboardInterrupt:
             print(f"\n🛑 Monitor stopped by user")
     
+    def process_webhook_events(self, queue, athlete_id: Optional[int] = None,
+                               token_store=None) -> List[StoredTrafficComparison]:
+        """
+        Handle queued Strava webhook events.
+        
+        New rides are captured right away. Updates make the cached activity
+        details stale and deletes drop them. When an athlete deauthorizes the
+        app, their stored tokens are deleted. With athlete_id set, other
+        athletes' events stay queued for the monitors that own them.
+        
+        Args:
+            queue: WebhookEventQueue filled by the dashboard's /webhook endpoint
+            athlete_id: Only handle this athlete's events (None for all)
+            token_store: AthleteTokenStore to remove deauthorized athletes from
+        
+        Returns:
+            List of newly captured traffic comparisons
+        """
+        events = queue.get_pending(owner_id=athlete_id)
+        if not events:
+            return []
+        
+        # Leave events queued while offline instead of using up their attempts
+        if not self.check_internet_connection():
+            print(f"   📱 No internet connection, {len(events)} webhook events waiting")
+            return []
+        
+        activity_cache = getattr(self.strava_api, "activity_cache", None)
+        new_comparisons = []
+        
+        for event in events:
+            try:
+                if event.object_type == "athlete" and str(event.updates.get("authorized", "")).lower() == "false":
+                    if token_store:
+                        token_store.delete_athlete(event.owner_id)
+                    print(f"🔒 Athlete {event.owner_id} deauthorized the app; their tokens were deleted")
+                    if athlete_id is not None:
+                        print(f"   ⚠️  This monitor's access token no longer works")
+                
+                relevant = event.object_type == "activity"
+                
+                if relevant and event.aspect_type == "create" and event.object_id not in self.get_known_activity_ids():
+                    activity = self.strava_api.get_activity_details(event.object_id)
+                    if activity.get("type") in ("Ride", "EBikeRide"):
+                        print(f"🚴‍♂️ New activity pushed: {activity.get('name', 'Unknown')}")
+                        comparison = self.capture_traffic_for_activity(event.object_id, summary=activity)
+                        if comparison:
+                            new_comparisons.append(comparison)
+                            print(f"   ✅ Traffic captured: {comparison.time_saved_minutes:.1f} minutes saved")
+                        else:
+                            print(f"   📱 Storing for later capture...")
+                            self.store_pending_activity(activity)
+                elif relevant and event.aspect_type == "update" and activity_cache:
+                    activity_cache.mark_stale(event.object_id)
+                elif relevant and event.aspect_type == "delete" and activity_cache:
+                    activity_cache.delete(event.object_id)
+                
+                queue.mark_processed(event.id)
+            
+            except Exception as e:
+                print(f"   ❌ Error handling webhook event {event.id}: {e}")
+                queue.mark_failed(event.id, str(e))
+        
+        return new_comparisons
+    
+    def monitor_webhook_events(self, queue, athlete_id: Optional[int] = None, poll_seconds: float = 2.0,
+                               reconcile_interval: int = 6 * 3600, token_store=None):
+        """
+        Capture rides as Strava pushes them, with a slow polling fallback.
+        
+        The event queue is local SQLite, so checking it often costs no API calls.
+        Webhook delivery is best effort, so check_for_new_activities still runs
+        every reconcile_interval (and once at startup) to pick up missed rides.
+        
+        Args:
+            queue: WebhookEventQueue filled by the dashboard's /webhook endpoint
+            athlete_id: Only handle this athlete's events (None for all)
+            poll_seconds: Seconds between queue checks
+            reconcile_interval: Seconds between reconciliation polls of Strava
+            token_store: AthleteTokenStore to remove deauthorized athletes from
+        """
+        print(f"🚴‍♂️ Starting Strava monitor (webhook mode)...")
+        print(f"   Capturing pushed activities within {poll_seconds:g} seconds")
+        print(f"   Reconciling with Strava every {reconcile_interval // 60} minutes")
+        print(f"   Press Ctrl+C to stop")
+        
+        last_reconcile = None
+        try:
+            while True:
+                if last_reconcile is None or time.time() - last_reconcile >= reconcile_interval:
+                    last_reconcile = time.time()
+                    missed = self.check_for_new_activities()
+                    if missed:
+                        print(f"\n📊 Reconciliation captured {len(missed)} missed rides")
+                
+                new_comparisons = self.process_webhook_events(queue, athlete_id, token_store)
+                for comp in new_comparisons:
+                    print(f"   - {comp.activity_name}: {comp.time_saved_minutes:.1f} min saved")
+                
+                time.sleep(poll_seconds)
+        
+        except KeyboardInterrupt:
+            print(f"\n🛑 Monitor stopped by user")
+    
     def get_all_comparisons(self) -> List[StoredTrafficComparison]:
         """Get all stored traffic comparisons."""
         conn = sqlite3.connect(self.db_path)
@@ -606,7 +747,8 @@ class StravaMonitor:
             SELECT id, activity_id, activity_name, ride_date, bike_time_minutes,
                    car_time_minutes, time_saved_minutes, time_saved_percentage,
                    distance_miles, bike_speed_mph, car_speed_mph, traffic_conditions,
-                   route_summary, captured_at, start_lat, start_lng, end_lat, end_lng
+                   route_summary, captured_at, start_lat, start_lng, end_lat, end_lng,
+                   route_overlap_percentage, route_max_deviation_meters
             FROM traffic_comparisons
             ORDER BY ride_date DESC
         ''')
@@ -621,7 +763,8 @@ class StravaMonitor:
                 bike_time_minutes=row[4], car_time_minutes=row[5], time_saved_minutes=row[6],
                 time_saved_percentage=row[7], distance_miles=row[8], bike_speed_mph=row[9],
                 car_speed_mph=row[10], traffic_conditions=row[11], route_summary=row[12],
-                captured_at=row[13], start_lat=row[14], start_lng=row[15], end_lat=row[16], end_lng=row[17]
+                captured_at=row[13], start_lat=row[14], start_lng=row[15], end_lat=row[16], end_lng=row[17],
+                route_overlap_percentage=row[18], route_max_deviation_meters=row[19]
             )
             comparisons.append(comparison)
         
@@ -651,6 +794,8 @@ def print_stored_comparisons(comparisons: List[StoredTrafficComparison]):
         print(f"   Car: {comp.car_time_minutes:.1f} min ({comp.car_speed_mph:.1f} mph)")
         print(f"   Traffic: {comp.traffic_conditions}")
         print(f"   Route: {comp.route_summary}")
+        if comp.route_overlap_percentage is not None:
+            print(f"   Shared with car route: {comp.route_overlap_percentage:.0f}%")
         
         if comp.time_saved_minutes > 0:
             print(f"   ✅ Saved {comp.time_saved_minutes:.1f} minutes ({comp.time_saved_percentage:.1f}%)")
@@ -671,19 +816,41 @@ def print_stored_comparisons(comparisons: List[StoredTrafficComparison]):
 
 # Example usage functions
 def start_monitor(strava_client_id: str, strava_client_secret: str, 
-                 strava_access_token: str, google_maps_api_key: str):
-    """Start the continuous monitor."""
+                 strava_access_token: str, google_maps_api_key: str,
+                 activity_cache_path: Optional[str] = "activity_cache.db",
+                 webhook_db_path: Optional[str] = None,
+                 service_db_path: str = "service_schedule.db"):
+    """
+    Start the continuous monitor (webhook-driven when webhook_db_path is given).
+    
+    The webhook queue receives every authorized athlete's events, so the
+    monitor looks up whose token it holds and only captures that athlete's
+    rides. Deauthorizations remove the athlete from the service_db_path
+    token store used by the nightly service scheduler.
+    """
+    from activity_cache import POLLING_MAX_AGE_SECONDS, ActivityCache
     from strava_brake_wear_estimator import StravaAPI
     
-    # Initialize APIs
-    strava_api = StravaAPI(strava_client_id, strava_client_secret, strava_access_token)
+    # Initialize APIs (pending captures reuse cached activity details on retry).
+    # Webhook update events mark edited activities stale; polling has to expire them.
+    max_age = None if webhook_db_path else POLLING_MAX_AGE_SECONDS
+    activity_cache = ActivityCache(activity_cache_path, max_age_seconds=max_age) if activity_cache_path else None
+    strava_api = StravaAPI(strava_client_id, strava_client_secret, strava_access_token,
+                           activity_cache=activity_cache)
     google_maps_api = GoogleMapsAPI(google_maps_api_key)
     
     # Create monitor
     monitor = StravaMonitor(strava_api, google_maps_api)
     
     # Start monitoring
-    monitor.monitor_continuously()
+    if webhook_db_path:
+        from service_scheduler import AthleteTokenStore
+        from strava_webhook import WebhookEventQueue
+        athlete_id = strava_api.get_athlete()["id"]
+        monitor.monitor_webhook_events(WebhookEventQueue(webhook_db_path), athlete_id,
+                                       token_store=AthleteTokenStore(service_db_path))
+    else:
+        monitor.monitor_continuously()
 
 def view_stored_comparisons(strava_client_id: str, strava_client_secret: str, 
                            strava_access_token: str, google_maps_api_key: str):
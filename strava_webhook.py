@@ -0,0 +1,245 @@
+"""
+Strava Webhook Events
+
+Instead of polling `/athlete/activities` every few minutes, Strava can push an
+event to a callback URL whenever an athlete creates, updates or deletes an
+activity (or deauthorizes the app). The web dashboard receives these at
+`/webhook`: it answers Strava's subscription handshake, and stores each event
+in a small SQLite queue and returns immediately (Strava expects a 200 within
+two seconds). `StravaMonitor.process_webhook_events` drains the queue,
+captures traffic for new rides right away and deletes the stored tokens of
+athletes who deauthorize.
+
+Strava retries an event it could not deliver, so events are de-duplicated on
+(object type, object ID, aspect, event time). Webhooks are best effort; the
+monitor keeps a slow reconciliation poll as a fallback.
+"""
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from http_session import get_session
+
+PUSH_SUBSCRIPTIONS_URL = "https://www.strava.com/api/v3/push_subscriptions"
+
+OBJECT_TYPES = ("activity", "athlete")
+ASPECT_TYPES = ("create", "update", "delete")
+
+
+@dataclass
+class WebhookEvent:
+    """One Strava push event."""
+    id: int
+    object_type: str
+    object_id: int
+    aspect_type: str
+    owner_id: int
+    subscription_id: Optional[int]
+    event_time: int
+    updates: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+
+def verify_subscription(args: Dict[str, str], verify_token: str) -> Tuple[Dict[str, str], int]:
+    """
+    Answer Strava's subscription validation request (GET on the callback URL).
+
+    Args:
+        args: Query parameters (hub.mode, hub.verify_token, hub.challenge)
+        verify_token: Token given when the subscription was created
+
+    Returns:
+        (JSON body, HTTP status)
+    """
+    if not verify_token or args.get("hub.mode") != "subscribe" or args.get("hub.verify_token") != verify_token:
+        return {"error": "Verification failed"}, 403
+    return {"hub.challenge": args.get("hub.challenge", "")}, 200
+
+
+def create_subscription(client_id: str, client_secret: str, callback_url: str, verify_token: str,
+                        session: Optional[requests.Session] = None) -> Dict[str, Any]:
+    """
+    Subscribe the app to webhook events (one subscription per app).
+
+    Strava validates the callback URL with verify_subscription before answering.
+
+    Returns:
+        Subscription data, including its ID
+    """
+    response = (session or get_session()).post(PUSH_SUBSCRIPTIONS_URL, data={
+        "client_id": client_id,
+        "client_secret": client_secret,
+        "callback_url": callback_url,
+        "verify_token": verify_token
+    })
+    if response.status_code in (200, 201):
+        return response.json()
+    raise Exception(f"Failed to create webhook subscription: {response.text}")
+
+
+def list_subscriptions(client_id: str, client_secret: str,
+                       session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+    """Get the app's webhook subscriptions."""
+    response = (session or get_session()).get(PUSH_SUBSCRIPTIONS_URL, params={
+        "client_id": client_id,
+        "client_secret": client_secret
+    })
+    if response.status_code == 200:
+        return response.json()
+    raise Exception(f"Failed to list webhook subscriptions: {response.text}")
+
+
+class WebhookEventQueue:
+    """SQLite queue of received webhook events, shared by the dashboard and the monitor."""
+
+    def __init__(self, db_path: str = "webhook_events.db", max_attempts: int = 5):
+        """
+        Initialize the queue.
+
+        Args:
+            db_path: Path to SQLite database
+            max_attempts: Events that failed this many times are no longer handed out
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up SQLite table for queued events."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS webhook_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                object_type TEXT,
+                object_id INTEGER,
+                aspect_type TEXT,
+                owner_id INTEGER,
+                subscription_id INTEGER,
+                event_time INTEGER,
+                updates TEXT,
+                received_at REAL,
+                processed_at REAL,
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                UNIQUE (object_type, object_id, aspect_type, event_time)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_webhook_events_pending ON webhook_events (processed_at, id)
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def enqueue(self, payload: Dict[str, Any]) -> bool:
+        """
+        Store an event POSTed by Strava.
+
+        Args:
+            payload: Event JSON
+
+        Returns:
+            True if queued, False for duplicates (Strava retries) and unknown event types
+
+        Raises:
+            ValueError: If required fields are missing
+        """
+        try:
+            row = (
+                payload["object_type"], int(payload["object_id"]), payload["aspect_type"],
+                int(payload["owner_id"]), payload.get("subscription_id"), int(payload["event_time"]),
+                json.dumps(payload.get("updates") or {}), time.time()
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid webhook event: {e}")
+        if row[0] not in OBJECT_TYPES or row[2] not in ASPECT_TYPES:
+            return False
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR IGNORE INTO webhook_events
+            (object_type, object_id, aspect_type, owner_id, subscription_id, event_time, updates, received_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', row)
+        queued = cursor.rowcount == 1
+        conn.commit()
+        conn.close()
+        return queued
+
+    def get_pending(self, limit: int = 100, owner_id: Optional[int] = None) -> List[WebhookEvent]:
+        """
+        Get unprocessed events, oldest first.
+
+        Args:
+            limit: Maximum number of events
+            owner_id: Only this athlete's events (None for every athlete)
+
+        Returns:
+            List of WebhookEvent
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id, object_type, object_id, aspect_type, owner_id, subscription_id, event_time,
+                   updates, attempts
+            FROM webhook_events
+            WHERE processed_at IS NULL AND attempts < ? AND (? IS NULL OR owner_id = ?)
+            ORDER BY id
+            LIMIT ?
+        ''', (self.max_attempts, owner_id, owner_id, limit))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [
+            WebhookEvent(id=row[0], object_type=row[1], object_id=row[2], aspect_type=row[3],
+                         owner_id=row[4], subscription_id=row[5], event_time=row[6],
+                         updates=json.loads(row[7]), attempts=row[8])
+            for row in rows
+        ]
+
+    def mark_processed(self, event_id: int):
+        """Remove an event from the pending list."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('UPDATE webhook_events SET processed_at = ? WHERE id = ?', (time.time(), event_id))
+        conn.commit()
+        conn.close()
+
+    def mark_failed(self, event_id: int, error: str):
+        """Count a failed attempt; the event is retried until max_attempts."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE webhook_events SET attempts = attempts + 1, last_error = ? WHERE id = ?
+        ''', (error, event_id))
+        conn.commit()
+        conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get counts of received, pending, processed and abandoned events."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*),
+                   SUM(processed_at IS NULL AND attempts < ?),
+                   SUM(processed_at IS NOT NULL),
+                   SUM(processed_at IS NULL AND attempts >= ?)
+            FROM webhook_events
+        ''', (self.max_attempts, self.max_attempts))
+        received, pending, processed, abandoned = cursor.fetchone()
+        conn.close()
+
+        return {
+            "received": received,
+            "pending": pending or 0,
+            "processed": processed or 0,
+            "abandoned": abandoned or 0
+        }
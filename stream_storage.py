@@ -0,0 +1,191 @@
+"""
+Compressed Stream Storage
+
+Raw 1 Hz streams cost around 40 bytes per second of riding, so keeping them for
+every ride would bloat the SQLite file that `StravaMonitor` and the dashboard
+share. This module shrinks streams before they are stored:
+
+1. Optionally, Douglas-Peucker simplification drops track points that lie
+   within `tolerance_m` of the simplified path; the other streams keep the
+   same samples, so every stored point still has its time, distance and
+   altitude. Dropped samples lose the speed and climb changes braking
+   analysis needs, so `RideStore` keeps full streams without it and only
+   simplifies the copy of the track drawn on the map.
+2. Each stream is converted to fixed point (see STREAM_SCALES), delta-encoded
+   and zlib-compressed as one block.
+
+Every encode reports the compression ratio against the raw float64 arrays and
+the maximum distance of any original point from the stored path (which
+includes fixed-point rounding). Decoding is a decompress plus one cumulative
+sum per column, cheap enough to run on every dashboard request.
+"""
+
+import json
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from geometry import fill_gaps, project_to_metres, segment_distance
+
+MAGIC = b"STZ1"
+HEADER_LENGTH = struct.Struct("<I")
+
+# Fixed-point steps per unit: 1e-6 degree (~11 cm), 1 s, 10 cm, 10 cm, 1 cm/s
+STREAM_SCALES = {
+    "latlng": 1e6,
+    "time": 1.0,
+    "distance": 10.0,
+    "altitude": 10.0,
+    "velocity_smooth": 100.0,
+}
+DEFAULT_SCALE = 100.0
+
+DEFAULT_TOLERANCE_M = 2.0
+
+
+@dataclass
+class EncodedStreams:
+    """Compressed streams and what the compression cost."""
+    blob: bytes
+    source_points: int
+    stored_points: int
+    raw_bytes: int  # Size of the input as float64 arrays
+    max_error_m: float  # Furthest original point from the stored path
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.raw_bytes / len(self.blob) if self.blob else 0.0
+
+
+def simplify_indices(x: np.ndarray, y: np.ndarray, tolerance_m: float) -> np.ndarray:
+    """
+    Douglas-Peucker simplification.
+
+    Args:
+        x: Point x coordinates in metres
+        y: Point y coordinates in metres
+        tolerance_m: Largest allowed distance of a dropped point from the path
+
+    Returns:
+        Sorted indices of the points to keep (always includes both ends)
+    """
+    count = len(x)
+    if count <= 2:
+        return np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    pending = [(0, count - 1)]
+    while pending:
+        start, end = pending.pop()
+        if end - start < 2:
+            continue
+        distances = segment_distance(x[start + 1:end], y[start + 1:end], x[start], y[start], x[end], y[end])
+        furthest = int(np.argmax(distances))
+        if distances[furthest] > tolerance_m:
+            split = start + 1 + furthest
+            keep[split] = True
+            pending.append((start, split))
+            pending.append((split, end))
+    return np.flatnonzero(keep)
+
+
+def path_error(latlng: np.ndarray, kept: np.ndarray, stored_latlng: np.ndarray) -> float:
+    """
+    Furthest distance of any original point from the stored path.
+
+    Args:
+        latlng: Original (n, 2) coordinates
+        kept: Indices of the stored points in the original track
+        stored_latlng: Stored (decoded) coordinates of those points
+
+    Returns:
+        Maximum error in metres
+    """
+    if len(kept) == 0:
+        return 0.0
+    x, y = project_to_metres(np.concatenate([latlng, stored_latlng]))
+    x, y, sx, sy = x[:len(latlng)], y[:len(latlng)], x[len(latlng):], y[len(latlng):]
+    if len(kept) == 1:
+        return float(np.hypot(x - sx[0], y - sy[0]).max())
+
+    # Each original point is measured against the stored segment that spans it
+    segment = np.clip(np.searchsorted(kept, np.arange(len(latlng)), side="right") - 1, 0, len(kept) - 2)
+    return float(segment_distance(x, y, sx[segment], sy[segment], sx[segment + 1], sy[segment + 1]).max())
+
+
+def encode_streams(streams: Dict[str, np.ndarray],
+                   tolerance_m: Optional[float] = DEFAULT_TOLERANCE_M) -> EncodedStreams:
+    """
+    Simplify and compress a ride's streams.
+
+    Streams that are entirely NaN are dropped; partial gaps are interpolated.
+
+    Args:
+        streams: Stream type -> array of equal length (latlng as an (n, 2) array)
+        tolerance_m: Douglas-Peucker tolerance (None or 0 keeps every point)
+
+    Returns:
+        EncodedStreams with the blob, compression ratio and maximum path error
+    """
+    arrays = {key: np.asarray(values, dtype=float) for key, values in streams.items()}
+    arrays = {key: values for key, values in arrays.items() if len(values) and not np.isnan(values).all()}
+    source_points = max((len(values) for values in arrays.values()), default=0)
+    raw_bytes = sum(values.nbytes for values in arrays.values())
+
+    latlng = arrays.get("latlng")
+    if latlng is not None and tolerance_m:
+        kept = simplify_indices(*project_to_metres(latlng), tolerance_m)
+    else:
+        kept = np.arange(source_points)
+
+    columns, layout = [], []
+    for key, values in arrays.items():
+        scale = STREAM_SCALES.get(key, DEFAULT_SCALE)
+        values = fill_gaps(values[kept])
+        fixed = np.round(values.reshape(len(kept), -1).T * scale).astype(np.int64)
+        columns.append(np.diff(fixed, axis=1, prepend=0))
+        layout.append([key, scale, fixed.shape[0]])
+
+    deltas = np.concatenate(columns) if columns else np.zeros((0, 0), dtype=np.int64)
+    if np.abs(deltas).max(initial=0) > np.iinfo(np.int32).max:
+        raise ValueError("Stream values out of range for fixed-point storage")
+
+    header = json.dumps({"points": len(kept), "streams": layout}).encode()
+    blob = MAGIC + HEADER_LENGTH.pack(len(header)) + header + zlib.compress(deltas.astype("<i4").tobytes(), 6)
+
+    max_error_m = 0.0
+    if latlng is not None:
+        max_error_m = path_error(latlng, kept, decode_streams(blob)["latlng"])
+    return EncodedStreams(blob, source_points, len(kept), raw_bytes, max_error_m)
+
+
+def decode_streams(blob: bytes) -> Dict[str, np.ndarray]:
+    """
+    Decode a blob from encode_streams.
+
+    Args:
+        blob: Encoded streams
+
+    Returns:
+        Stream type -> float array (latlng as an (n, 2) array)
+    """
+    if blob[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an encoded stream blob")
+    offset = len(MAGIC) + HEADER_LENGTH.size
+    (header_length,) = HEADER_LENGTH.unpack_from(blob, len(MAGIC))
+    header = json.loads(blob[offset:offset + header_length])
+    points = header["points"]
+
+    deltas = np.frombuffer(zlib.decompress(blob[offset + header_length:]), dtype="<i4")
+    values = np.cumsum(deltas.reshape(-1, points), axis=1, dtype=np.int64) if points else deltas.reshape(-1, 0)
+
+    streams, row = {}, 0
+    for key, scale, width in header["streams"]:
+        decoded = values[row:row + width] / scale
+        streams[key] = decoded.T if width > 1 else decoded[0]
+        row += width
+    return streams
@@ -0,0 +1,139 @@
+"""
+Grade-Based Terrain Profiling
+
+This module classifies terrain from an activity's altitude and distance
+streams instead of the ride's average elevation gain per mile. Grade is
+smoothed over a distance window and the share of distance spent descending
+in each grade band is reported, since descents are where brakes do the work.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Grades (percent) within +/- this are treated as flat
+FLAT_GRADE_PERCENT = 2.0
+
+# Strava stream types needed for a terrain profile
+TERRAIN_STREAM_KEYS = ("distance", "altitude")
+
+# Descending grade bands in percent: (label, lower bound, upper bound)
+DESCENT_BANDS = (
+    ("2-4%", 2.0, 4.0),
+    ("4-8%", 4.0, 8.0),
+    ("8%+", 8.0, np.inf),
+)
+
+
+@dataclass
+class TerrainProfile:
+    """Share of a ride's distance spent at each grade."""
+    total_distance_m: float
+    flat_share: float
+    climbing_share: float
+    descent_shares: Dict[str, float]  # Band label -> share of distance
+    max_descent_grade_percent: float
+
+    @property
+    def descending_share(self) -> float:
+        """Share of distance descending steeper than the flat threshold."""
+        return sum(self.descent_shares.values())
+
+
+def smoothed_grade(
+    distance_m: np.ndarray,
+    altitude_m: np.ndarray,
+    window_m: float = 100.0,
+    resolution_m: float = 10.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute grade smoothed over a distance window.
+
+    The ride is cut into `resolution_m` slices; each slice's grade is the
+    altitude change across a `window_m` window centred on it.
+
+    Args:
+        distance_m: Cumulative distance in metres
+        altitude_m: Altitude in metres
+        window_m: Smoothing window in metres
+        resolution_m: Slice length in metres
+
+    Returns:
+        Tuple of (slice lengths in metres, grade in percent per slice)
+    """
+    distance = np.maximum.accumulate(np.asarray(distance_m, dtype=float))
+    altitude = np.asarray(altitude_m, dtype=float)
+    total = distance[-1] - distance[0] if len(distance) else 0.0
+    if total <= 0:
+        return np.zeros(0), np.zeros(0)
+
+    edges = np.append(np.arange(distance[0], distance[-1], resolution_m), distance[-1])
+    lengths = np.diff(edges)
+    centers = edges[:-1] + lengths / 2
+
+    half_window = window_m / 2
+    lower = np.maximum(centers - half_window, distance[0])
+    upper = np.minimum(centers + half_window, distance[-1])
+    rise = np.interp(upper, distance, altitude) - np.interp(lower, distance, altitude)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        grade = np.where(upper > lower, rise / (upper - lower) * 100.0, 0.0)
+
+    return lengths, grade
+
+
+def profile_terrain(
+    distance_m: np.ndarray,
+    altitude_m: np.ndarray,
+    window_m: float = 100.0,
+    resolution_m: float = 10.0
+) -> TerrainProfile:
+    """
+    Build a terrain profile from distance and altitude streams.
+
+    Args:
+        distance_m: Cumulative distance in metres
+        altitude_m: Altitude in metres
+        window_m: Grade smoothing window in metres
+        resolution_m: Slice length in metres
+
+    Returns:
+        TerrainProfile for the ride
+    """
+    lengths, grade = smoothed_grade(distance_m, altitude_m, window_m, resolution_m)
+    total = float(lengths.sum())
+    if total <= 0:
+        return TerrainProfile(0.0, 1.0, 0.0, {label: 0.0 for label, _, _ in DESCENT_BANDS}, 0.0)
+
+    descent = -grade
+    descent_shares = {
+        label: float(lengths[(descent > low) & (descent <= high)].sum() / total)
+        for label, low, high in DESCENT_BANDS
+    }
+
+    return TerrainProfile(
+        total_distance_m=total,
+        flat_share=float(lengths[np.abs(grade) <= FLAT_GRADE_PERCENT].sum() / total),
+        climbing_share=float(lengths[grade > FLAT_GRADE_PERCENT].sum() / total),
+        descent_shares=descent_shares,
+        max_descent_grade_percent=float(max(0.0, descent.max()))
+    )
+
+
+def profile_many(
+    streams: Iterable[Tuple[np.ndarray, np.ndarray]],
+    window_m: float = 100.0,
+    resolution_m: float = 10.0
+) -> List[TerrainProfile]:
+    """
+    Profile many rides, e.g. a year of activity streams.
+
+    Args:
+        streams: Iterable of (distance_m, altitude_m) pairs
+        window_m: Grade smoothing window in metres
+        resolution_m: Slice length in metres
+
+    Returns:
+        List of TerrainProfile objects in input order
+    """
+    return [profile_terrain(distance, altitude, window_m, resolution_m) for distance, altitude in streams]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the Activity Detail Cache
+"""
+
+import json
+import os
+import tempfile
+from unittest import mock
+
+from requests import Response
+
+from activity_cache import POLLING_MAX_AGE_SECONDS, ActivityCache
+from polyline_codec import encode_polyline
+from strava_brake_wear_estimator import StravaAPI
+from strava_monitor import start_monitor
+
+
+def detail_payload(activity_id: int, name: str = "Morning Commute") -> dict:
+    """An activity detail response with a long route and segment efforts."""
+    route = [[47.6 + i * 1e-4, -122.3 + (i % 7) * 1e-4] for i in range(2000)]
+    return {
+        "id": activity_id, "name": name, "type": "Ride", "distance": 12000.0, "moving_time": 2400,
+        "start_date": "2024-05-01T08:00:00Z", "start_latlng": route[0], "end_latlng": route[-1],
+        "map": {"polyline": encode_polyline(route), "summary_polyline": encode_polyline(route[::20])},
+        "segment_efforts": [{"id": i, "name": f"Segment {i}", "elapsed_time": 60 + i} for i in range(50)],
+    }
+
+
+def make_response(status: int, body=None, headers=None) -> Response:
+    response = Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = json.dumps(body).encode() if body is not None else b""
+    return response
+
+
+def test_repeat_lookups_cost_no_requests():
+    """Details are downloaded once; later lookups (and new clients) are served from disk."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ActivityCache(os.path.join(tmp, "activities.db"))
+        api = StravaAPI("id", "secret", "token", activity_cache=cache)
+        with mock.patch.object(api.session, "get",
+                               return_value=make_response(200, detail_payload(7), {"ETag": '"v1"'})) as get:
+            first = api.get_activity_details(7)
+            again = api.get_activity_details(7)
+            rerun = StravaAPI("id", "secret", "token", activity_cache=ActivityCache(cache.db_path))
+            assert rerun.get_activity_details(7) == first == again
+        assert get.call_count == 1
+
+        stats = cache.stats()
+        assert stats["entries"] == 1 and stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["compression_ratio"] > 2
+
+
+def test_stale_entries_are_revalidated():
+    """Stale entries send If-None-Match; 304 keeps the copy and 200 replaces it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ActivityCache(os.path.join(tmp, "activities.db"))
+        cache.put(7, detail_payload(7), etag='"v1"')
+        api = StravaAPI("id", "secret", "token", activity_cache=cache)
+
+        cache.mark_stale(7)
+        with mock.patch.object(api.session, "get", return_value=make_response(304)) as get:
+            assert api.get_activity_details(7)["name"] == "Morning Commute"
+            api.get_activity_details(7)  # Fresh again: no request
+        assert get.call_count == 1
+        assert get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        assert cache.stats()["revalidations"] == 1
+
+        cache.mark_stale(7)
+        renamed = make_response(200, detail_payload(7, "Renamed"), {"ETag": '"v2"'})
+        with mock.patch.object(api.session, "get", return_value=renamed):
+            assert api.get_activity_details(7)["name"] == "Renamed"
+        assert cache.get(7).etag == '"v2"'
+
+
+def test_max_age_expires_entries():
+    """With max_age_seconds, old entries are no longer served without asking."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ActivityCache(os.path.join(tmp, "activities.db"), max_age_seconds=60)
+        cache.put(7, detail_payload(7), last_modified="Wed, 01 May 2024 08:00:00 GMT")
+        assert cache.get(7).fresh
+        with mock.patch("activity_cache.time.time", return_value=cache.get(7).stored_at + 120):
+            cached = cache.get(7)
+        assert not cached.fresh
+        assert cached.conditional_headers() == {"If-Modified-Since": "Wed, 01 May 2024 08:00:00 GMT"}
+
+
+def test_polling_monitor_expires_cached_details():
+    """Without webhook events to mark edits stale, the polling monitor revalidates daily."""
+    with tempfile.TemporaryDirectory() as tmp, mock.patch("strava_monitor.StravaMonitor") as monitor:
+        start_monitor("id", "secret", "token", "maps-key", activity_cache_path=os.path.join(tmp, "activities.db"))
+        strava_api = monitor.call_args.args[0]
+        assert strava_api.activity_cache.max_age_seconds == POLLING_MAX_AGE_SECONDS
+        monitor.return_value.monitor_continuously.assert_called_once()
+
+
+if __name__ == "__main__":
+    print("🗄️  Activity Detail Cache - Tests")
+    print("=" * 50)
+    test_repeat_lookups_cost_no_requests()
+    test_stale_entries_are_revalidated()
+    test_max_age_expires_entries()
+    test_polling_monitor_expires_cached_details()
+    print("✅ All tests passed!")
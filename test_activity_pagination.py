@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for Paginated Strava Activity Fetching
+"""
+
+import json
+import threading
+import time
+from unittest import mock
+
+from requests import Response
+
+from strava_brake_wear_estimator import StravaAPI
+
+
+class PagedStravaAPI(StravaAPI):
+    """Serves a fixed number of activities page by page, recording requests."""
+
+    def __init__(self, total: int):
+        super().__init__("id", "secret", "token")
+        self.total = total
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get_activity_page(self, page, after=None, before=None, activity_type="Ride", per_page=200):
+        with self.lock:
+            self.requested.append(page)
+        start = (page - 1) * per_page
+        return [{"id": i, "type": "Ride"} for i in range(start, min(start + per_page, self.total))]
+
+
+def test_walks_every_page():
+    """All activities are returned, not just the first page."""
+    api = PagedStravaAPI(total=8)
+    assert [a["id"] for a in api.iter_activities(per_page=3)] == list(range(8))
+    assert api.requested == [1, 2, 3]
+
+    # A full last page needs one more (empty) request to know it was the last
+    api = PagedStravaAPI(total=6)
+    assert len(api.get_activities(per_page=3)) == 6
+    assert api.requested == [1, 2, 3]
+
+
+def test_stops_when_caller_stops():
+    """Breaking out early fetches at most the page being prefetched."""
+    api = PagedStravaAPI(total=1000)
+    for activity in api.iter_activities(per_page=10):
+        if activity["id"] == 12:
+            break
+    time.sleep(0.05)
+    assert api.requested in ([1, 2], [1, 2, 3])  # Page 3 may be cancelled before it starts
+
+
+def test_next_page_is_prefetched():
+    """The next page is requested while the caller is still working on the current one."""
+    api = PagedStravaAPI(total=40)
+    second_page_requested = threading.Event()
+    get_activity_page = api.get_activity_page
+
+    def recording_get_activity_page(page, *args, **kwargs):
+        if page == 2:
+            second_page_requested.set()
+        return get_activity_page(page, *args, **kwargs)
+
+    api.get_activity_page = recording_get_activity_page
+    pages = api.iter_activity_pages(per_page=10)
+    assert len(next(pages)) == 10
+    # The caller has not asked for another page yet
+    assert second_page_requested.wait(timeout=5)
+    assert sum(len(page) for page in pages) == 30
+
+
+def test_page_requests_carry_page_number():
+    """Each HTTP request asks for the next page of the same window."""
+    def page_response(activities):
+        response = Response()
+        response.status_code = 200
+        response._content = json.dumps(activities).encode()
+        return response
+
+    api = StravaAPI("id", "secret", "token")
+    pages = [page_response([{"id": 1}, {"id": 2}]), page_response([{"id": 3}])]
+    with mock.patch.object(api.session, "get", side_effect=pages) as get:
+        assert [a["id"] for a in api.iter_activities(per_page=2)] == [1, 2, 3]
+    assert [call.kwargs["params"]["page"] for call in get.call_args_list] == [1, 2]
+    assert all(call.kwargs["params"]["per_page"] == 2 for call in get.call_args_list)
+
+
+if __name__ == "__main__":
+    print("📄 Paginated Activity Fetching - Tests")
+    print("=" * 50)
+    test_walks_every_page()
+    test_stops_when_caller_stops()
+    test_next_page_is_prefetched()
+    test_page_requests_carry_page_number()
+    print("✅ All tests passed!")
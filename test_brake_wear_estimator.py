@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the Brake Pad Wear Estimator
+
+Checks the vectorized batch API against the scalar estimate_wear path.
+"""
+
+import numpy as np
+
+from brake_wear_estimator import (
+    BrakePadSpecs, BrakeWearEstimator, RidingConditions, TerrainType, WeatherCondition,
+    WEATHER_CODES, TERRAIN_CODES, encode_weather, encode_terrain, wear_rate_per_mile
+)
+from wear_model import builtin_model
+
+
+def make_estimator(material: str = "organic") -> BrakeWearEstimator:
+    """Create an estimator with standard 4mm pads."""
+    return BrakeWearEstimator(BrakePadSpecs(
+        material=material,
+        compound_hardness=5.0,
+        initial_thickness_mm=4.0,
+        minimum_thickness_mm=1.0
+    ))
+
+
+def make_sample_fleet(n: int = 500, seed: int = 7):
+    """Generate random ride columns covering every weather/terrain code."""
+    rng = np.random.default_rng(seed)
+    temperature = rng.uniform(-20, 50, n)
+    temperature[::5] = np.nan  # Some rides without weather data
+    return {
+        "miles_ridden": rng.uniform(0, 800, n),
+        "weather_codes": rng.integers(0, len(WEATHER_CODES), n),
+        "terrain_codes": rng.integers(0, len(TERRAIN_CODES), n),
+        "average_speed_kmh": rng.uniform(5, 60, n),
+        "rider_weight_kg": rng.uniform(40, 120, n),
+        "bike_weight_kg": rng.uniform(7, 25, n),
+        "braking_frequency": rng.uniform(1, 10, n),
+        "temperature_celsius": temperature,
+    }
+
+
+def test_batch_matches_scalar():
+    """Every row of the batch result equals the scalar estimate for that ride."""
+    estimator = make_estimator("sintered")
+    fleet = make_sample_fleet()
+    batch = estimator.estimate_wear_batch(**fleet)
+
+    for i in range(len(fleet["miles_ridden"])):
+        temperature = fleet["temperature_celsius"][i]
+        conditions = RidingConditions(
+            weather=WEATHER_CODES[fleet["weather_codes"][i]],
+            terrain=TERRAIN_CODES[fleet["terrain_codes"][i]],
+            rider_weight_kg=fleet["rider_weight_kg"][i],
+            bike_weight_kg=fleet["bike_weight_kg"][i],
+            average_speed_kmh=fleet["average_speed_kmh"][i],
+            braking_frequency=fleet["braking_frequency"][i]
+        )
+        scalar = estimator.estimate_wear(
+            fleet["miles_ridden"][i], conditions,
+            None if np.isnan(temperature) else temperature
+        )
+        for key in ("wear_mm", "remaining_thickness_mm", "wear_percentage",
+                    "remaining_miles", "needs_replacement"):
+            assert batch[key][i] == scalar[key], (i, key, batch[key][i], scalar[key])
+
+
+def test_batch_accepts_named_conditions_and_scalars():
+    """String conditions are encoded and scalar columns broadcast across rides."""
+    estimator = make_estimator()
+    batch = estimator.estimate_wear_batch(
+        miles_ridden=[100.0, 0.0, 250.0],
+        weather_codes=encode_weather(["wet", "dry", "not-a-weather"]),
+        terrain_codes=encode_terrain(["hilly", "flat", "urban"]),
+        average_speed_kmh=25.0,
+        rider_weight_kg=70.0,
+        bike_weight_kg=15.0,
+        braking_frequency=5.0
+    )
+
+    assert batch["wear_mm"].shape == (3,)
+    assert batch["wear_mm"][1] == 0.0
+    assert batch["remaining_miles"][1] == 0.0
+    # Unknown weather falls back to the neutral multiplier, like the scalar path
+    assert encode_weather(["not-a-weather"])[0] == -1
+    assert batch["wear_mm"][2] > 0.0
+
+
+def test_replacement_miles_is_closed_form_and_cached():
+    """Replacement miles use the unrounded rate, memoized per distinct conditions."""
+    estimator = make_estimator()
+    conditions = RidingConditions(
+        weather=WeatherCondition.WET,
+        terrain=TerrainType.HILLY,
+        rider_weight_kg=70.0,
+        bike_weight_kg=15.0,
+        average_speed_kmh=25.0,
+        braking_frequency=5.0
+    )
+    wear_rate_per_mile.cache_clear()
+
+    miles = estimator.estimate_replacement_miles(conditions, temperature_celsius=45.0)
+    again = estimator.estimate_replacement_miles(conditions, temperature_celsius=50.0)  # Same temperature band
+
+    expected_wear = 0.15 * 1.3 * 1.2 * (25.0 / 30.0) * 1.0 * 0.85 * 1.2 * 1.60934 / 1000.0
+    assert abs(miles - 3.0 / expected_wear) < 1e-6
+    assert again == miles
+    assert wear_rate_per_mile.cache_info().hits == 1
+
+    # A different wear model must not reuse the cached rate
+    model = builtin_model()
+    model.weather_multipliers["wet"] = 2.6
+    refit = BrakeWearEstimator(estimator.brake_pad_specs, wear_model=model)
+    assert abs(refit.estimate_replacement_miles(conditions, 45.0) - miles / 2) < 1e-6
+
+
+if __name__ == "__main__":
+    print("🚴‍♂️ Brake Pad Wear Estimator - Tests")
+    print("=" * 50)
+    test_batch_matches_scalar()
+    test_batch_accepts_named_conditions_and_scalars()
+    test_replacement_miles_is_closed_form_and_cached()
+    print("✅ All tests passed!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for Braking Event Detection
+
+Uses the recorded stream fixture in fixtures/ in place of the live Strava
+streams endpoint.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from braking_events import GRAVITY, braking_work, detect_braking_events, streams_to_arrays
+from test_strava_brake_wear_estimator import make_activities, make_estimator
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "strava_streams_sample.json")
+
+
+def load_fixture_streams():
+    """Load the sample activity streams (key_by_type form)."""
+    with open(FIXTURE_PATH) as f:
+        return json.load(f)
+
+
+def test_fixture_stops_and_descent_are_detected():
+    """The three traffic-light stops and the long descent show up as events."""
+    streams = streams_to_arrays(load_fixture_streams())
+    events = detect_braking_events(
+        streams["time"], streams["velocity_smooth"], streams["altitude"], streams["distance"]
+    )
+
+    assert len(events) == 5
+    descent = int(np.argmax(events.energy_joules))
+    assert events.duration_seconds[descent] > 250
+    assert np.all(events.speed_drop_mps[:3] > 6.5)
+
+
+def test_energy_balance_for_a_stop_and_a_steady_descent():
+    """A flat stop dissipates the kinetic energy; a steady descent the potential energy."""
+    mass = 85.0
+    t = np.arange(11, dtype=float)
+    v = np.linspace(10.0, 0.0, 11)
+    stop_energy = braking_work(t, v, total_mass_kg=mass).sum()
+    assert 0.8 * 0.5 * mass * 10.0 ** 2 < stop_energy < 0.5 * mass * 10.0 ** 2
+
+    # 600 m at -8% and 10 m/s: drag and rolling resistance absorb about 17 kJ
+    # of the 40 kJ potential energy, the brakes the rest
+    t = np.arange(61, dtype=float)
+    v = np.full(61, 10.0)
+    d = t * 10.0
+    alt = 500.0 - 0.08 * d
+    descent_energy = braking_work(t, v, alt, d, mass).sum()
+    assert 0.5 * mass * GRAVITY * 48.0 < descent_energy < 0.65 * mass * GRAVITY * 48.0
+
+
+def test_estimator_wear_from_fixture_streams():
+    """The estimator turns braking energy into wear for the ride."""
+    estimator = make_estimator()
+    ride = estimator.process_strava_ride(make_activities(1)[0])
+
+    result = estimator.estimate_wear_from_streams(ride, load_fixture_streams(), 75.0, 10.0)
+
+    assert result["braking_events"] == 5
+    assert result["braking_energy_kj"] > 50
+    assert result["wear_mm"] > 0
+
+
+def test_missing_velocity_stream_falls_back_to_distance():
+    """Uploads without velocity_smooth are scored from distance over time."""
+    estimator = make_estimator()
+    ride = estimator.process_strava_ride(make_activities(1)[0])
+    streams = load_fixture_streams()
+    without_velocity = {key: value for key, value in streams.items() if key != "velocity_smooth"}
+
+    measured = estimator.estimate_wear_from_streams(ride, streams, 75.0, 10.0)
+    derived = estimator.estimate_wear_from_streams(ride, without_velocity, 75.0, 10.0)
+
+    assert derived["speed_source"] == "distance"
+    assert derived["braking_events"] >= 3
+    assert abs(derived["braking_energy_kj"] - measured["braking_energy_kj"]) < 0.25 * measured["braking_energy_kj"]
+
+    try:
+        estimator.estimate_wear_from_streams(ride, {"time": streams["time"]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Streams without speed or distance should be rejected")
+
+
+if __name__ == "__main__":
+    print("🛑 Braking Event Detection - Tests")
+    print("=" * 50)
+    test_fixture_stops_and_descent_are_detected()
+    test_energy_balance_for_a_stop_and_a_steady_descent()
+    test_estimator_wear_from_fixture_streams()
+    test_missing_velocity_stream_falls_back_to_distance()
+    print("✅ All tests passed!")
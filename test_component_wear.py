@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the Multi-Component Wear Engine
+"""
+
+import json
+
+import numpy as np
+
+from component_wear import ComponentModel, ComponentWearEngine
+from strava_brake_wear_estimator import RideTable
+from test_strava_brake_wear_estimator import make_activities, make_estimator
+
+
+def test_brake_pad_component_matches_estimator():
+    """The pad component reproduces the estimator's unrounded wear exactly."""
+    estimator = make_estimator()
+    table = RideTable.from_activities(make_activities(300))
+
+    result = ComponentWearEngine(estimator).estimate_for_table(table, 80.0, 12.0)
+
+    expected = estimator._table_factors(table, 80.0, 12.0)["wear_mm"]
+    assert np.array_equal(result["components"]["brake_pad"]["ride_wear"], expected)
+    assert set(result["components"]) == {"brake_pad", "rotor", "chain", "cassette", "tire"}
+    assert result["ride_count"] == 300
+    json.dumps(result)  # Summaries are JSON-serializable
+
+
+def test_factors_are_computed_once_for_all_components():
+    """Registering more components does not rescan the rides."""
+    estimator = make_estimator()
+    calls = []
+    original = estimator._table_factors
+    estimator._table_factors = lambda *args: calls.append(1) or original(*args)
+
+    engine = ComponentWearEngine(estimator)
+    engine.register(ComponentModel("jockey_wheels", "%", 4.0, 100.0, {"weather_multiplier": 1.0}))
+    result = engine.estimate_for_table(RideTable.from_activities(make_activities(50)))
+
+    assert len(calls) == 1
+    assert result["components"]["jockey_wheels"]["total_wear"] > 0
+
+
+def test_installed_epochs_limit_rides():
+    """A chain fitted mid-history only counts rides since it was installed."""
+    estimator = make_estimator()
+    table = RideTable.from_activities(make_activities(100))
+    cutoff = int(np.median(table.start_epoch))
+
+    result = ComponentWearEngine(estimator).estimate_for_table(table, installed_epochs={"chain": cutoff})
+
+    chain = result["components"]["chain"]
+    assert np.all(np.array(chain["ride_wear"])[table.start_epoch < cutoff] == 0.0)
+    assert chain["distance_miles"] < result["total_distance_miles"]
+    assert result["components"]["cassette"]["distance_miles"] == result["total_distance_miles"]
+
+
+if __name__ == "__main__":
+    print("⚙️  Multi-Component Wear Engine - Tests")
+    print("=" * 50)
+    test_brake_pad_component_matches_estimator()
+    test_factors_are_computed_once_for_all_components()
+    test_installed_epochs_limit_rides()
+    print("✅ All tests passed!")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the Shared HTTP Session
+"""
+
+from unittest import mock
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from http_session import DEFAULT_TIMEOUT, HOST_POOL_SIZES, TimeoutHTTPAdapter, create_session, get_session
+from strava_brake_wear_estimator import StravaAPI, WeatherAPI
+from traffic_comparison import GoogleMapsAPI
+
+
+def test_hosts_get_their_own_bounded_pools():
+    """Each API host has a blocking pool of its configured size."""
+    session = create_session()
+    for prefix, size in HOST_POOL_SIZES.items():
+        adapter = session.get_adapter(prefix + "some/path")
+        assert isinstance(adapter, TimeoutHTTPAdapter)
+        assert adapter._pool_maxsize == size and adapter._pool_block
+    assert session.get_adapter("https://example.com/")._pool_maxsize == 4
+
+
+def test_default_timeout_is_applied():
+    """Requests without a timeout get the default; explicit timeouts are kept."""
+    response = Response()
+    response.status_code = 200
+    session = create_session()
+    with mock.patch.object(HTTPAdapter, "send", return_value=response) as send:
+        session.get("https://www.strava.com/api/v3/athlete")
+        session.get("https://www.strava.com/api/v3/athlete", timeout=1)
+    assert send.call_args_list[0].kwargs["timeout"] == DEFAULT_TIMEOUT
+    assert send.call_args_list[1].kwargs["timeout"] == 1
+
+
+def test_api_clients_share_one_session():
+    """Strava, weather and Google clients reuse the shared session."""
+    shared = get_session()
+    assert get_session() is shared
+    assert StravaAPI("id", "secret").session is shared
+    assert WeatherAPI("key").session is shared
+    assert GoogleMapsAPI("key").session is shared
+
+
+if __name__ == "__main__":
+    print("🔌 Shared HTTP Session - Tests")
+    print("=" * 50)
+    test_hosts_get_their_own_bounded_pools()
+    test_default_timeout_is_applied()
+    test_api_clients_share_one_session()
+    print("✅ All tests passed!")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for the Encoded Polyline Codec
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from polyline_codec import decode_polyline, decode_polylines, encode_polyline, split_polylines
+from run_benchmarks import naive_decode_polyline
+from strava_monitor import StravaMonitor
+from traffic_comparison import GoogleMapsAPI, StravaTrafficAnalyzer, compare_routes
+
+# Example from Google's polyline algorithm documentation
+GOOGLE_EXAMPLE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+
+def random_route(rng, points: int) -> np.ndarray:
+    """A random walk around Seattle, rounded to polyline precision."""
+    steps = rng.normal(0, 3e-4, (points, 2))
+    return np.round(np.array([47.6, -122.3]) + np.cumsum(steps, axis=0), 5)
+
+
+def test_google_example():
+    """Decoding and encoding match the documented example."""
+    coords = decode_polyline(GOOGLE_EXAMPLE)
+    assert np.allclose(coords, [[38.5, -120.2], [40.7, -120.95], [43.252, -126.453]])
+    assert encode_polyline(coords) == GOOGLE_EXAMPLE
+
+
+def test_batch_matches_naive_decoder():
+    """A mixed batch decodes to the same points as decoding one at a time."""
+    rng = np.random.default_rng(4)
+    routes = [random_route(rng, n) for n in (1, 250, 0, 37, 1000)]
+    encoded = [encode_polyline(route) for route in routes]
+
+    coords, offsets = decode_polylines(encoded)
+    assert list(np.diff(offsets)) == [1, 250, 0, 37, 1000]
+    for route, text, decoded in zip(routes, encoded, split_polylines(coords, offsets)):
+        assert np.allclose(decoded, route, atol=1e-9)
+        assert np.allclose(decoded, np.array(naive_decode_polyline(text)).reshape(-1, 2), atol=1e-12)
+
+
+def test_malformed_polylines_raise():
+    """Truncated or invalid input is rejected rather than bleeding into the next polyline."""
+    for bad in (GOOGLE_EXAMPLE[:-1], "_p", "\x10?"):
+        try:
+            decode_polylines([bad, GOOGLE_EXAMPLE])
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} decoded without error")
+
+
+def test_compare_routes():
+    """A ride that leaves the car route halfway shares only the first half."""
+    car = np.column_stack([np.full(101, 47.6), np.linspace(-122.30, -122.28, 101)])
+    bike = car.copy()
+    bike[50:, 0] += 0.002  # About 220 m north for the second half
+
+    result = compare_routes(bike, car)
+    # 735 m shared out of 1.5 km plus the 220 m detour north
+    assert abs(result["overlap_percentage"] - 735 / 1722 * 100) < 1
+    assert 200 < result["max_deviation_meters"] < 240
+    assert compare_routes(car, car)["overlap_percentage"] == 100.0
+
+
+class FakeStrava:
+    def get_activity_details(self, activity_id):
+        return {
+            "name": "Commute", "moving_time": 900, "distance": 3000.0,
+            "start_date": "2024-05-01T08:00:00Z",
+            "start_latlng": [47.6, -122.3], "end_latlng": [47.6, -122.28],
+            "map": {"summary_polyline": encode_polyline([[47.6, -122.3], [47.6, -122.29], [47.6, -122.28]])},
+        }
+
+
+class FakeGoogle(GoogleMapsAPI):
+    def __init__(self):
+        super().__init__("key")
+
+    def get_route_time(self, *args, **kwargs):
+        return {
+            "duration_seconds": 600, "traffic_conditions": "Light Traffic", "route_summary": "Main St",
+            "polyline": encode_polyline([[47.6, -122.3], [47.6, -122.28]]),
+        }
+
+
+def test_analyzer_reports_route_overlap():
+    """Traffic comparisons include route overlap when both polylines are present."""
+    comparison = StravaTrafficAnalyzer(FakeStrava(), FakeGoogle()).analyze_activity_traffic(1)
+    assert comparison.route_overlap_percentage == 100.0
+    assert comparison.route_max_deviation_meters < 1.0
+
+
+def test_monitor_stores_route_overlap():
+    """Captured and pending-then-captured comparisons keep their route overlap."""
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = StravaMonitor(FakeStrava(), FakeGoogle(), os.path.join(tmp, "traffic.db"))
+        monitor.capture_traffic_for_activity(1)
+        monitor.store_pending_activity(dict(FakeStrava().get_activity_details(2), id=2))
+        assert monitor.process_pending_captures() == 1
+
+        stored = monitor.get_all_comparisons()
+        assert sorted(c.activity_id for c in stored) == [1, 2]
+        assert all(c.route_overlap_percentage == 100.0 for c in stored)
+        assert all(c.route_max_deviation_meters < 1.0 for c in stored)
+
+
+if __name__ == "__main__":
+    print("🧭 Encoded Polyline Codec - Tests")
+    print("=" * 50)
+    test_google_example()
+    test_batch_matches_naive_decoder()
+    test_malformed_polylines_raise()
+    test_compare_routes()
+    test_analyzer_reports_route_overlap()
+    test_monitor_stores_route_overlap()
+    print("✅ All tests passed!")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for API Rate Limiting
+"""
+
+import json
+from unittest import mock
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+import pytest
+
+from http_session import create_session, get_rate_limiter, max_rate_limit_wait
+from rate_limiter import (
+    AdaptiveRateLimiter, GoogleMapsRateLimiter, RateLimiter, RateLimitExceeded, StravaRateLimiter, TokenBucket
+)
+from traffic_comparison import GoogleMapsAPI
+
+QUARTER_HOUR = 1_700_000_110.0  # A clock time 10 s after a 15-minute boundary
+
+
+class FakeClock:
+    """Clock whose sleep advances time instantly."""
+
+    def __init__(self, now: float = QUARTER_HOUR):
+        self.now = now
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def make_response(status: int = 200, headers=None, body=None) -> Response:
+    response = Response()
+    response.status_code = status
+    response.headers.update({"Content-Type": "application/json", **(headers or {})})
+    response._content = json.dumps(body or {}).encode()
+    return response
+
+
+def test_token_bucket_bursts_then_paces():
+    """A full bucket allows its burst at once, then one call per 1/rate seconds."""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_strava_runs_freely_with_headroom():
+    """With most of the window left, calls go straight through."""
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.observe(make_response(headers={"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "10,100"}))
+    waited = [limiter.acquire() for _ in range(20)]
+    assert sum(waited) == 0.0
+
+
+def test_strava_paces_near_the_limit_and_pauses_when_spent():
+    """Near the 15-minute limit calls are spread out; once spent they wait for the reset."""
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    # Tighter read limit is the one that counts: 5 calls left (after the 5% reserve) for the rest of the window
+    limiter.observe(make_response(headers={
+        "X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "50,100",
+        "X-ReadRateLimit-Limit": "100,1000", "X-ReadRateLimit-Usage": "90,100",
+    }))
+    assert limiter.limits == [100, 1000] and limiter.usage == [90, 100]
+
+    for _ in range(5):
+        limiter.acquire()
+    assert max(clock.slept) > 60  # Spread over the window rather than bunched
+
+    limiter.acquire()  # Quota spent: waits for the quarter-hour reset
+    assert clock.now % 900 == 0
+    assert limiter.acquire() == 0.0  # Fresh window
+
+
+def test_strava_429_waits_for_reset_or_retry_after():
+    """A 429 pauses calls until the next window, or for Retry-After when given."""
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.observe(make_response(429))
+    limiter.acquire()
+    assert clock.now % 900 == 0
+
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.observe(make_response(429, headers={"Retry-After": "30"}))
+    assert limiter.acquire() == 30.0
+
+
+def test_adaptive_limiter_backs_off_and_recovers():
+    """Throttling halves the rate and pauses; successes restore the rate."""
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(max_rate=8.0, recovery_step=1.0, clock=clock, sleep=clock.sleep)
+    limiter.throttled()
+    limiter.throttled()
+    assert limiter.rate == 2.0
+    assert 1.0 <= limiter.acquire() <= 2.0  # Second backoff: 2 s with jitter
+
+    for _ in range(10):
+        limiter.observe(make_response(200))
+    assert limiter.rate == 8.0
+
+
+def test_session_applies_host_limiters():
+    """Only requests to a limited host go through its limiter."""
+    limiter = mock.Mock()
+    session = create_session(rate_limiters={"https://www.strava.com/": limiter})
+    response = make_response()
+    with mock.patch.object(HTTPAdapter, "send", return_value=response):
+        session.get("https://www.strava.com/api/v3/athlete")
+        session.get("https://api.openweathermap.org/data/2.5/weather")
+    limiter.acquire.assert_called_once()
+    limiter.observe.assert_called_once_with(response)
+    assert get_rate_limiter(session, "https://www.strava.com/api/v3/athlete") is limiter
+
+
+def test_google_over_query_limit_is_retried():
+    """OVER_QUERY_LIMIT (sent with HTTP 200) slows the Google limiter and the request is retried."""
+    clock = FakeClock()
+    limiter = GoogleMapsRateLimiter(max_rate=10.0, clock=clock, sleep=clock.sleep)
+    session = create_session(rate_limiters={"https://maps.googleapis.com/": limiter})
+    route = {"status": "OK", "routes": [{"summary": "I-5", "legs": [{
+        "duration": {"value": 600, "text": "10 mins"}, "distance": {"value": 5000, "text": "5 km"},
+    }]}]}
+    responses = [make_response(body={"status": "OVER_QUERY_LIMIT"}), make_response(body=route)]
+    with mock.patch.object(HTTPAdapter, "send", side_effect=responses):
+        result = GoogleMapsAPI("key", session=session).get_route_time(47.6, -122.3, 47.7, -122.3)
+    assert result["duration_seconds"] == 600
+    assert clock.slept  # Backed off before retrying
+    assert limiter.rate == pytest.approx(5.1)  # Halved once by the limiter, then one success
+
+
+def test_base_limiter_is_abstract():
+    """A limiter must say how it backs off from a 429."""
+    with pytest.raises(TypeError):
+        RateLimiter(TokenBucket(1.0, 1.0))
+
+
+def test_max_wait_fails_fast_without_spending_quota():
+    """A capped caller gets RateLimitExceeded instead of sleeping, and its call is not counted."""
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.observe(make_response(headers={"X-RateLimit-Limit": "200,2000", "X-RateLimit-Usage": "190,300"}))
+
+    with pytest.raises(RateLimitExceeded) as raised:
+        limiter.acquire(max_wait=2.0)
+    assert raised.value.retry_after > 2.0
+    assert clock.slept == [] and limiter.usage == [190, 300]
+
+    # The dashboard's session cap applies to the calling thread only
+    session = create_session(rate_limiters={"https://www.strava.com/": limiter})
+    with mock.patch.object(HTTPAdapter, "send", return_value=make_response()) as send:
+        with max_rate_limit_wait(2.0), pytest.raises(RateLimitExceeded):
+            session.get("https://www.strava.com/api/v3/athlete")
+        send.assert_not_called()
+        session.get("https://www.strava.com/api/v3/athlete")
+    assert clock.now % 900 == 0  # Uncapped, it waited for the reset
+
+
+def test_dashboard_answers_503_when_strava_quota_is_spent():
+    """The OAuth callback returns 503 with Retry-After instead of waiting for the window to reset."""
+    import web_dashboard
+
+    clock = FakeClock()
+    limiter = StravaRateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.throttled()
+    session = create_session(rate_limiters={"https://www.strava.com/": limiter})
+    with mock.patch.object(web_dashboard, "get_http_session", return_value=session), \
+            mock.patch.object(HTTPAdapter, "send") as send:
+        response = web_dashboard.app.test_client().get("/oauth/callback?code=abc")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) == 890
+    send.assert_not_called()
+    assert clock.slept == []
+
+
+if __name__ == "__main__":
+    print("🚦 API Rate Limiting - Tests")
+    print("=" * 50)
+    test_token_bucket_bursts_then_paces()
+    test_strava_runs_freely_with_headroom()
+    test_strava_paces_near_the_limit_and_pauses_when_spent()
+    test_strava_429_waits_for_reset_or_retry_after()
+    test_adaptive_limiter_backs_off_and_recovers()
+    test_session_applies_host_limiters()
+    test_google_over_query_limit_is_retried()
+    test_base_limiter_is_abstract()
+    test_max_wait_fails_fast_without_spending_quota()
+    test_dashboard_answers_503_when_strava_quota_is_spent()
+    print("✅ All tests passed!")
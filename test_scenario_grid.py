@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the What-If Scenario Grid
+"""
+
+import itertools
+
+import numpy as np
+
+from brake_wear_estimator import estimate_brake_pad_wear
+from scenario_grid import RESULT_COLUMNS, evaluate_scenario_grid
+
+
+def test_grid_matches_scalar_calls():
+    """Every cell equals estimate_brake_pad_wear for that cell's values."""
+    sweep = {
+        "miles_ridden": [0.0, 250.0, 1500.0],
+        "weather": ["dry", "wet", "bogus"],
+        "terrain": ["hilly", "off_road"],
+        "brake_material": ["organic", "ceramic", "sintered"],
+        "rider_weight_kg": [55.0, 95.0],
+        "temperature_celsius": [None, -15.0],
+    }
+    table = evaluate_scenario_grid(**sweep)
+    assert len(table) == 3 * 3 * 2 * 3 * 2 * 2
+
+    for index, values in enumerate(itertools.product(*sweep.values())):
+        expected = estimate_brake_pad_wear(**dict(zip(sweep, values)))
+        row = table.row(index)
+        for name in RESULT_COLUMNS:
+            assert row[name] == expected[name], (values, name)
+
+
+def test_rank_orders_options():
+    """Ranking by remaining miles puts the hardest-wearing pads first."""
+    table = evaluate_scenario_grid(
+        brake_material=["organic", "semi-metallic", "ceramic", "sintered"],
+        weather=["dry", "wet"],
+        miles_ridden=500.0
+    )
+
+    best = table.rank("remaining_miles", top=2)
+    assert [(row["brake_material"], row["weather"]) for row in best] == [("ceramic", "dry"), ("sintered", "dry")]
+    assert list(table.column("brake_material")[:2]) == ["organic", "semi-metallic"]
+
+
+def test_million_cell_grid():
+    """A 1M-cell grid evaluates into one rankable table."""
+    table = evaluate_scenario_grid(
+        miles_ridden=np.linspace(100, 5000, 25),
+        weather=["dry", "wet", "rainy", "snowy", "muddy"],
+        terrain=["flat", "hilly", "mountainous", "urban"],
+        brake_material=["organic", "semi-metallic", "ceramic", "sintered"],
+        rider_weight_kg=np.linspace(50, 120, 10),
+        average_speed_kmh=np.linspace(10, 40, 10),
+        braking_frequency=np.linspace(1, 10, 5),
+    )
+
+    assert len(table) == 1_000_000
+    assert len(table.rank(top=5)) == 5
+
+
+if __name__ == "__main__":
+    print("🧮 What-If Scenario Grid - Tests")
+    print("=" * 50)
+    test_grid_matches_scalar_calls()
+    test_rank_orders_options()
+    test_million_cell_grid()
+    print("✅ All tests passed!")
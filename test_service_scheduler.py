@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the Nightly Service-Due Scheduler
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from service_scheduler import AthleteAccount, ServiceScheduler
+from strava_brake_wear_estimator import BrakePadSpecs
+from test_strava_brake_wear_estimator import make_activities
+from test_wear_ledger import FakeStravaAPI
+from wear_ledger import WearLedger
+
+NOW = datetime.now(timezone.utc)
+
+
+def recent_activities(n: int, days: int, gear_id: str, seed: int):
+    """Activities spread evenly over the last `days` days on one bike."""
+    activities = make_activities(n, seed=seed)
+    for i, activity in enumerate(activities):
+        started = NOW - timedelta(days=days * (n - i) / n)
+        activity["start_date"] = started.strftime("%Y-%m-%dT%H:%M:%SZ")
+        activity["gear_id"] = gear_id
+    return activities
+
+
+class SlowFakeStravaAPI(FakeStravaAPI):
+    """FakeStravaAPI that takes a while to answer, like the real one."""
+
+    def get_activities(self, *args, **kwargs):
+        time.sleep(0.2)
+        return super().get_activities(*args, **kwargs)
+
+
+def make_scheduler(tmp, activities_by_athlete, api_class=FakeStravaAPI, **options):
+    """Scheduler over fake athletes; returns it with the per-athlete fake clients."""
+    apis = {athlete_id: api_class(activities) for athlete_id, activities in activities_by_athlete.items()}
+    scheduler = ServiceScheduler(
+        "id", "secret", WearLedger(os.path.join(tmp, "ledger.db")),
+        db_path=os.path.join(tmp, "service.db"),
+        api_factory=lambda account: apis[account.athlete_id],
+        initial_days_back=365, **options
+    )
+    far_future = int(NOW.timestamp()) + 86400
+    for athlete_id in activities_by_athlete:
+        scheduler.tokens.save_account(AthleteAccount(athlete_id, "token", "refresh", far_future))
+    return scheduler, apis
+
+
+def test_due_list_is_ordered_by_urgency():
+    """Heavily ridden bikes come first; later runs only fetch new rides."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler, apis = make_scheduler(tmp, {
+            1: recent_activities(10, 60, "b-light", seed=1),
+            2: recent_activities(120, 60, "b-heavy", seed=2),
+            3: recent_activities(40, 60, "b-medium", seed=3),
+        })
+        # The heavy rider's pads were already near the limit when fitted
+        scheduler.tokens.save_account(AthleteAccount(
+            2, "token", "refresh", int(NOW.timestamp()) + 86400,
+            initial_thickness_mm=1.5, minimum_thickness_mm=1.0
+        ))
+
+        summary = scheduler.run()
+        assert summary["processed"] == 3 and summary["remaining"] == 0
+
+        due = scheduler.get_due_list()
+        assert [d.gear_id for d in due] == ["b-heavy", "b-medium", "b-light"]
+        assert due[0].urgency == "overdue" and due[0].wear_percentage == 100.0
+        assert due[-1].days_until_due > due[1].days_until_due > 0
+        entry = scheduler.ledger.get_entry(2, "b-heavy")
+        assert entry.ride_count == 120
+
+        # The next night nothing is new, so the ledger is unchanged
+        scheduler.run()
+        assert scheduler.ledger.get_entry(2, "b-heavy").ride_count == 120
+        assert apis[2].calls == 2
+
+
+def test_interrupted_run_resumes():
+    """A run that runs out of time is picked up without redoing finished athletes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler, apis = make_scheduler(tmp, {
+            athlete_id: recent_activities(5, 30, f"b{athlete_id}", seed=athlete_id)
+            for athlete_id in range(1, 5)
+        }, api_class=SlowFakeStravaAPI, max_workers=1)
+
+        first = scheduler.run(window_seconds=0.05)
+        assert first["processed"] == 1 and first["remaining"] == 3
+
+        second = scheduler.run()
+        assert second["run_id"] == first["run_id"]
+        assert second["processed"] == 3 and second["remaining"] == 0
+        assert all(api.calls == 1 for api in apis.values())
+        assert len(scheduler.get_due_list()) == 4
+
+        # A finished run is not resumed
+        assert scheduler.run(window_seconds=0)["run_id"] != first["run_id"]
+
+
+def test_last_nights_run_is_not_resumed():
+    """A run cut off by its deadline is resumed that night, but the next night starts a new run."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler, apis = make_scheduler(tmp, {
+            athlete_id: recent_activities(5, 30, f"b{athlete_id}", seed=athlete_id)
+            for athlete_id in range(1, 4)
+        }, api_class=SlowFakeStravaAPI, max_workers=1)
+        last_night = NOW - timedelta(days=1)
+
+        first = scheduler.run(window_seconds=0.05, now=last_night)
+        assert first["processed"] == 1 and first["remaining"] == 2
+        again = scheduler.run(window_seconds=0.05, now=last_night + timedelta(minutes=30))
+        assert again["run_id"] == first["run_id"] and again["processed"] == 1
+
+        tonight = scheduler.run(now=NOW)
+        assert tonight["run_id"] != first["run_id"]
+        assert tonight["processed"] == 3 and tonight["remaining"] == 0
+
+
+def test_bikes_use_their_recorded_pads():
+    """A bike with recorded pad specs is scored and projected with them, and re-scored when they change."""
+    road = recent_activities(30, 30, "b-road", seed=4)
+    mtb = recent_activities(30, 30, "b-mtb", seed=4)
+    for activity in mtb:
+        activity["id"] += 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler, _ = make_scheduler(tmp, {1: road + mtb})
+        scheduler.ledger.set_bike_specs(1, "b-mtb", BrakePadSpecs("ceramic", 5.0, 2.5, 1.0))
+        scheduler.run()
+
+        road_entry = scheduler.ledger.get_entry(1, "b-road")
+        mtb_entry = scheduler.ledger.get_entry(1, "b-mtb")
+        # Same rides: ceramic pads wear at 0.08 against organic's 0.15
+        assert mtb_entry.cumulative_wear_mm == pytest.approx(road_entry.cumulative_wear_mm * 0.08 / 0.15, rel=1e-3)
+
+        due = {d.gear_id: d for d in scheduler.get_due_list()}
+        assert due["b-mtb"].wear_percentage == pytest.approx(
+            min(100.0, mtb_entry.cumulative_wear_mm / 1.5 * 100), abs=0.1
+        )
+
+        # Fitting organic pads re-scores the bike's existing total with them
+        scheduler.ledger.set_bike_specs(1, "b-mtb", BrakePadSpecs("organic", 5.0, 4.0, 1.0))
+        scheduler.run()
+        rebuilt = scheduler.ledger.get_entry(1, "b-mtb")
+        assert rebuilt.ride_count == 30
+        assert rebuilt.cumulative_wear_mm == pytest.approx(road_entry.cumulative_wear_mm, rel=1e-6)
+
+
+if __name__ == "__main__":
+    print("🗓️  Nightly Service-Due Scheduler - Tests")
+    print("=" * 50)
+    test_due_list_is_ordered_by_urgency()
+    test_interrupted_run_resumes()
+    test_last_nights_run_is_not_resumed()
+    test_bikes_use_their_recorded_pads()
+    print("✅ All tests passed!")
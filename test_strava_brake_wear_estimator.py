@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Tests for the Strava-Integrated Brake Pad Wear Estimator
+
+Uses synthetic Strava activity JSON, so no API credentials are needed.
+"""
+
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+from strava_brake_wear_estimator import (
+    BrakePadSpecs, RideTable, StravaAPI, StravaBrakeWearEstimator,
+    WearAccumulator, WeatherAPI, WeatherCondition, TerrainType
+)
+
+
+def make_activities(n: int = 300, seed: int = 3):
+    """Generate Strava-style activity dicts."""
+    rng = np.random.default_rng(seed)
+    activities = []
+    for i in range(n):
+        activities.append({
+            "id": 1000 + i,
+            "name": f"Ride {i}",
+            "type": "Ride",
+            "distance": float(rng.uniform(0, 80000)),
+            "total_elevation_gain": float(rng.uniform(0, 2500)),
+            "average_speed": float(rng.uniform(2, 12)),
+            "max_speed": float(rng.uniform(10, 25)),
+            "moving_time": int(rng.integers(600, 14400)),
+            "start_date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T07:{i % 60:02d}:00Z",
+            "start_latlng": [47.6, -122.3],
+        })
+    return activities
+
+
+def make_estimator() -> StravaBrakeWearEstimator:
+    """Create an estimator without weather lookups."""
+    specs = BrakePadSpecs(
+        material="sintered",
+        compound_hardness=5.0,
+        initial_thickness_mm=4.0,
+        minimum_thickness_mm=1.0
+    )
+    return StravaBrakeWearEstimator(specs, StravaAPI("id", "secret", "token"))
+
+
+def test_ride_table_matches_processed_rides():
+    """A table built from JSON holds the same values as process_strava_ride."""
+    estimator = make_estimator()
+    activities = make_activities(50)
+    table = RideTable.from_activities(activities)
+
+    assert len(table) == 50
+    for index, activity in enumerate(activities):
+        expected = estimator.process_strava_ride(activity)
+        assert table.ride(index) == expected
+
+
+def test_total_wear_from_table_matches_list():
+    """estimate_total_wear gives the same summary for a RideTable and a list."""
+    estimator = make_estimator()
+    activities = make_activities()
+    rides = [estimator.process_strava_ride(a) for a in activities]
+    rides[0].weather_condition = WeatherCondition.MUDDY
+    rides[1].temperature_celsius = 45.0
+    rides[2].terrain_type = TerrainType.OFF_ROAD
+
+    from_list = estimator.estimate_total_wear(rides, 80.0, 10.0)
+    from_table = estimator.estimate_total_wear(RideTable.from_rides(rides), 80.0, 10.0)
+
+    assert from_table == from_list
+
+
+def test_ride_table_from_pages():
+    """Pages of JSON concatenate into a single table in order."""
+    activities = make_activities(25)
+    pages = [activities[:10], activities[10:20], activities[20:]]
+    table = RideTable.from_activity_pages(pages)
+
+    assert table.id.tolist() == [a["id"] for a in activities]
+    assert table.names[-1] == "Ride 24"
+    assert table.nbytes < 100 * len(table)
+
+
+def test_streaming_matches_list_and_keeps_worst_rides():
+    """The streaming fold gives the list totals plus the top-N worst rides."""
+    estimator = make_estimator()
+    rides = [estimator.process_strava_ride(a) for a in make_activities()]
+
+    full = estimator.estimate_total_wear(rides)
+    streamed = estimator.estimate_total_wear_streaming(iter(rides), top_n=5)
+
+    for key in ("total_wear_mm", "remaining_thickness_mm", "wear_percentage",
+                "total_distance_miles", "remaining_miles", "needs_replacement", "ride_count"):
+        assert streamed[key] == full[key], key
+    expected_worst = sorted(full["ride_details"], key=lambda d: -d["wear_mm"])[:5]
+    assert [d["wear_mm"] for d in streamed["ride_details"]] == [d["wear_mm"] for d in expected_worst]
+
+
+def test_iter_ride_wear_yields_details_while_folding():
+    """iter_ride_wear streams details and fills an accumulator at the same time."""
+    estimator = make_estimator()
+    rides = (estimator.process_strava_ride(a) for a in make_activities(20))
+    accumulator = WearAccumulator()
+
+    details = list(estimator.iter_ride_wear(rides, accumulator=accumulator))
+
+    assert len(details) == 20
+    assert accumulator.ride_count == 20
+    assert estimator.summarize_accumulator(accumulator)["ride_details"] == []
+
+
+def test_streaming_memory_does_not_grow_with_ride_count():
+    """Peak memory for 20x the rides stays roughly flat."""
+    estimator = make_estimator()
+    template = estimator.process_strava_ride(make_activities(1)[0])
+
+    def ride_stream(n):
+        for _ in range(n):
+            yield template
+
+    def peak_bytes(n):
+        tracemalloc.start()
+        estimator.estimate_total_wear_streaming(ride_stream(n), top_n=3)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    small, large = peak_bytes(1000), peak_bytes(20000)
+    assert large < small * 2 + 10000, (small, large)
+
+
+class SlowWeatherAPI(WeatherAPI):
+    """Simulates a weather round-trip and records peak concurrency."""
+
+    def __init__(self, delay: float):
+        super().__init__("key")
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get_weather_for_ride(self, lat, lon, date):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return {"temp": float(date.minute), "weather": [{"id": 500}], "rain": {"1h": 3.0}}
+
+
+def test_concurrent_enrichment_keeps_order_and_bounds_in_flight():
+    """Weather is fetched in parallel, capped at max_workers, in ride order."""
+    weather_api = SlowWeatherAPI(delay=0.05)
+    estimator = make_estimator()
+    estimator.weather_api = weather_api
+    activities = make_activities(40)
+
+    rides = estimator.process_strava_rides(activities, max_workers=8)
+
+    assert [r.id for r in rides] == [a["id"] for a in activities]
+    assert all(r.weather_condition == WeatherCondition.RAINY for r in rides)
+    assert 1 < weather_api.max_in_flight <= 8
+
+
+def test_wear_by_gear_uses_each_bikes_pads():
+    """Per-bike totals match a dedicated estimator per bike."""
+    activities = make_activities(120)
+    for index, activity in enumerate(activities):
+        activity["gear_id"] = ["b1", "b2", None][index % 3]
+    estimator = make_estimator()
+    organic = BrakePadSpecs("organic", 5.0, 5.0, 1.5)
+    table = RideTable.concat([RideTable.from_activities(activities[:60]), RideTable.from_activities(activities[60:])])
+
+    by_gear = estimator.estimate_wear_by_gear(table, {"b2": organic}, 80.0, 10.0)
+
+    assert list(by_gear) == ["b1", "b2", ""]
+    for gear_id, specs in (("b1", estimator.brake_pad_specs), ("b2", organic), (None, estimator.brake_pad_specs)):
+        bike = StravaBrakeWearEstimator(specs, estimator.strava_api)
+        expected = bike.estimate_total_wear(table.take(table.gear_mask(gear_id)), 80.0, 10.0)
+        summary = by_gear[gear_id or ""]
+        assert summary["total_wear_mm"] == expected["total_wear_mm"]
+        assert summary["remaining_miles"] == expected["remaining_miles"]
+        assert summary["ride_count"] == 40
+
+
+if __name__ == "__main__":
+    print("🚴‍♂️ Strava Brake Pad Wear Estimator - Tests")
+    print("=" * 50)
+    test_ride_table_matches_processed_rides()
+    test_total_wear_from_table_matches_list()
+    test_ride_table_from_pages()
+    test_streaming_matches_list_and_keeps_worst_rides()
+    test_iter_ride_wear_yields_details_while_folding()
+    test_streaming_memory_does_not_grow_with_ride_count()
+    test_concurrent_enrichment_keeps_order_and_bounds_in_flight()
+    test_wear_by_gear_uses_each_bikes_pads()
+    print("✅ All tests passed!")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for Strava Bulk Export Ingestion
+"""
+
+import gzip
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from braking_events import streams_to_arrays
+from ride_store import RideStore, StoredStravaAPI
+from strava_brake_wear_estimator import RideTable
+from strava_export_ingest import gear_ids_by_name, ingest_export
+from synthetic_tracks import make_gpx
+
+CSV_HEADER = (
+    "Activity ID,Activity Date,Activity Name,Activity Type,Elapsed Time,Distance,"
+    "Activity Gear,Filename,Elapsed Time,Moving Time,Distance,Max Speed,Average Speed,Elevation Gain\n"
+)
+
+
+def make_export(path: str):
+    """Write a small export archive with GPX, gzipped GPX, FIT and a run."""
+    rows = [
+        '101,"Mar 5, 2024, 7:00:00 AM",Commute,Ride,600,3.0,Road Bike,activities/101.gpx,'
+        '600,590,3000.0,9.1,5.1,42.0\n',
+        '102,"Mar 6, 2024, 5:30:00 PM",Home,Ride,700,3.5,Road Bike,activities/102.gpx.gz,'
+        '700,650,3500.0,10.2,5.4,30.0\n',
+        '103,"Mar 7, 2024, 6:00:00 AM",Jog,Run,1800,5.0,,activities/103.gpx,'
+        '1800,1750,5000.0,4.0,2.9,12.0\n',
+        '104,"Mar 8, 2024, 8:00:00 AM",Trainer,Ride,3600,30.0,,activities/104.fit.gz,'
+        '3600,3600,30000.0,12.0,8.3,0.0\n',
+    ]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("activities.csv", CSV_HEADER + "".join(rows))
+        archive.writestr("activities/101.gpx", make_gpx(600))
+        archive.writestr("activities/102.gpx.gz", gzip.compress(make_gpx(650, start_lat=47.7)))
+        archive.writestr("activities/103.gpx", make_gpx(10))
+        archive.writestr("activities/104.fit.gz", gzip.compress(b"not a fit file"))
+
+
+def test_ingest_stores_rides_with_coordinates_and_streams():
+    """Rides land in the store in API shape; runs are left out."""
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+        make_export(zip_path)
+        store = RideStore(os.path.join(tmp, "rides.db"))
+
+        athlete = {"id": 7, "bikes": [{"id": "b42", "name": "Road Bike"}, {"id": "b43", "name": "Gravel"}]}
+        report = ingest_export(zip_path, store, athlete_id=7, include_streams=True, max_workers=1,
+                               gear_ids=gear_ids_by_name(athlete))
+
+        assert report.activities_stored == 3
+        assert report.tracks_parsed == 2 and report.streams_stored == 2
+
+        activities = store.get_activities(athlete_id=7)
+        assert [a["id"] for a in activities] == [101, 102, 104]
+        commute = activities[0]
+        assert commute["start_date"] == "2024-03-05T07:00:00Z"
+        assert commute["distance"] == 3000.0 and commute["moving_time"] == 590
+        assert commute["gear_id"] == "b42" and commute["gear_name"] == "Road Bike"
+        assert activities[2]["gear_id"] is None and activities[2]["gear_name"] is None
+        assert commute["start_latlng"] == [47.6, -122.3]
+        assert activities[2]["start_latlng"] == []  # FIT track not parsed
+
+        table = RideTable.from_activities(activities)
+        assert table.gear_mask("b42").sum() == 2
+
+        offline = StoredStravaAPI(store, athlete_id=7)
+        streams = streams_to_arrays(offline.get_activity_streams(101))
+        assert len(streams["time"]) == 600 and streams["time"][-1] == 599
+        # 0.00005 degrees of latitude is about 5.56 m
+        assert abs(streams["distance"][-1] - 599 * 5.56) < 5
+        assert np.allclose(streams["velocity_smooth"][10:-10], 5.56, atol=0.01)
+        assert offline.get_activity_details(102)["end_latlng"][0] > 47.7
+
+
+def test_process_pool_matches_in_process():
+    """Parsing in worker processes stores the same rides."""
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+        make_export(zip_path)
+        serial = RideStore(os.path.join(tmp, "serial.db"))
+        pooled = RideStore(os.path.join(tmp, "pooled.db"))
+
+        ingest_export(zip_path, serial, include_streams=True, max_workers=1)
+        ingest_export(zip_path, pooled, include_streams=True, max_workers=2, chunksize=1)
+
+        assert serial.get_activities() == pooled.get_activities()
+        assert np.array_equal(serial.get_streams(102)["latlng"], pooled.get_streams(102)["latlng"])
+
+
+def test_reuploaded_archive_is_read_afresh():
+    """A new export written to the same path is ingested from its own contents."""
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+        make_export(zip_path)
+        store = RideStore(os.path.join(tmp, "rides.db"))
+        ingest_export(zip_path, store, include_streams=True, max_workers=1)
+
+        with zipfile.ZipFile(zip_path) as archive:
+            header, commute = archive.read("activities.csv").decode().splitlines(keepends=True)[:2]
+        # Same ride, now recorded further north
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("activities.csv", header + commute)
+            archive.writestr("activities/101.gpx", make_gpx(600, start_lat=48.0))
+        report = ingest_export(zip_path, store, include_streams=True, max_workers=1)
+
+        assert report.tracks_parsed == 1 and not report.errors
+        assert store.get_activity(101)["start_latlng"][0] == 48.0
+
+
+def test_rows_without_an_activity_id_are_reported():
+    """A blank or non-numeric Activity ID skips that row and is listed in the report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+        with zipfile.ZipFile(zip_path, "w") as archive:
+            archive.writestr("activities.csv", CSV_HEADER + "".join([
+                ',"Mar 5, 2024, 7:00:00 AM",Blank,Ride,600,3.0,,,600,590,3000.0,9.1,5.1,42.0\n',
+                'n/a,"Mar 6, 2024, 7:00:00 AM",Junk,Ride,600,3.0,,,600,590,3000.0,9.1,5.1,42.0\n',
+                '105,"Mar 7, 2024, 7:00:00 AM",Good,Ride,600,3.0,,,600,590,3000.0,9.1,5.1,42.0\n',
+            ]))
+        store = RideStore(os.path.join(tmp, "rides.db"))
+
+        report = ingest_export(zip_path, store, max_workers=1)
+
+        assert report.activities_stored == 1
+        assert [a["id"] for a in store.get_activities()] == [105]
+        assert len(report.errors) == 2 and all("Activity ID" in error for error in report.errors)
+
+
+if __name__ == "__main__":
+    print("📦 Strava Export Ingestion - Tests")
+    print("=" * 50)
+    test_ingest_stores_rides_with_coordinates_and_streams()
+    test_process_pool_matches_in_process()
+    test_reuploaded_archive_is_read_afresh()
+    test_rows_without_an_activity_id_are_reported()
+    print("✅ All tests passed!")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for the Strava Webhook Receiver
+"""
+
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from werkzeug.serving import make_server
+
+from activity_cache import ActivityCache
+from fake_strava_events import FakeStravaEventSender, make_event
+from service_scheduler import AthleteTokenStore
+from strava_monitor import StravaMonitor, start_monitor
+from strava_webhook import WebhookEventQueue, verify_subscription
+from test_polyline_codec import FakeGoogle
+from test_summary_capture import SUMMARY
+from web_dashboard import app
+
+
+class PushedStrava:
+    """Serves activity details for pushed events, counting list calls."""
+
+    def __init__(self, activity_cache=None):
+        self.activity_cache = activity_cache
+        self.list_calls = 0
+
+    def iter_activities(self, *args, **kwargs):
+        self.list_calls += 1
+        return iter([])
+
+    def get_activity_details(self, activity_id):
+        activity = dict(SUMMARY, id=activity_id)
+        if activity_id == 99:
+            activity["type"] = "Run"
+        if self.activity_cache:
+            self.activity_cache.put(activity_id, activity)
+        return activity
+
+
+def run_dashboard():
+    """Serve the dashboard on a free local port; returns (server, webhook URL)."""
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/webhook"
+
+
+def test_handshake():
+    """The challenge is echoed only for the right token."""
+    args = {"hub.mode": "subscribe", "hub.verify_token": "secret", "hub.challenge": "abc"}
+    assert verify_subscription(args, "secret") == ({"hub.challenge": "abc"}, 200)
+    assert verify_subscription(args, "other")[1] == 403
+    assert verify_subscription(dict(args, **{"hub.verify_token": ""}), "")[1] == 403
+
+
+def test_queue_deduplicates_retries():
+    """Strava's redeliveries of one event are queued once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WebhookEventQueue(os.path.join(tmp, "events.db"))
+        event = make_event(11, event_time=1_700_000_000)
+        assert queue.enqueue(event)
+        assert not queue.enqueue(event)
+        assert not queue.enqueue(dict(event, object_type="club"))
+        assert queue.get_stats() == {"received": 1, "pending": 1, "processed": 0, "abandoned": 0}
+
+
+def test_events_flow_from_endpoint_to_monitor():
+    """Events sent to the dashboard are captured by the monitor without polling Strava."""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"WEBHOOK_DB": os.path.join(tmp, "events.db"), "STRAVA_WEBHOOK_VERIFY_TOKEN": "secret",
+               "STRAVA_WEBHOOK_SUBSCRIPTION_ID": "7"}
+        with mock.patch.dict(os.environ, env):
+            server, url = run_dashboard()
+            try:
+                sender = FakeStravaEventSender(url, "secret", owner_id=5, subscription_id=7)
+                assert sender.validate()
+                assert not FakeStravaEventSender(url, "wrong").validate()
+
+                assert sender.activity_created(11).json()["queued"]
+                assert sender.activity_created(99).json()["queued"]  # A run: ignored
+                assert sender.activity_updated(11, {"title": "Renamed"}).json()["queued"]
+                assert sender.athlete_deauthorized().json()["queued"]
+                assert sender.send(make_event(12, subscription_id=8)).status_code == 403
+                assert sender.send({"object_type": "activity", "subscription_id": 7}).status_code == 400
+            finally:
+                server.shutdown()
+
+        cache = ActivityCache(os.path.join(tmp, "activities.db"))
+        strava = PushedStrava(cache)
+        monitor = StravaMonitor(strava, FakeGoogle(), os.path.join(tmp, "traffic.db"))
+        monitor.check_internet_connection = lambda: True
+        queue = WebhookEventQueue(env["WEBHOOK_DB"])
+        tokens = AthleteTokenStore(os.path.join(tmp, "service.db"))
+        tokens.save_tokens(5, "access", "refresh", 0)
+        tokens.save_tokens(6, "access", "refresh", 0)
+
+        comparisons = monitor.process_webhook_events(queue, athlete_id=5, token_store=tokens)
+        assert [c.activity_id for c in comparisons] == [11]
+        assert strava.list_calls == 0
+        assert not cache.get(11).fresh  # The update event made the cached details stale
+        assert [account.athlete_id for account in tokens.get_accounts()] == [6]  # Deauthorized
+        assert queue.get_stats()["processed"] == 4
+        assert monitor.process_webhook_events(queue) == []
+
+
+def test_other_athletes_events_stay_queued():
+    """Monitors sharing one queue each handle only their own athlete's events."""
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WebhookEventQueue(os.path.join(tmp, "events.db"))
+        queue.enqueue(make_event(11, owner_id=5))
+        queue.enqueue(make_event(21, owner_id=6))
+        queue.enqueue(make_event(6, "update", "athlete", owner_id=6, updates={"authorized": "false"}))
+        tokens = AthleteTokenStore(os.path.join(tmp, "service.db"))
+        tokens.save_tokens(6, "access", "refresh", 0)
+
+        monitors = {}
+        for athlete_id in (5, 6):
+            monitor = StravaMonitor(PushedStrava(), FakeGoogle(), os.path.join(tmp, f"traffic{athlete_id}.db"))
+            monitor.check_internet_connection = lambda: True
+            monitors[athlete_id] = monitor
+
+        captured = monitors[5].process_webhook_events(queue, athlete_id=5, token_store=tokens)
+        assert [c.activity_id for c in captured] == [11]
+        assert queue.get_stats()["pending"] == 2
+        assert len(tokens.get_accounts()) == 1  # Athlete 6's deauthorization is left to its monitor
+
+        captured = monitors[6].process_webhook_events(queue, athlete_id=6, token_store=tokens)
+        assert [c.activity_id for c in captured] == [21]
+        assert queue.get_stats()["pending"] == 0
+        assert tokens.get_accounts() == []
+
+
+def test_failed_events_are_retried():
+    """An event whose capture raises stays queued until it succeeds or runs out of attempts."""
+    class FlakyStrava(PushedStrava):
+        def get_activity_details(self, activity_id):
+            raise Exception("Connection reset")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WebhookEventQueue(os.path.join(tmp, "events.db"), max_attempts=2)
+        queue.enqueue(make_event(11))
+        monitor = StravaMonitor(FlakyStrava(), FakeGoogle(), os.path.join(tmp, "traffic.db"))
+        monitor.check_internet_connection = lambda: True
+
+        monitor.process_webhook_events(queue)
+        assert queue.get_stats()["pending"] == 1
+        monitor.process_webhook_events(queue)
+        assert queue.get_stats()["abandoned"] == 1
+
+
+def test_webhook_monitor_follows_the_token_owner():
+    """start_monitor looks up whose token it holds and filters events to that athlete."""
+    with tempfile.TemporaryDirectory() as tmp, mock.patch("strava_monitor.StravaMonitor") as monitor, \
+            mock.patch("strava_brake_wear_estimator.StravaAPI.get_athlete", return_value={"id": 5}):
+        start_monitor("id", "secret", "token", "maps-key", activity_cache_path=None,
+                      webhook_db_path=os.path.join(tmp, "events.db"),
+                      service_db_path=os.path.join(tmp, "service.db"))
+        call = monitor.return_value.monitor_webhook_events.call_args
+        assert call.args[1] == 5
+        assert call.kwargs["token_store"].db_path == os.path.join(tmp, "service.db")
+
+
+if __name__ == "__main__":
+    print("📬 Strava Webhook Receiver - Tests")
+    print("=" * 50)
+    test_handshake()
+    test_queue_deduplicates_retries()
+    test_events_flow_from_endpoint_to_monitor()
+    test_other_athletes_events_stay_queued()
+    test_failed_events_are_retried()
+    test_webhook_monitor_follows_the_token_owner()
+    print("✅ All tests passed!")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for Compressed Stream Storage
+"""
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from braking_events import detect_braking_events, streams_to_arrays
+from geometry import fill_gaps, project_to_metres
+from ride_store import RideStore
+from stream_storage import decode_streams, encode_streams, simplify_indices
+
+
+def wiggly_ride(points: int = 3600, seed: int = 0):
+    """A 1 Hz ride with a winding path, GPS jitter and rolling hills."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(points, dtype=float)
+    heading = np.cumsum(rng.normal(0, 0.05, points))
+    step = 6.0 / 111_000  # About 6 m per second in degrees
+    lat = 47.6 + np.cumsum(np.cos(heading)) * step + rng.normal(0, 2e-6, points)
+    lng = -122.3 + np.cumsum(np.sin(heading)) * step / np.cos(np.radians(47.6)) + rng.normal(0, 2e-6, points)
+    return {
+        "time": t,
+        "distance": t * 6.0,
+        "altitude": 50 + 20 * np.sin(t / 300),
+        "velocity_smooth": np.full(points, 6.0),
+        "latlng": np.column_stack([lat, lng]),
+    }
+
+
+def test_simplify_straight_and_corner():
+    """A straight line keeps its ends; a right angle keeps its corner."""
+    x = np.concatenate([np.arange(10.0), np.full(10, 9.0)])
+    y = np.concatenate([np.zeros(10), np.arange(1.0, 11.0)])
+    assert list(simplify_indices(x[:10], y[:10], 0.5)) == [0, 9]
+    assert list(simplify_indices(x, y, 0.5)) == [0, 9, 19]
+
+
+def test_error_stays_within_tolerance():
+    """Simplification shrinks the ride and the reported error honours the tolerance."""
+    streams = wiggly_ride()
+    for tolerance in (1.0, 5.0):
+        encoded = encode_streams(streams, tolerance)
+        decoded = decode_streams(encoded.blob)
+
+        assert encoded.stored_points < encoded.source_points / 3
+        assert 0 < encoded.max_error_m <= tolerance + 0.2  # Plus fixed-point rounding
+        assert encoded.compression_ratio > 10
+        assert decoded["latlng"].shape == (encoded.stored_points, 2)
+        assert len(decoded["time"]) == encoded.stored_points
+
+    # Every decoded point is one of the original samples, to fixed-point precision
+    kept = simplify_indices(*project_to_metres(streams["latlng"]), 5.0)
+    assert np.abs(decoded["latlng"] - streams["latlng"][kept]).max() <= 5e-7
+    assert np.abs(decoded["altitude"] - streams["altitude"][kept]).max() <= 0.05
+
+
+def test_lossless_without_tolerance():
+    """With no tolerance every sample is kept at fixed-point precision."""
+    streams = wiggly_ride(600)
+    streams["altitude"][100:110] = np.nan
+    encoded = encode_streams(streams, None)
+    decoded = decode_streams(encoded.blob)
+
+    assert encoded.stored_points == 600
+    assert encoded.max_error_m < 0.1
+    assert np.array_equal(decoded["time"], streams["time"])
+    assert not np.isnan(decoded["altitude"]).any()
+
+
+def test_ride_store_compresses_and_reads_legacy_blobs():
+    """RideStore stores compressed streams and still reads older .npz rows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RideStore(os.path.join(tmp, "rides.db"))
+        store.save_streams(1, wiggly_ride())
+        assert store.get_streams(1)["latlng"].shape[1] == 2
+
+        legacy = io.BytesIO()
+        np.savez_compressed(legacy, time=np.arange(3, dtype=np.float32))
+        conn = sqlite3.connect(store.db_path)
+        conn.execute("INSERT INTO ride_streams (activity_id, sample_count, streams) VALUES (2, 3, ?)",
+                     (legacy.getvalue(),))
+        conn.commit()
+        conn.close()
+        assert list(store.get_streams(2)["time"]) == [0, 1, 2]
+
+        stats = store.get_stream_storage_stats()
+        assert stats["rides"] == 1 and stats["source_points"] == 3600
+        assert stats["track_points"] < 3600 / 3 and stats["max_error_m"] <= 2.2
+        assert stats["compression_ratio"] > 5
+
+
+def test_braking_energy_survives_the_store():
+    """Streams come back at full resolution; only the map track is simplified."""
+    fixture = os.path.join(os.path.dirname(__file__), "fixtures", "strava_streams_sample.json")
+    with open(fixture) as f:
+        streams = streams_to_arrays(json.load(f))
+    # A dead straight road: simplification would keep just its two ends
+    streams["latlng"] = np.column_stack([47.6 + streams["distance"] / 111_000, np.full(len(streams["time"]), -122.3)])
+
+    def braking_energy(s):
+        return detect_braking_events(s["time"], s["velocity_smooth"], s["altitude"], s["distance"]).total_energy_joules
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RideStore(os.path.join(tmp, "rides.db"))
+        store.save_streams(1, streams)
+
+        stored = store.get_streams(1)
+        assert len(stored["time"]) == len(streams["time"])
+        assert braking_energy(stored) > 0
+        assert abs(braking_energy(stored) - braking_energy(streams)) < 0.01 * braking_energy(streams)
+
+        track = store.get_track(1)
+        assert len(track["latlng"]) == 2 and set(track) == {"latlng", "distance", "altitude"}
+
+
+
+def test_fill_gaps_is_per_column_and_leaves_empty_streams():
+    """Gaps are interpolated within each column; an all-NaN stream is returned as is."""
+    latlng = np.array([[47.0, -122.0], [np.nan, np.nan], [47.2, -122.2]])
+    assert np.allclose(fill_gaps(latlng), [[47.0, -122.0], [47.1, -122.1], [47.2, -122.2]])
+    assert np.isnan(fill_gaps(np.full(4, np.nan))).all()
+
+
+if __name__ == "__main__":
+    print("🗜️  Compressed Stream Storage - Tests")
+    print("=" * 50)
+    test_simplify_straight_and_corner()
+    test_error_stays_within_tolerance()
+    test_lossless_without_tolerance()
+    test_ride_store_compresses_and_reads_legacy_blobs()
+    test_braking_energy_survives_the_store()
+    test_fill_gaps_is_per_column_and_leaves_empty_streams()
+    print("✅ All tests passed!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for Summary-First Traffic Capture
+"""
+
+import os
+import tempfile
+
+from strava_monitor import StravaMonitor
+from test_polyline_codec import FakeGoogle
+from traffic_comparison import StravaTrafficAnalyzer, has_capture_fields
+
+SUMMARY = {
+    "id": 11, "name": "Commute", "type": "Ride", "moving_time": 900, "distance": 3000.0,
+    "start_date": "2024-05-01T08:00:00Z", "start_latlng": [47.6, -122.3], "end_latlng": [47.6, -122.28],
+}
+
+
+class CountingStrava:
+    """Serves one page of summaries and counts detail requests."""
+
+    def __init__(self, summaries):
+        self.summaries = summaries
+        self.detail_calls = 0
+
+    def iter_activities(self, *args, **kwargs):
+        return iter(self.summaries)
+
+    get_activities = iter_activities
+
+    def get_activity_details(self, activity_id):
+        self.detail_calls += 1
+        return dict(SUMMARY, id=activity_id)
+
+
+def test_summary_fields_check():
+    """Summaries missing a field (or with None) need the detail call."""
+    assert has_capture_fields(SUMMARY)
+    assert not has_capture_fields({k: v for k, v in SUMMARY.items() if k != "end_latlng"})
+    assert not has_capture_fields(dict(SUMMARY, moving_time=None))
+    assert not has_capture_fields(None)
+
+
+def test_monitor_captures_from_summaries():
+    """Complete summaries are captured without any detail requests."""
+    strava = CountingStrava([SUMMARY, {"id": 12, "name": "Partial", "type": "Ride"}])
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = StravaMonitor(strava, FakeGoogle(), os.path.join(tmp, "traffic.db"))
+        monitor.check_internet_connection = lambda: True
+
+        comparisons = monitor.fetch_historical_activities(days_back=7)
+        assert [c.activity_id for c in comparisons] == [11, 12]
+        assert comparisons[0].bike_time_minutes == 15.0
+        assert strava.detail_calls == 1  # Only for the summary without coordinates
+
+
+def test_analyzer_uses_summaries():
+    """analyze_recent_activities passes the list summaries through."""
+    strava = CountingStrava([SUMMARY, dict(SUMMARY, id=13)])
+    comparisons = StravaTrafficAnalyzer(strava, FakeGoogle()).analyze_recent_activities(days_back=7)
+    assert len(comparisons) == 2 and strava.detail_calls == 0
+
+
+if __name__ == "__main__":
+    print("📋 Summary-First Traffic Capture - Tests")
+    print("=" * 50)
+    test_summary_fields_check()
+    test_monitor_captures_from_summaries()
+    test_analyzer_uses_summaries()
+    print("✅ All tests passed!")
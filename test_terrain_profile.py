@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for Grade-Based Terrain Profiling
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from strava_brake_wear_estimator import RideTable, StravaBrakeWearEstimator, TerrainType
+from terrain_profile import profile_terrain
+from test_strava_brake_wear_estimator import make_activities, make_estimator
+from test_wear_ledger import FakeStravaAPI
+from wear_ledger import WearLedger
+
+
+def one_descent_streams():
+    """20 km out-and-back: 16 km flat, then a 4 km 6% descent."""
+    distance = np.arange(0, 20001, 5.0)
+    altitude = np.where(distance < 16000, 240.0, 240.0 - 0.06 * (distance - 16000))
+    return {"distance": distance, "altitude": altitude}
+
+
+def test_descent_share_by_band():
+    """The descent lands in the 4-8% band; the rest of the ride is flat."""
+    streams = one_descent_streams()
+    profile = profile_terrain(streams["distance"], streams["altitude"])
+
+    assert abs(profile.descent_shares["4-8%"] - 0.2) < 0.01
+    assert abs(profile.flat_share - 0.8) < 0.01
+    assert profile.climbing_share == 0.0
+    assert abs(profile.max_descent_grade_percent - 6.0) < 1e-6
+
+
+def test_one_long_descent_is_not_flat():
+    """A ride averaging little gain per mile still gets a descent-weighted multiplier."""
+    estimator = make_estimator()
+    ride = estimator.process_strava_ride(make_activities(1)[0])
+    ride.terrain_type = TerrainType.FLAT
+    flat_wear = estimator.estimate_wear_for_ride(ride, 75.0, 10.0)["wear_mm"]
+
+    estimator.apply_terrain_profile(ride, one_descent_streams())
+
+    flat = estimator.TERRAIN_MULTIPLIERS[TerrainType.FLAT]
+    mountainous = estimator.TERRAIN_MULTIPLIERS[TerrainType.MOUNTAINOUS]
+    assert abs(ride.terrain_multiplier - (0.8 * flat + 0.2 * mountainous)) < 0.01
+    assert estimator.estimate_wear_for_ride(ride, 75.0, 10.0)["wear_mm"] > flat_wear
+
+    # The table path and the per-ride path agree on the profiled multiplier
+    table = RideTable.from_rides([ride])
+    table_wear = estimator.estimate_wear_for_table(table, 75.0, 10.0)["wear_mm"][0]
+    assert table_wear == estimator.estimate_wear_for_ride(ride, 75.0, 10.0)["wear_mm"]
+
+
+def test_ledger_stores_profiled_terrain():
+    """With terrain_from_streams, new rides reach the ledger with their grade-based multiplier."""
+    class StreamingStravaAPI(FakeStravaAPI):
+        def get_activity_streams(self, activity_id, keys):
+            if activity_id == 1001:
+                raise Exception("Resource Not Found")  # e.g. a manual entry
+            return {key: {"data": values.tolist()} for key, values in one_descent_streams().items()}
+
+    activities = make_activities(2)
+    template = make_estimator()
+    estimator = StravaBrakeWearEstimator(template.brake_pad_specs, StreamingStravaAPI(activities),
+                                         terrain_from_streams=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        estimator.get_ledger_wear(ledger, 1, None, days_back=10000)
+        stored = ledger.load_rides(1, None)
+
+    by_id = dict(zip(stored.id.tolist(), stored.terrain_multiplier.tolist()))
+    profiled = estimator.process_strava_ride(activities[0]).terrain_multiplier
+    assert by_id[1000] == profiled and profiled > estimator.TERRAIN_MULTIPLIERS[TerrainType.FLAT]
+    assert np.isnan(by_id[1001])
+
+
+def test_stream_estimate_sets_terrain():
+    """The stream-based estimate profiles terrain from the same streams."""
+    estimator = make_estimator()
+    ride = estimator.process_strava_ride(make_activities(1)[0])
+    streams = one_descent_streams()
+    streams["time"] = streams["distance"] / 8.0
+    streams["velocity_smooth"] = np.full(len(streams["time"]), 8.0)
+
+    result = estimator.estimate_wear_from_streams(ride, streams)
+
+    assert result["terrain_multiplier"] == ride.terrain_multiplier
+    assert ride.terrain_multiplier > estimator.TERRAIN_MULTIPLIERS[TerrainType.FLAT]
+    assert result["braking_energy_kj"] > 0
+
+
+if __name__ == "__main__":
+    print("⛰️  Grade-Based Terrain Profiling - Tests")
+    print("=" * 50)
+    test_descent_share_by_band()
+    test_one_long_descent_is_not_flat()
+    test_ledger_stores_profiled_terrain()
+    test_stream_estimate_sets_terrain()
+    print("✅ All tests passed!")
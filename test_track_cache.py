@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the Binary Track Cache
+"""
+
+import os
+import tempfile
+import time
+from unittest import mock
+
+import numpy as np
+
+import track_cache
+from ride_store import RideStore
+from strava_export_ingest import ingest_export, parse_gpx
+from synthetic_tracks import make_gpx
+from test_strava_export_ingest import make_export
+from track_cache import HEADER, TrackCache
+
+
+def write_gpx(directory: str, name: str, points: int) -> str:
+    """Write a synthetic GPX file and return its path."""
+    path = os.path.join(directory, name)
+    with open(path, "wb") as f:
+        f.write(make_gpx(points))
+    return path
+
+
+def test_round_trip_is_exact_to_fixed_point():
+    """Decoded tracks match the GPX to 1e-7 degree, 1 cm and 1 ms."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gpx(tmp, "ride.gpx", 900)
+        track = TrackCache(os.path.join(tmp, "cache")).get(path)
+
+        with open(path, "rb") as f:
+            expected = parse_gpx(f)
+        streams = track.streams()
+
+        assert isinstance(track.deltas, np.memmap)
+        assert len(track) == 900
+        assert os.path.getsize(track.path) == HEADER.size + 4 * 4 * 900
+        assert np.abs(streams["latlng"] - expected["latlng"]).max() < 1e-7
+        assert np.abs(streams["altitude"] - expected["altitude"]).max() <= 0.005
+        assert np.array_equal(streams["time"], expected["time"])
+        assert track.epoch[0] == 1709622000.0
+
+
+def test_cache_is_reused_until_source_changes():
+    """A second get maps the file without reparsing; touching the GPX reparses."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_gpx(tmp, "ride.gpx", 120)
+        cache = TrackCache(os.path.join(tmp, "cache"))
+        cache.get(path)
+
+        with mock.patch.object(track_cache, "read_track_points", wraps=track_cache.read_track_points) as parse:
+            cache.get(path)
+            assert parse.call_count == 0
+
+            later = time.time() + 10
+            os.utime(path, (later, later))
+            assert len(cache.get(path)) == 120
+            assert parse.call_count == 1
+
+
+def test_missing_altitude_decodes_as_nan():
+    """Tracks without elevation keep NaN altitude."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TrackCache(tmp)
+        points = {
+            "epoch": np.arange(5, dtype=float) + 1.7e9,
+            "lat": np.linspace(47.6, 47.61, 5),
+            "lng": np.full(5, -122.3),
+            "altitude": np.full(5, np.nan),
+        }
+        cache.put("flat", points)
+        track = cache.open("flat")
+        assert np.isnan(track.altitude).all()
+        assert np.allclose(track.lat, points["lat"], atol=1e-7)
+
+
+def test_export_ingest_fills_cache():
+    """Export ingestion can write each track to the cache by activity ID."""
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "export.zip")
+        make_export(zip_path)
+        cache_dir = os.path.join(tmp, "cache")
+
+        ingest_export(zip_path, RideStore(os.path.join(tmp, "rides.db")), track_cache_dir=cache_dir, max_workers=1)
+
+        cache = TrackCache(cache_dir)
+        assert len(cache.open("101")) == 600 and len(cache.open("102")) == 650
+        assert cache.open("104") is None
+
+
+if __name__ == "__main__":
+    print("🗺️  Binary Track Cache - Tests")
+    print("=" * 50)
+    test_round_trip_is_exact_to_fixed_point()
+    test_cache_is_reused_until_source_changes()
+    test_missing_altitude_decodes_as_nan()
+    test_export_ingest_fills_cache()
+    print("✅ All tests passed!")
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for Wear Model Calibration
+
+Synthetic pad lifecycles are generated from a known "true" wear model, then
+fitted starting from the built-in tables.
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+import numpy as np
+
+from brake_wear_estimator import BrakePadSpecs as StandaloneSpecs, BrakeWearEstimator
+from strava_brake_wear_estimator import TERRAIN_CODES, WEATHER_CODES, RideTable, StravaBrakeWearEstimator
+from test_strava_brake_wear_estimator import make_activities, make_estimator
+from wear_calibration import PadLifecycle, calibrate_from_ledger, fit_wear_model
+from wear_ledger import WearLedger
+from wear_model import WearModel, builtin_model, load_wear_model
+
+
+def make_true_model() -> WearModel:
+    """Built-in tables with wet weather and mountains wearing pads faster."""
+    model = builtin_model()
+    model.version = "truth"
+    model.weather_multipliers["wet"] = 1.7
+    model.terrain_multipliers["mountainous"] = 2.0
+    return model
+
+
+def make_lifecycles(count: int, rides_per_lifecycle: int = 40, seed: int = 5):
+    """Random ride subsets scored with the true model, plus 5% measurement noise."""
+    rng = np.random.default_rng(seed)
+    pool = RideTable.from_activities(make_activities(2000, seed=seed))
+    pool.weather_code[:] = rng.integers(0, len(WEATHER_CODES), len(pool))
+    pool.terrain_code[:] = rng.integers(0, len(TERRAIN_CODES), len(pool))
+
+    truth = make_estimator()
+    truth.use_wear_model(make_true_model())
+
+    lifecycles = []
+    for _ in range(count):
+        rides = pool.take(rng.choice(len(pool), rides_per_lifecycle, replace=False))
+        wear = truth._table_factors(rides)["wear_mm"].sum() * rng.lognormal(0.0, 0.05)
+        lifecycles.append(PadLifecycle("sintered", rides, wear))
+    return lifecycles
+
+
+def test_fit_recovers_relative_multipliers():
+    """Fitting thousands of lifecycles recovers the true ratios."""
+    lifecycles = make_lifecycles(2000)
+
+    result = fit_wear_model(lifecycles, make_estimator(), version="test-fit")
+
+    weather = result.model.weather_multipliers
+    terrain = result.model.terrain_multipliers
+    assert abs(weather["wet"] / weather["dry"] - 1.7) < 0.05
+    assert abs(terrain["mountainous"] / terrain["flat"] - 2.5) < 0.08
+    assert result.rms_log_error_after < 0.06 < result.rms_log_error_before
+    assert result.model.version == "test-fit"
+
+
+def test_model_file_is_loaded_by_both_estimators():
+    """A saved model round-trips and replaces the built-in tables at startup."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wear_model.json")
+        make_true_model().save(path)
+        model = load_wear_model(path)
+
+        strava = StravaBrakeWearEstimator(make_estimator().brake_pad_specs, make_estimator().strava_api,
+                                          wear_model=model)
+        standalone = BrakeWearEstimator(StandaloneSpecs("organic", 5.0, 4.0, 1.0), wear_model=model)
+
+        assert strava.WEAR_MODEL_VERSION == "truth"
+        assert [v for k, v in strava.WEATHER_MULTIPLIERS.items() if k.value == "wet"] == [1.7]
+        assert [v for k, v in standalone.TERRAIN_MULTIPLIERS.items() if k.value == "mountainous"] == [2.0]
+        assert load_wear_model(os.path.join(tmp, "missing.json")).version == builtin_model().version
+
+
+def test_model_file_is_parsed_once_per_change():
+    """Estimators built in a loop share one parse of the model file until it changes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wear_model.json")
+        make_true_model().save(path)
+        template = make_estimator()
+
+        with mock.patch.object(WearModel, "load", wraps=WearModel.load) as parse, \
+                mock.patch.dict(os.environ, {"WEAR_MODEL_PATH": path}):
+            estimators = [StravaBrakeWearEstimator(template.brake_pad_specs, template.strava_api)
+                          for _ in range(50)]
+            assert parse.call_count == 1
+            assert all(e.WEAR_MODEL_VERSION == "truth" for e in estimators)
+
+            refit = make_true_model()
+            refit.version = "truth-2"
+            refit.save(path)
+            later = time.time() + 10
+            os.utime(path, (later, later))
+            reloaded = StravaBrakeWearEstimator(template.brake_pad_specs, template.strava_api)
+            assert reloaded.WEAR_MODEL_VERSION == "truth-2"
+            assert parse.call_count == 2
+
+
+def test_class_level_tables_override_the_model_file():
+    """Subclasses that set tables at class level keep them; other tables follow the model."""
+    class DoubledSintered(StravaBrakeWearEstimator):
+        WEAR_MODEL_VERSION = "doubled"
+        MATERIAL_WEAR_RATES = {"sintered": 0.20}
+
+    template = make_estimator()
+    estimator = DoubledSintered(template.brake_pad_specs, template.strava_api, wear_model=make_true_model())
+
+    assert estimator.WEAR_MODEL_VERSION == "doubled"
+    assert estimator.MATERIAL_WEAR_RATES == {"sintered": 0.20}
+    assert [v for k, v in estimator.WEATHER_MULTIPLIERS.items() if k.value == "wet"] == [1.7]
+
+
+def test_calibrate_from_ledger_replacements():
+    """Logged replacements become lifecycles bounded by install and replacement time."""
+    estimator = make_estimator()
+    table = RideTable.from_activities(sorted(make_activities(60), key=lambda a: a["start_date"]))
+    order = np.argsort(table.start_epoch, kind="stable")
+    table = table.take(order)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        for start, stop in ((0, 20), (20, 45)):
+            ledger.apply_rides(1, "b1", table.take(list(range(start, stop))), estimator)
+            replaced = datetime.fromtimestamp(int(table.start_epoch[stop - 1]) + 1, tz=timezone.utc)
+            ledger.reset(1, "b1", replaced)
+
+        model_path = os.path.join(tmp, "wear_model.json")
+        result = calibrate_from_ledger(ledger, estimator, model_path, version="ledger-fit")
+
+        assert result.lifecycle_count == 2
+        assert load_wear_model(model_path).version == "ledger-fit"
+
+
+if __name__ == "__main__":
+    print("📐 Wear Model Calibration - Tests")
+    print("=" * 50)
+    test_fit_recovers_relative_multipliers()
+    test_model_file_is_loaded_by_both_estimators()
+    test_model_file_is_parsed_once_per_change()
+    test_class_level_tables_override_the_model_file()
+    test_calibrate_from_ledger_replacements()
+    print("✅ All tests passed!")
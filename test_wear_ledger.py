@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the Brake Pad Wear Ledger
+
+Uses a temporary SQLite database and synthetic Strava activities.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from strava_brake_wear_estimator import BrakePadSpecs, RideTable, StravaAPI, StravaBrakeWearEstimator
+from test_strava_brake_wear_estimator import make_activities, make_estimator
+from wear_ledger import WearLedger
+
+
+class FakeStravaAPI(StravaAPI):
+    """Serves activities from memory, honouring the `after` filter."""
+
+    def __init__(self, activities):
+        super().__init__("id", "secret", "token")
+        self.activities = activities
+        self.calls = 0
+
+    def get_activities(self, after=None, before=None, activity_type="Ride", per_page=200):
+        self.calls += 1
+        after_epoch = after.timestamp() if after else 0
+        return [
+            a for a in self.activities
+            if datetime.fromisoformat(a["start_date"].replace("Z", "+00:00")).timestamp() > after_epoch
+        ]
+
+
+def sorted_activities(n: int):
+    """Synthetic activities in chronological order."""
+    activities = make_activities(n)
+    return sorted(activities, key=lambda a: a["start_date"])
+
+
+def test_incremental_matches_full_history():
+    """Applying rides in batches gives the same totals as scoring them all at once."""
+    estimator = make_estimator()
+    activities = sorted_activities(120)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        ledger.apply_rides(1, "b1", RideTable.from_activities(activities[:50]), estimator)
+        ledger.apply_rides(1, "b1", RideTable.from_activities(activities[:90]), estimator)
+        # Re-applying old rides is a no-op
+        applied = ledger.apply_rides(1, "b1", RideTable.from_activities(activities), estimator)
+        assert len(applied) == 30
+
+        entry = ledger.get_entry(1, "b1")
+        full = estimator.estimate_total_wear(RideTable.from_activities(activities))
+        assert entry.ride_count == 120
+        assert round(entry.cumulative_wear_mm, 3) == full["total_wear_mm"]
+
+
+def test_reset_and_rebuild():
+    """Pad replacement zeroes the total and rebuild re-scores with a new model."""
+    estimator = make_estimator()
+    activities = sorted_activities(60)
+    table = RideTable.from_activities(activities)
+    replaced_at = datetime.fromtimestamp(int(table.start_epoch[39]) + 1, tz=timezone.utc)
+
+    class DoubledModel(StravaBrakeWearEstimator):
+        WEAR_MODEL_VERSION = "test-2"
+        MATERIAL_WEAR_RATES = {"sintered": 0.20}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        ledger.apply_rides(7, None, table.take(list(range(40))), estimator)
+        ledger.reset(7, None, replaced_at)
+        assert ledger.get_entry(7, None).cumulative_wear_mm == 0.0
+
+        ledger.apply_rides(7, None, table, estimator)
+        entry = ledger.get_entry(7, None)
+        assert entry.ride_count == 20
+
+        doubled = DoubledModel(estimator.brake_pad_specs, estimator.strava_api)
+        assert ledger.needs_rebuild(entry, doubled)
+        rebuilt = ledger.rebuild(7, None, doubled)
+        assert rebuilt.ride_count == 20
+        assert abs(rebuilt.cumulative_wear_mm - 2 * entry.cumulative_wear_mm) < 1e-3
+        assert not ledger.needs_rebuild(rebuilt, doubled)
+
+
+def test_get_ledger_wear_only_scores_new_rides():
+    """The estimator applies only rides newer than the ledger's last ride."""
+    activities = sorted_activities(40)
+    for activity in activities:
+        activity["gear_id"] = "b9"
+    strava_api = FakeStravaAPI(activities[:30])
+    specs = BrakePadSpecs("organic", 5.0, 4.0, 1.0)
+    estimator = StravaBrakeWearEstimator(specs, strava_api)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        first = estimator.get_ledger_wear(ledger, 5, "b9", days_back=10000)
+        assert first["new_ride_count"] == 30
+
+        strava_api.activities = activities
+        second = estimator.get_ledger_wear(ledger, 5, "b9")
+        assert second["new_ride_count"] == 10
+        assert second["ride_count"] == 40
+        assert len(second["ride_details"]) == 10
+
+
+def test_bike_specs_round_trip():
+    """Pad specs are stored per bike and replaced when recorded again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = WearLedger(os.path.join(tmp, "ledger.db"))
+        ledger.set_bike_specs(1, "b1", BrakePadSpecs("organic", 5.0, 4.0, 1.0))
+        ledger.set_bike_specs(1, None, BrakePadSpecs("ceramic", 6.0, 3.5, 0.5))
+        ledger.set_bike_specs(1, "b1", BrakePadSpecs("sintered", 7.0, 4.5, 1.0))
+        ledger.set_bike_specs(2, "b9", BrakePadSpecs("organic", 5.0, 4.0, 1.0))
+
+        assert ledger.get_bike_specs(1) == {
+            "b1": BrakePadSpecs("sintered", 7.0, 4.5, 1.0),
+            "": BrakePadSpecs("ceramic", 6.0, 3.5, 0.5),
+        }
+        assert ledger.get_bike_specs(3) == {}
+
+
+if __name__ == "__main__":
+    print("🚴‍♂️ Brake Pad Wear Ledger - Tests")
+    print("=" * 50)
+    test_incremental_matches_full_history()
+    test_reset_and_rebuild()
+    test_get_ledger_wear_only_scores_new_rides()
+    test_bike_specs_round_trip()
+    print("✅ All tests passed!")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for Monte Carlo Brake Pad Wear
+"""
+
+import numpy as np
+
+from brake_wear_estimator import BrakePadSpecs, RidingConditions, TerrainType, WeatherCondition
+from wear_monte_carlo import (
+    BikeWearInputs, Distribution, MonteCarloWearEstimator, WearUncertainty,
+    estimate_fleet_remaining_miles
+)
+
+SPECS = BrakePadSpecs(material="organic", compound_hardness=5.0, initial_thickness_mm=4.0, minimum_thickness_mm=1.0)
+
+
+def make_conditions(weather: WeatherCondition = WeatherCondition.WET) -> RidingConditions:
+    """Typical commuting conditions."""
+    return RidingConditions(
+        weather=weather,
+        terrain=TerrainType.HILLY,
+        rider_weight_kg=75.0,
+        bike_weight_kg=12.0,
+        average_speed_kmh=22.0,
+        braking_frequency=6.0
+    )
+
+
+def test_fixed_distributions_match_point_estimate():
+    """With every input fixed the distribution collapses to the closed-form value."""
+    fixed = Distribution("fixed", (1.0,))
+    uncertainty = WearUncertainty(*([fixed] * 7))
+    estimator = MonteCarloWearEstimator(SPECS, uncertainty)
+    conditions = make_conditions()
+
+    samples = estimator.sample_remaining_miles(conditions, draws=10)
+
+    # A long reference distance keeps estimate_wear's rounding out of the comparison
+    expected = 3.0 / (estimator.estimate_wear(100_000.0, conditions)["wear_mm"] / 100_000.0)
+    assert np.allclose(samples, expected, rtol=1e-4)
+
+
+def test_percentiles_and_reproducibility():
+    """Percentiles of 100k draws are ordered and seeds reproduce."""
+    estimator = MonteCarloWearEstimator(SPECS)
+
+    first = estimator.estimate_remaining_miles(make_conditions(), current_wear_mm=0.5, draws=100_000, seed=42)
+    again = estimator.estimate_remaining_miles(make_conditions(), current_wear_mm=0.5, draws=100_000, seed=42)
+    other = estimator.estimate_remaining_miles(make_conditions(), current_wear_mm=0.5, draws=100_000, seed=43)
+
+    assert first == again
+    assert first != other
+    assert first["p10_remaining_miles"] < first["p50_remaining_miles"] < first["p90_remaining_miles"]
+
+
+def test_fleet_results_do_not_depend_on_workers():
+    """Per-bike seeds give the same answers in-process and across a pool."""
+    bikes = [
+        BikeWearInputs(f"b{i}", SPECS, make_conditions(weather), current_wear_mm=0.2 * i)
+        for i, weather in enumerate([WeatherCondition.DRY, WeatherCondition.WET, WeatherCondition.MUDDY])
+    ]
+
+    serial = estimate_fleet_remaining_miles(bikes, draws=20_000, seed=7, max_workers=1)
+    pooled = estimate_fleet_remaining_miles(bikes, draws=20_000, seed=7, max_workers=2)
+
+    assert serial == pooled
+    assert [r["bike_id"] for r in serial] == ["b0", "b1", "b2"]
+    assert serial[0]["p50_remaining_miles"] > serial[2]["p50_remaining_miles"]
+
+
+if __name__ == "__main__":
+    print("🎲 Monte Carlo Brake Pad Wear - Tests")
+    print("=" * 50)
+    test_fixed_distributions_match_point_estimate()
+    test_percentiles_and_reproducibility()
+    test_fleet_results_do_not_depend_on_workers()
+    print("✅ All tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the Weather Lookup Cache
+
+Uses a temporary SQLite database and a stubbed HTTP response, so no
+OpenWeatherMap key is needed.
+"""
+
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest import mock
+
+from strava_brake_wear_estimator import WeatherAPI
+from weather_cache import WeatherCache
+
+
+def test_nearby_rides_in_same_hour_share_an_entry():
+    """Lookups in the same cell and hour hit; other hours and cells miss."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = WeatherCache(os.path.join(tmp, "weather.db"))
+        ride_start = datetime(2024, 5, 1, 7, 10, tzinfo=timezone.utc)
+        cache.put(47.61, -122.33, ride_start, {"temp": 12.0})
+
+        assert cache.get(47.62, -122.34, ride_start.replace(minute=50)) == {"temp": 12.0}
+        assert cache.get(47.61, -122.33, ride_start.replace(hour=8)) is None
+        assert cache.get(48.5, -122.33, ride_start) is None
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_lru_eviction_and_ttl():
+    """The least recently used entry goes first, and expired entries miss."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = WeatherCache(os.path.join(tmp, "weather.db"), max_entries=2)
+        hours = [datetime(2024, 5, 1, h, tzinfo=timezone.utc) for h in (6, 7, 8)]
+        cache.put(47.6, -122.3, hours[0], {"temp": 6})
+        cache.put(47.6, -122.3, hours[1], {"temp": 7})
+        cache.get(47.6, -122.3, hours[0])  # Touch the 6am entry
+        cache.put(47.6, -122.3, hours[2], {"temp": 8})
+
+        assert cache.get(47.6, -122.3, hours[1]) is None
+        assert cache.get(47.6, -122.3, hours[0]) == {"temp": 6}
+        assert cache.stats()["evictions"] == 1
+
+        expired = WeatherCache(os.path.join(tmp, "weather.db"), ttl_seconds=-1)
+        assert expired.get(47.6, -122.3, hours[0]) is None
+
+
+def test_weather_api_only_calls_http_on_miss():
+    """Repeat lookups for the same cell/hour are served from the cache."""
+    response = mock.Mock(status_code=200)
+    response.json.return_value = {"data": [{"temp": 15.0, "weather": [{"id": 800}]}]}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        weather_api = WeatherAPI("key", WeatherCache(os.path.join(tmp, "weather.db")))
+        ride_start = datetime(2024, 5, 1, 7, 0, tzinfo=timezone.utc)
+        with mock.patch.object(weather_api.session, "get", return_value=response) as get:
+            for minute in range(0, 60, 10):
+                weather = weather_api.get_weather_for_ride(47.6, -122.3, ride_start.replace(minute=minute))
+                assert weather["temp"] == 15.0
+        assert get.call_count == 1
+        assert weather_api.cache.stats()["hits"] == 5
+
+
+if __name__ == "__main__":
+    print("🌦️  Weather Lookup Cache - Tests")
+    print("=" * 50)
+    test_nearby_rides_in_same_hour_share_an_entry()
+    test_lru_eviction_and_ttl()
+    test_weather_api_only_calls_http_on_miss()
+    print("✅ All tests passed!")
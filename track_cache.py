@@ -0,0 +1,201 @@
+"""
+Binary Track Cache
+
+Parsing GPX XML (or FIT records) is by far the slowest way to get a ride's
+points back. This module parses each track file once and writes it to a
+compact columnar file that later reads map straight into memory.
+
+File layout (little-endian):
+
+    header   32 bytes: magic "TRK1", format version, flags, point count,
+             start time in epoch milliseconds
+    columns  4 x point count int32: lat, lng, altitude, time
+
+Each column holds fixed-point values (1e-7 degree, centimetre, millisecond
+since start) as deltas from the previous point, with the first entry
+absolute. Deltas keep the file small and compress well if the cache is
+archived; decoding is one cumulative sum per column. Columns are opened with
+`numpy.memmap`, so reopening a cached track reads only the pages touched.
+"""
+
+import hashlib
+import os
+import struct
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from geometry import fill_gaps
+from strava_export_ingest import read_track_points, track_to_streams
+
+MAGIC = b"TRK1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIq12x")  # Padded to 32 bytes
+
+COLUMNS = ("lat", "lng", "altitude", "time")
+COORDINATE_SCALE = 1e7  # 1e-7 degree, about 1 cm
+ALTITUDE_SCALE = 100.0  # Centimetres
+TIME_SCALE = 1000.0  # Milliseconds
+
+FLAG_ALTITUDE = 1  # Track has altitude samples
+
+
+def encode_track(points: Dict[str, np.ndarray]) -> bytes:
+    """
+    Encode track points into the cache file format.
+
+    Altitude gaps are interpolated; a track with no altitude at all decodes
+    to NaN altitude.
+
+    Args:
+        points: epoch, lat, lng and altitude arrays (from read_track_points)
+
+    Returns:
+        File contents
+    """
+    epoch_ms = np.round(np.asarray(points["epoch"], dtype=float) * TIME_SCALE).astype(np.int64)
+    altitude = np.asarray(points["altitude"], dtype=float)
+    flags = 0
+    if not np.isnan(altitude).all():
+        flags |= FLAG_ALTITUDE
+        altitude = fill_gaps(altitude)
+    else:
+        altitude = np.zeros_like(altitude)
+
+    fixed = np.stack([
+        np.round(np.asarray(points["lat"], dtype=float) * COORDINATE_SCALE),
+        np.round(np.asarray(points["lng"], dtype=float) * COORDINATE_SCALE),
+        np.round(altitude * ALTITUDE_SCALE),
+        epoch_ms - epoch_ms[0],
+    ]).astype(np.int64)
+    deltas = np.diff(fixed, axis=1, prepend=0)
+    if np.abs(deltas).max(initial=0) > np.iinfo(np.int32).max:
+        raise ValueError("Track values out of range for the cache format")
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, fixed.shape[1], int(epoch_ms[0]))
+    return header + deltas.astype("<i4").tobytes()
+
+
+class CachedTrack:
+    """A cached track mapped from disk."""
+
+    def __init__(self, path: str):
+        """
+        Map a cache file.
+
+        Args:
+            path: Path to a file written by TrackCache
+        """
+        with open(path, "rb") as f:
+            magic, version, flags, count, start_ms = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} track cache file")
+
+        self.path = path
+        self.flags = flags
+        self.start_epoch_ms = start_ms
+        # Zero-copy view of the delta columns
+        self.deltas = np.memmap(path, dtype="<i4", mode="r", offset=HEADER.size, shape=(len(COLUMNS), count))
+
+    def __len__(self) -> int:
+        return self.deltas.shape[1]
+
+    def _decode(self, column: str, scale: float) -> np.ndarray:
+        """Undo the delta encoding of one column."""
+        return np.cumsum(self.deltas[COLUMNS.index(column)], dtype=np.int64) / scale
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self._decode("lat", COORDINATE_SCALE)
+
+    @property
+    def lng(self) -> np.ndarray:
+        return self._decode("lng", COORDINATE_SCALE)
+
+    @property
+    def altitude(self) -> np.ndarray:
+        if not self.flags & FLAG_ALTITUDE:
+            return np.full(len(self), np.nan)
+        return self._decode("altitude", ALTITUDE_SCALE)
+
+    @property
+    def epoch(self) -> np.ndarray:
+        return (self._decode("time", 1.0) + self.start_epoch_ms) / TIME_SCALE
+
+    def points(self) -> Dict[str, np.ndarray]:
+        """Decoded epoch, lat, lng and altitude arrays."""
+        return {"epoch": self.epoch, "lat": self.lat, "lng": self.lng, "altitude": self.altitude}
+
+    def streams(self) -> Dict[str, np.ndarray]:
+        """Strava-style streams for the braking and terrain code."""
+        return track_to_streams(**self.points())
+
+
+class TrackCache:
+    """Directory of binary track files."""
+
+    def __init__(self, cache_dir: str = "track_cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the cache files (created if missing)
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """Cache file path for a key."""
+        return os.path.join(self.cache_dir, f"{key}.trk")
+
+    def put(self, key: str, points: Dict[str, np.ndarray]) -> str:
+        """
+        Write track points to the cache.
+
+        The file is written to a temporary name and renamed, so concurrent
+        readers never see a partial track.
+
+        Args:
+            key: Cache key, e.g. an activity ID
+            points: epoch, lat, lng and altitude arrays
+
+        Returns:
+            Path of the cache file
+        """
+        path = self.path_for(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(encode_track(points))
+        os.replace(temp_path, path)
+        return path
+
+    def open(self, key: str) -> Optional[CachedTrack]:
+        """Map a cached track, or None if it is not cached."""
+        path = self.path_for(key)
+        return CachedTrack(path) if os.path.exists(path) else None
+
+    def get(self, track_path: str) -> Optional[CachedTrack]:
+        """
+        Get a GPX/FIT file's track, parsing it only if the cache is missing or stale.
+
+        Args:
+            track_path: Path to a .gpx, .fit, .gpx.gz or .fit.gz file
+
+        Returns:
+            CachedTrack, or None if the file has no usable points
+        """
+        key = hashlib.sha1(os.path.abspath(track_path).encode()).hexdigest()[:20]
+        cached = self.path_for(key)
+        if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(track_path):
+            return CachedTrack(cached)
+
+        with open(track_path, "rb") as f:
+            points = read_track_points(f, track_path)
+        if points is None:
+            return None
+        self.put(key, points)
+        return CachedTrack(cached)
+
+    def get_many(self, track_paths: Iterable[str]) -> List[Optional[CachedTrack]]:
+        """Get several tracks (see get)."""
+        return [self.get(path) for path in track_paths]
@@ -10,7 +10,27 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import time
+
+import numpy as np
+
+from geometry import project_to_metres, segment_distance
+from http_session import get_rate_limiter, get_session
+from polyline_codec import decode_polyline
+
+# Bike route points within this distance of the car route count as shared
+ROUTE_CORRIDOR_METERS = 50.0
+
+# Activity fields a comparison needs; /athlete/activities summaries already include them
+CAPTURE_FIELDS = ("start_latlng", "end_latlng", "moving_time", "distance", "start_date")
+
+def has_capture_fields(activity: Optional[Dict]) -> bool:
+    """
+    Whether an activity (summary) has every field needed for a traffic comparison.
+    
+    Callers use a list summary as is when it does, and only fetch the activity
+    details from Strava when a field is missing.
+    """
+    return bool(activity) and all(activity.get(field) is not None for field in CAPTURE_FIELDS)
 
 @dataclass
 class TrafficComparison:
@@ -26,19 +46,79 @@ class TrafficComparison:
     car_speed_mph: float
     traffic_conditions: str
     route_summary: str
+    route_overlap_percentage: Optional[float] = None  # Share of the bike route the car route also uses
+    route_max_deviation_meters: Optional[float] = None
+
+def compare_routes(bike_route: np.ndarray, car_route: np.ndarray,
+                   corridor_meters: float = ROUTE_CORRIDOR_METERS) -> Dict:
+    """
+    Compare a bike route with a car route between the same points.
+    
+    Args:
+        bike_route: (n, 2) latitude/longitude of the ride (e.g. decoded summary_polyline)
+        car_route: (m, 2) latitude/longitude of the car route (e.g. decoded overview_polyline)
+        corridor_meters: Bike points this close to the car route count as shared
+        
+    Returns:
+        Dictionary with both route lengths, the overlap percentage of the bike
+        route and the furthest the bike route strays from the car route
+    """
+    x, y = project_to_metres(np.concatenate([bike_route, car_route]))
+    bx, by, cx, cy = x[:len(bike_route)], y[:len(bike_route)], x[len(bike_route):], y[len(bike_route):]
+    
+    if len(car_route) > 1:
+        # Nearest car segment for every bike point, in blocks to bound memory
+        nearest = np.empty(len(bike_route))
+        for start in range(0, len(bike_route), 1024):
+            block = slice(start, start + 1024)
+            nearest[block] = segment_distance(
+                bx[block, None], by[block, None], cx[:-1], cy[:-1], cx[1:], cy[1:]
+            ).min(axis=1)
+    else:
+        nearest = np.hypot(bx - cx[0], by - cy[0])
+    
+    bike_steps = np.hypot(np.diff(bx), np.diff(by))
+    bike_length = float(bike_steps.sum())
+    shared = (nearest[:-1] <= corridor_meters) & (nearest[1:] <= corridor_meters)
+    
+    return {
+        "bike_distance_meters": bike_length,
+        "car_distance_meters": float(np.hypot(np.diff(cx), np.diff(cy)).sum()),
+        "overlap_percentage": float(bike_steps[shared].sum() / bike_length * 100) if bike_length > 0 else 0.0,
+        "max_deviation_meters": float(nearest.max())
+    }
+
+def route_overlap(activity: Dict, route_data: Dict) -> Optional[Dict]:
+    """
+    Compare a ride's path with the car route, when both sides supply a polyline.
+    
+    Args:
+        activity: Strava activity (summary or details) with map.summary_polyline
+        route_data: Result of GoogleMapsAPI.get_route_time
+        
+    Returns:
+        compare_routes result, or None without both polylines
+    """
+    bike_polyline = (activity.get("map") or {}).get("summary_polyline")
+    if not bike_polyline or not route_data.get("polyline"):
+        return None
+    return compare_routes(decode_polyline(bike_polyline), decode_polyline(route_data["polyline"]))
 
 class GoogleMapsAPI:
     """Handles Google Maps API calls for traffic estimation."""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: Optional[requests.Session] = None):
         """
         Initialize Google Maps API client.
         
         Args:
             api_key: Google Maps API key with Directions API enabled
+            session: HTTP session (default: the shared pooled session)
         """
         self.api_key = api_key
+        self.session = session or get_session()
         self.base_url = "https://maps.googleapis.com/maps/api/directions/json"
+        self.max_quota_retries = 3
     
     def get_route_time(self, start_lat: float, start_lng: float, 
                       end_lat: float, end_lng: float, 
@@ -66,7 +146,15 @@ class GoogleMapsAPI:
             params["departure_time"] = "now"  # Use current traffic conditions
         
         try:
-            response = requests.get(self.base_url, params=params)
+            for _ in range(self.max_quota_retries + 1):
+                response = self.session.get(self.base_url, params=params)
+                if response.status_code != 200 or response.json().get("status") != "OVER_QUERY_LIMIT":
+                    break
+                # Over the per-second quota: the session's limiter has already slowed down,
+                # so the retry waits its turn (without a limiter it would fail again at once)
+                if get_rate_limiter(self.session, self.base_url) is None:
+                    break
+            
             if response.status_code == 200:
                 data = response.json()
                 
@@ -83,7 +171,8 @@ class GoogleMapsAPI:
                         "distance_meters": leg["distance"]["value"],
                         "distance_text": leg["distance"]["text"],
                         "traffic_conditions": self._analyze_traffic(leg),
-                        "route_summary": route.get("summary", "Unknown route")
+                        "route_summary": route.get("summary", "Unknown route"),
+                        "polyline": route.get("overview_polyline", {}).get("points", "")
                     }
                 else:
                     return {"error": f"API Error: {data.get('status', 'Unknown')}"}
@@ -131,19 +220,23 @@ class StravaTrafficAnalyzer:
         self.strava_api = strava_api
         self.google_maps_api = google_maps_api
     
-    def analyze_activity_traffic(self, activity_id: int) -> Optional[TrafficComparison]:
+    def analyze_activity_traffic(self, activity_id: int,
+                                 summary: Optional[Dict] = None) -> Optional[TrafficComparison]:
         """
         Analyze a single Strava activity for traffic comparison.
         
         Args:
             activity_id: Strava activity ID
+            summary: Activity from get_activities; details are only fetched if it lacks a needed field
             
         Returns:
             TrafficComparison object or None if analysis fails
         """
         try:
-            # Get activity details from Strava
-            activity = self.strava_api.get_activity_details(activity_id)
+            if has_capture_fields(summary):
+                activity = summary
+            else:
+                activity = self.strava_api.get_activity_details(activity_id)
             
             if not activity:
                 return None
@@ -183,6 +276,8 @@ class StravaTrafficAnalyzer:
             bike_speed_mph = distance_miles / (bike_time_minutes / 60.0) if bike_time_minutes > 0 else 0
             car_speed_mph = distance_miles / (car_time_minutes / 60.0) if car_time_minutes > 0 else 0
             
+            overlap = route_overlap(activity, route_data)
+            
             return TrafficComparison(
                 activity_id=activity_id,
                 activity_name=activity_name,
@@ -194,7 +289,9 @@ class StravaTrafficAnalyzer:
                 bike_speed_mph=bike_speed_mph,
                 car_speed_mph=car_speed_mph,
                 traffic_conditions=route_data["traffic_conditions"],
-                route_summary=route_data["route_summary"]
+                route_summary=route_data["route_summary"],
+                route_overlap_percentage=overlap["overlap_percentage"] if overlap else None,
+                route_max_deviation_meters=overlap["max_deviation_meters"] if overlap else None
             )
             
         except Exception as e:
@@ -222,12 +319,10 @@ class StravaTrafficAnalyzer:
                 activity_id = activity["id"]
                 print(f"Analyzing activity: {activity.get('name', 'Unknown')}")
                 
-                comparison = self.analyze_activity_traffic(activity_id)
+                # API calls are paced by the shared session's rate limiters
+                comparison = self.analyze_activity_traffic(activity_id, summary=activity)
                 if comparison:
                     results.append(comparison)
-                
-                # Rate limiting - be nice to APIs
-                time.sleep(1)
             
             return results
             
@@ -258,6 +353,8 @@ def print_traffic_summary(comparisons: List[TrafficComparison]):
         print(f"   Time saved: {comp.time_saved_minutes:.1f} minutes ({comp.time_saved_percentage:.1f}%)")
         print(f"   Traffic: {comp.traffic_conditions}")
         print(f"   Route: {comp.route_summary}")
+        if comp.route_overlap_percentage is not None:
+            print(f"   Shared with car route: {comp.route_overlap_percentage:.0f}%")
         
         if comp.time_saved_minutes > 0:
             print(f"   ✅ Beat car by {comp.time_saved_minutes:.1f} minutes!")
@@ -285,7 +382,8 @@ def print_traffic_summary(comparisons: List[TrafficComparison]):
 
 def analyze_strava_traffic(strava_client_id: str, strava_client_secret: str, 
                           strava_access_token: str, google_maps_api_key: str,
-                          days_back: int = 7) -> List[TrafficComparison]:
+                          days_back: int = 7,
+                          activity_cache_path: Optional[str] = "activity_cache.db") -> List[TrafficComparison]:
     """
     Convenience function to analyze Strava traffic.
     
@@ -295,14 +393,19 @@ def analyze_strava_traffic(strava_client_id: str, strava_client_secret: str,
         strava_access_token: Strava access token
         google_maps_api_key: Google Maps API key
         days_back: Number of days to analyze
+        activity_cache_path: SQLite file for cached activity details (None disables caching)
         
     Returns:
         List of TrafficComparison objects
     """
+    from activity_cache import POLLING_MAX_AGE_SECONDS, ActivityCache
     from strava_brake_wear_estimator import StravaAPI
     
-    # Initialize APIs
-    strava_api = StravaAPI(strava_client_id, strava_client_secret, strava_access_token)
+    # Initialize APIs (re-runs reuse the cached details of rides seen in the last day)
+    activity_cache = (ActivityCache(activity_cache_path, max_age_seconds=POLLING_MAX_AGE_SECONDS)
+                      if activity_cache_path else None)
+    strava_api = StravaAPI(strava_client_id, strava_client_secret, strava_access_token,
+                           activity_cache=activity_cache)
     google_maps_api = GoogleMapsAPI(google_maps_api_key)
     
     # Create analyzer
@@ -0,0 +1,253 @@
+"""
+Wear Model Calibration
+
+This module fits the weather, terrain and material tables of the wear model to
+observed pad replacements. Each completed pad lifecycle (rides between fitting
+and replacing a set of pads) gives one observation: the modelled wear over its
+rides should equal the wear that made the pads due for replacement.
+
+Rides are reduced to an exposure array E[lifecycle, weather, terrain] holding
+the distance-weighted speed/braking/weight/temperature factors, so predicted
+wear is base_rate[material] * sum(W[w] * T[t] * E[l, w, t]). The log of that is
+fitted with damped Gauss-Newton and a ridge prior toward the current model,
+which also pins down the overall scale that base rates and multipliers share.
+Every step is a handful of NumPy array operations over all lifecycles at once.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from strava_brake_wear_estimator import (
+    TERRAIN_CODES, UNKNOWN_CODE, WEATHER_CODES, RideTable, StravaBrakeWearEstimator,
+    TerrainType, WeatherCondition
+)
+from wear_ledger import WearLedger
+from wear_model import WearModel
+
+
+@dataclass
+class PadLifecycle:
+    """Rides on one set of pads, from fitting to replacement."""
+    material: str
+    rides: RideTable
+    observed_wear_mm: float  # Wear at replacement (usually initial minus minimum thickness)
+    rider_weight_kg: float = 70.0
+    bike_weight_kg: float = 15.0
+
+
+@dataclass
+class CalibrationResult:
+    """A fitted wear model and how well it explains the lifecycles."""
+    model: WearModel
+    lifecycle_count: int
+    iterations: int
+    rms_log_error_before: float
+    rms_log_error_after: float
+
+
+def exposure_matrix(lifecycles: List[PadLifecycle],
+                    estimator: StravaBrakeWearEstimator) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Reduce lifecycles to per-weather/terrain exposure.
+
+    Rides with a grade-profiled terrain multiplier are counted under their
+    terrain code, since the profile is a blend of the same table entries.
+
+    Args:
+        lifecycles: Pad lifecycles
+        estimator: Estimator whose speed/braking/weight/temperature factors are used
+
+    Returns:
+        Tuple of (exposure array [lifecycle, weather, terrain], material index
+        per lifecycle, material names)
+    """
+    n_weather, n_terrain = len(WEATHER_CODES), len(TERRAIN_CODES)
+    table = RideTable.concat([lifecycle.rides for lifecycle in lifecycles])
+    owner = np.repeat(np.arange(len(lifecycles)), [len(lifecycle.rides) for lifecycle in lifecycles])
+
+    factors = estimator._table_factors(table)
+    total_weight = np.array([l.rider_weight_kg + l.bike_weight_kg for l in lifecycles])[owner]
+    exposure = (
+        (factors["km_ridden"] / 1000.0) *
+        factors["speed_factor"] *
+        factors["braking_factor"] *
+        np.minimum(1.5, np.maximum(0.8, total_weight / 100.0)) *
+        factors["temp_factor"]
+    )
+
+    # Unknown codes fall back to DRY / FLAT like the estimator
+    weather = np.where(table.weather_code == UNKNOWN_CODE,
+                       WEATHER_CODES.index(WeatherCondition.DRY), table.weather_code)
+    terrain = np.where(table.terrain_code == UNKNOWN_CODE,
+                       TERRAIN_CODES.index(TerrainType.FLAT), table.terrain_code)
+    cell = (owner * n_weather + weather) * n_terrain + terrain
+    matrix = np.bincount(cell, weights=exposure, minlength=len(lifecycles) * n_weather * n_terrain)
+
+    materials = sorted({lifecycle.material for lifecycle in lifecycles})
+    material_index = np.array([materials.index(lifecycle.material) for lifecycle in lifecycles])
+    return matrix.reshape(len(lifecycles), n_weather, n_terrain), material_index, materials
+
+
+def fit_wear_model(
+    lifecycles: List[PadLifecycle],
+    estimator: StravaBrakeWearEstimator,
+    ridge: float = 1.0,
+    max_iterations: int = 50,
+    tolerance: float = 1e-8,
+    version: Optional[str] = None
+) -> CalibrationResult:
+    """
+    Fit wear multipliers and material rates to observed pad replacements.
+
+    Args:
+        lifecycles: Completed pad lifecycles
+        estimator: Estimator whose current wear model is the prior
+        ridge: Strength of the pull toward the prior (in log units)
+        max_iterations: Gauss-Newton iteration limit
+        tolerance: Stop when no log-parameter moves more than this
+        version: Version for the fitted model (default: timestamped)
+
+    Returns:
+        CalibrationResult with the fitted WearModel
+    """
+    prior = estimator.wear_model
+    exposure, material_index, materials = exposure_matrix(lifecycles, estimator)
+    observed = np.array([lifecycle.observed_wear_mm for lifecycle in lifecycles])
+
+    usable = (exposure.sum(axis=(1, 2)) > 0) & (observed > 0)
+    exposure, material_index, observed = exposure[usable], material_index[usable], observed[usable]
+    log_observed = np.log(observed)
+
+    n_weather, n_terrain, n_material = len(WEATHER_CODES), len(TERRAIN_CODES), len(materials)
+    theta_prior = np.log(np.concatenate([
+        [prior.weather_multipliers.get(c.value, 1.0) for c in WEATHER_CODES],
+        [prior.terrain_multipliers.get(t.value, 1.0) for t in TERRAIN_CODES],
+        [prior.material_wear_rates.get(m, 0.12) for m in materials],
+    ]))
+    material_onehot = np.eye(n_material)[material_index]
+
+    def residuals(theta):
+        weather, terrain = theta[:n_weather], theta[n_weather:n_weather + n_terrain]
+        contribution = exposure * np.exp(weather[:, None] + terrain[None, :])
+        total = contribution.sum(axis=(1, 2))
+        log_predicted = theta[n_weather + n_terrain:][material_index] + np.log(total)
+        return log_predicted - log_observed, contribution, total
+
+    def cost(theta, r):
+        return 0.5 * (r @ r) + 0.5 * ridge * np.sum((theta - theta_prior) ** 2)
+
+    theta = theta_prior.copy()
+    r, contribution, total = residuals(theta)
+    rms_before = float(np.sqrt(np.mean(r ** 2))) if len(r) else 0.0
+
+    iterations = 0
+    for iterations in range(1, max_iterations + 1):
+        jacobian = np.hstack([
+            contribution.sum(axis=2) / total[:, None],
+            contribution.sum(axis=1) / total[:, None],
+            material_onehot,
+        ])
+        gradient = jacobian.T @ r + ridge * (theta - theta_prior)
+        hessian = jacobian.T @ jacobian + ridge * np.eye(len(theta))
+        step = np.linalg.solve(hessian, -gradient)
+
+        # Halve the step until the cost goes down
+        current_cost = cost(theta, r)
+        scale = 1.0
+        while scale > 1e-4:
+            candidate = theta + scale * step
+            candidate_r, candidate_contribution, candidate_total = residuals(candidate)
+            if cost(candidate, candidate_r) <= current_cost:
+                break
+            scale /= 2
+        else:
+            break
+
+        theta, r, contribution, total = candidate, candidate_r, candidate_contribution, candidate_total
+        if np.max(np.abs(scale * step)) < tolerance:
+            break
+
+    fitted = np.exp(theta)
+    rms_after = float(np.sqrt(np.mean(r ** 2))) if len(r) else 0.0
+    now = datetime.now()
+    model = WearModel(
+        version=version or f"fitted-{now.strftime('%Y%m%dT%H%M%S')}",
+        weather_multipliers={c.value: round(float(v), 4) for c, v in zip(WEATHER_CODES, fitted[:n_weather])},
+        terrain_multipliers={
+            t.value: round(float(v), 4)
+            for t, v in zip(TERRAIN_CODES, fitted[n_weather:n_weather + n_terrain])
+        },
+        material_wear_rates={
+            **prior.material_wear_rates,
+            **{m: round(float(v), 4) for m, v in zip(materials, fitted[n_weather + n_terrain:])}
+        },
+        fitted_at=now.isoformat(),
+        metadata={
+            "prior_version": prior.version,
+            "lifecycles": int(len(observed)),
+            "ridge": ridge,
+            "rms_log_error_before": round(rms_before, 4),
+            "rms_log_error_after": round(rms_after, 4),
+        }
+    )
+
+    return CalibrationResult(model, int(len(observed)), iterations, rms_before, rms_after)
+
+
+def lifecycles_from_ledger(ledger: WearLedger, estimator: StravaBrakeWearEstimator,
+                           observed_wear_mm: Optional[float] = None,
+                           athlete_id: Optional[int] = None) -> List[PadLifecycle]:
+    """
+    Build pad lifecycles from the ledger's replacement log.
+
+    The ledger does not record pad material, so every lifecycle uses the
+    estimator's pad specs.
+
+    Args:
+        ledger: Wear ledger with logged replacements
+        estimator: Estimator whose pad specs describe the replaced pads
+        observed_wear_mm: Wear at replacement (default: usable pad thickness)
+        athlete_id: Only this athlete's replacements (optional)
+
+    Returns:
+        List of PadLifecycle objects with at least one ride
+    """
+    specs = estimator.brake_pad_specs
+    if observed_wear_mm is None:
+        observed_wear_mm = specs.initial_thickness_mm - specs.minimum_thickness_mm
+
+    lifecycles = []
+    for replacement in ledger.get_replacements(athlete_id):
+        rides = ledger.load_rides(
+            replacement.athlete_id, replacement.gear_id,
+            replacement.pads_installed_epoch, replacement.replaced_epoch
+        )
+        if len(rides):
+            lifecycles.append(PadLifecycle(
+                specs.material, rides, observed_wear_mm,
+                replacement.rider_weight_kg, replacement.bike_weight_kg
+            ))
+    return lifecycles
+
+
+def calibrate_from_ledger(ledger: WearLedger, estimator: StravaBrakeWearEstimator,
+                          model_path: Optional[str] = None, **fit_options) -> CalibrationResult:
+    """
+    Fit a wear model to the ledger's pad replacements and optionally save it.
+
+    Args:
+        ledger: Wear ledger with logged replacements
+        estimator: Estimator whose pad specs and wear model are the starting point
+        model_path: Where to save the fitted model file (optional)
+        **fit_options: Passed to fit_wear_model
+
+    Returns:
+        CalibrationResult
+    """
+    result = fit_wear_model(lifecycles_from_ledger(ledger, estimator), estimator, **fit_options)
+    if model_path:
+        result.model.save(model_path)
+    return result
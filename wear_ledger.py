@@ -0,0 +1,546 @@
+"""
+Brake Pad Wear Ledger
+
+This module keeps a running brake pad wear total per athlete and bike (Strava
+gear_id) in SQLite. New rides are scored and added as they arrive, so checking
+pad wear only costs the rides since the last update.
+"""
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Rides without a Strava gear_id are tracked under NO_GEAR
+from strava_brake_wear_estimator import BrakePadSpecs, NO_GEAR, RideTable, StravaBrakeWearEstimator
+
+
+@dataclass
+class LedgerEntry:
+    """Cumulative wear for one set of pads on one bike."""
+    athlete_id: int
+    gear_id: str
+    cumulative_wear_mm: float
+    cumulative_distance_miles: float
+    ride_count: int
+    last_ride_id: Optional[int]
+    last_ride_epoch: Optional[int]
+    pads_installed_epoch: int
+    rider_weight_kg: float
+    bike_weight_kg: float
+    model_version: str
+    updated_at: str
+    pad_material: Optional[str] = None  # Pads the totals were scored with
+
+
+@dataclass
+class PadReplacement:
+    """One logged pad replacement, i.e. a completed pad lifecycle."""
+    athlete_id: int
+    gear_id: str
+    pads_installed_epoch: int
+    replaced_epoch: int
+    wear_mm_at_replacement: float  # Model estimate at the time, not a measurement
+    distance_miles_at_replacement: float
+    rider_weight_kg: float
+    bike_weight_kg: float
+
+
+class WearLedger:
+    """Persists per-bike brake pad wear and applies new rides incrementally."""
+
+    def __init__(self, db_path: str = "wear_ledger.db"):
+        """
+        Initialize the ledger.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up SQLite tables for wear totals, scored rides, pad replacements and pad specs."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS wear_ledger (
+                athlete_id INTEGER,
+                gear_id TEXT,
+                cumulative_wear_mm REAL,
+                cumulative_distance_miles REAL,
+                ride_count INTEGER,
+                last_ride_id INTEGER,
+                last_ride_epoch INTEGER,
+                pads_installed_epoch INTEGER,
+                rider_weight_kg REAL,
+                bike_weight_kg REAL,
+                model_version TEXT,
+                updated_at TEXT,
+                pad_material TEXT,
+                PRIMARY KEY (athlete_id, gear_id)
+            )
+        ''')
+
+        # Ledgers created before per-bike pad specs lack this column
+        cursor.execute('PRAGMA table_info(wear_ledger)')
+        if "pad_material" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE wear_ledger ADD COLUMN pad_material TEXT')
+
+        # Raw ride summaries are kept so totals can be rebuilt when the wear model changes
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ledger_rides (
+                athlete_id INTEGER,
+                gear_id TEXT,
+                ride_id INTEGER,
+                name TEXT,
+                start_epoch INTEGER,
+                distance_miles REAL,
+                total_elevation_gain_feet REAL,
+                average_speed_mph REAL,
+                max_speed_mph REAL,
+                moving_time_seconds INTEGER,
+                weather_code INTEGER,
+                terrain_code INTEGER,
+                temperature_celsius REAL,
+                precipitation_mm REAL,
+                wear_mm REAL,
+                terrain_multiplier REAL,
+                PRIMARY KEY (athlete_id, gear_id, ride_id)
+            )
+        ''')
+
+        # Ledgers created before grade-based terrain profiles lack this column
+        cursor.execute('PRAGMA table_info(ledger_rides)')
+        if "terrain_multiplier" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE ledger_rides ADD COLUMN terrain_multiplier REAL')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pad_replacements (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                athlete_id INTEGER,
+                gear_id TEXT,
+                replaced_epoch INTEGER,
+                wear_mm_at_replacement REAL,
+                distance_miles_at_replacement REAL,
+                pads_installed_epoch INTEGER
+            )
+        ''')
+
+        # Each bike can run different pads (e.g. sintered on the MTB, organic on the road bike)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS bike_pad_specs (
+                athlete_id INTEGER,
+                gear_id TEXT,
+                material TEXT,
+                compound_hardness REAL,
+                initial_thickness_mm REAL,
+                minimum_thickness_mm REAL,
+                updated_at TEXT,
+                PRIMARY KEY (athlete_id, gear_id)
+            )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def set_bike_specs(self, athlete_id: int, gear_id: Optional[str], specs: BrakePadSpecs):
+        """
+        Record the pads fitted to one bike.
+
+        Wear totals already scored with other pads report `needs_rebuild`
+        until they are re-scored with `rebuild`.
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+            specs: Pad specifications for this bike
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO bike_pad_specs
+            (athlete_id, gear_id, material, compound_hardness, initial_thickness_mm,
+             minimum_thickness_mm, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (athlete_id, gear_id or NO_GEAR, specs.material, specs.compound_hardness,
+              specs.initial_thickness_mm, specs.minimum_thickness_mm, datetime.now().isoformat()))
+        conn.commit()
+        conn.close()
+
+    def get_bike_specs(self, athlete_id: int) -> Dict[str, BrakePadSpecs]:
+        """
+        Get the recorded pad specs of an athlete's bikes.
+
+        Args:
+            athlete_id: Strava athlete ID
+
+        Returns:
+            Dictionary of gear ID (NO_GEAR for rides without gear) to pad specs;
+            bikes without recorded specs are absent
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT gear_id, material, compound_hardness, initial_thickness_mm, minimum_thickness_mm
+            FROM bike_pad_specs WHERE athlete_id = ?
+        ''', (athlete_id,))
+        rows = cursor.fetchall()
+        conn.close()
+
+        return {gear_id: BrakePadSpecs(material, hardness, initial, minimum)
+                for gear_id, material, hardness, initial, minimum in rows}
+
+    def get_entry(self, athlete_id: int, gear_id: Optional[str] = None) -> Optional[LedgerEntry]:
+        """
+        Get the ledger entry for a bike.
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+
+        Returns:
+            LedgerEntry or None if the bike has no ledger yet
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT athlete_id, gear_id, cumulative_wear_mm, cumulative_distance_miles,
+                   ride_count, last_ride_id, last_ride_epoch, pads_installed_epoch,
+                   rider_weight_kg, bike_weight_kg, model_version, updated_at, pad_material
+            FROM wear_ledger
+            WHERE athlete_id = ? AND gear_id = ?
+        ''', (athlete_id, gear_id or NO_GEAR))
+
+        row = cursor.fetchone()
+        conn.close()
+        return LedgerEntry(*row) if row else None
+
+    def get_all_entries(self, athlete_id: Optional[int] = None) -> List[LedgerEntry]:
+        """
+        Get all ledger entries, optionally for a single athlete.
+
+        Args:
+            athlete_id: Strava athlete ID (None for every athlete)
+
+        Returns:
+            List of LedgerEntry objects
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        query = '''
+            SELECT athlete_id, gear_id, cumulative_wear_mm, cumulative_distance_miles,
+                   ride_count, last_ride_id, last_ride_epoch, pads_installed_epoch,
+                   rider_weight_kg, bike_weight_kg, model_version, updated_at, pad_material
+            FROM wear_ledger
+        '''
+        if athlete_id is not None:
+            cursor.execute(query + ' WHERE athlete_id = ? ORDER BY gear_id', (athlete_id,))
+        else:
+            cursor.execute(query + ' ORDER BY athlete_id, gear_id')
+
+        rows = cursor.fetchall()
+        conn.close()
+        return [LedgerEntry(*row) for row in rows]
+
+    def apply_rides(self, athlete_id: int, gear_id: Optional[str], rides: RideTable,
+                    estimator: StravaBrakeWearEstimator, rider_weight_kg: float = 70.0,
+                    bike_weight_kg: float = 15.0) -> RideTable:
+        """
+        Score rides that are newer than the last ride in the ledger and add them.
+
+        Rides at or before the last scored ride, or before the current pads
+        were installed, are ignored, so the same rides can be passed again safely.
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+            rides: RideTable of candidate rides for this bike
+            estimator: Estimator used to score the rides
+            rider_weight_kg: Rider weight in kilograms
+            bike_weight_kg: Bike weight in kilograms
+
+        Returns:
+            RideTable of the rides that were newly applied
+        """
+        gear_id = gear_id or NO_GEAR
+        entry = self.get_entry(athlete_id, gear_id)
+
+        new_mask = np.ones(len(rides), dtype=bool)
+        if entry:
+            new_mask &= rides.start_epoch >= entry.pads_installed_epoch
+            if entry.last_ride_epoch is not None:
+                new_mask &= (
+                    (rides.start_epoch > entry.last_ride_epoch) |
+                    ((rides.start_epoch == entry.last_ride_epoch) & (rides.id > entry.last_ride_id))
+                )
+        new_rides = rides.take(new_mask)
+
+        if len(new_rides) == 0:
+            return new_rides
+
+        wear_mm = estimator.estimate_wear_for_table(new_rides, rider_weight_kg, bike_weight_kg)["wear_mm"]
+        order = np.lexsort((new_rides.id, new_rides.start_epoch))
+        last = int(order[-1])
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany('''
+                INSERT OR REPLACE INTO ledger_rides
+                (athlete_id, gear_id, ride_id, name, start_epoch, distance_miles,
+                 total_elevation_gain_feet, average_speed_mph, max_speed_mph,
+                 moving_time_seconds, weather_code, terrain_code, temperature_celsius,
+                 precipitation_mm, wear_mm, terrain_multiplier)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', self._ride_rows(athlete_id, gear_id, new_rides, wear_mm))
+
+            cursor.execute('''
+                INSERT INTO wear_ledger
+                (athlete_id, gear_id, cumulative_wear_mm, cumulative_distance_miles, ride_count,
+                 last_ride_id, last_ride_epoch, pads_installed_epoch, rider_weight_kg,
+                 bike_weight_kg, model_version, updated_at, pad_material)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (athlete_id, gear_id) DO UPDATE SET
+                    cumulative_wear_mm = cumulative_wear_mm + excluded.cumulative_wear_mm,
+                    cumulative_distance_miles = cumulative_distance_miles + excluded.cumulative_distance_miles,
+                    ride_count = ride_count + excluded.ride_count,
+                    last_ride_id = excluded.last_ride_id,
+                    last_ride_epoch = excluded.last_ride_epoch,
+                    rider_weight_kg = excluded.rider_weight_kg,
+                    bike_weight_kg = excluded.bike_weight_kg,
+                    updated_at = excluded.updated_at
+            ''', (
+                athlete_id, gear_id, float(wear_mm.sum()), float(new_rides.distance_miles.sum()),
+                len(new_rides), int(new_rides.id[last]), int(new_rides.start_epoch[last]),
+                entry.pads_installed_epoch if entry else 0, rider_weight_kg, bike_weight_kg,
+                estimator.WEAR_MODEL_VERSION, datetime.now().isoformat(),
+                estimator.brake_pad_specs.material
+            ))
+
+            conn.commit()
+        finally:
+            conn.close()
+
+        return new_rides
+
+    def reset(self, athlete_id: int, gear_id: Optional[str] = None,
+              replaced_at: Optional[datetime] = None):
+        """
+        Record a pad replacement and start a fresh wear total.
+
+        Rides already scored stay in the ledger (and in the replacement log) but
+        no longer count toward the new pads.
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+            replaced_at: When the pads were replaced (default: now)
+        """
+        gear_id = gear_id or NO_GEAR
+        replaced_epoch = int((replaced_at or datetime.now(timezone.utc)).timestamp())
+        entry = self.get_entry(athlete_id, gear_id)
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                INSERT INTO pad_replacements
+                (athlete_id, gear_id, replaced_epoch, wear_mm_at_replacement,
+                 distance_miles_at_replacement, pads_installed_epoch)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                athlete_id, gear_id, replaced_epoch,
+                entry.cumulative_wear_mm if entry else 0.0,
+                entry.cumulative_distance_miles if entry else 0.0,
+                entry.pads_installed_epoch if entry else 0
+            ))
+
+            # Keep the last-ride pointer so old rides are not applied to the new pads
+            cursor.execute('''
+                INSERT INTO wear_ledger
+                (athlete_id, gear_id, cumulative_wear_mm, cumulative_distance_miles, ride_count,
+                 last_ride_id, last_ride_epoch, pads_installed_epoch, rider_weight_kg,
+                 bike_weight_kg, model_version, updated_at, pad_material)
+                VALUES (?, ?, 0.0, 0.0, 0, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (athlete_id, gear_id) DO UPDATE SET
+                    cumulative_wear_mm = 0.0,
+                    cumulative_distance_miles = 0.0,
+                    ride_count = 0,
+                    pads_installed_epoch = excluded.pads_installed_epoch,
+                    updated_at = excluded.updated_at
+            ''', (
+                athlete_id, gear_id,
+                entry.last_ride_id if entry else None,
+                entry.last_ride_epoch if entry else None,
+                replaced_epoch,
+                entry.rider_weight_kg if entry else 70.0,
+                entry.bike_weight_kg if entry else 15.0,
+                entry.model_version if entry else StravaBrakeWearEstimator.WEAR_MODEL_VERSION,
+                datetime.now().isoformat(),
+                entry.pad_material if entry else None
+            ))
+
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get_replacements(self, athlete_id: Optional[int] = None) -> List[PadReplacement]:
+        """
+        Get logged pad replacements, optionally for a single athlete.
+
+        Args:
+            athlete_id: Strava athlete ID (None for every athlete)
+
+        Returns:
+            List of PadReplacement objects ordered by replacement time
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        query = '''
+            SELECT r.athlete_id, r.gear_id, r.pads_installed_epoch, r.replaced_epoch,
+                   r.wear_mm_at_replacement, r.distance_miles_at_replacement,
+                   COALESCE(l.rider_weight_kg, 70.0), COALESCE(l.bike_weight_kg, 15.0)
+            FROM pad_replacements r
+            LEFT JOIN wear_ledger l ON l.athlete_id = r.athlete_id AND l.gear_id = r.gear_id
+        '''
+        if athlete_id is not None:
+            cursor.execute(query + ' WHERE r.athlete_id = ? ORDER BY r.replaced_epoch, r.id', (athlete_id,))
+        else:
+            cursor.execute(query + ' ORDER BY r.replaced_epoch, r.id')
+
+        rows = cursor.fetchall()
+        conn.close()
+        return [PadReplacement(*row) for row in rows]
+
+    def load_rides(self, athlete_id: int, gear_id: Optional[str] = None,
+                   since_epoch: int = 0, until_epoch: Optional[int] = None) -> RideTable:
+        """
+        Load stored ride summaries for a bike as a RideTable.
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+            since_epoch: Only rides starting at or after this time
+            until_epoch: Only rides starting before this time (optional)
+
+        Returns:
+            RideTable ordered by start time
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT ride_id, name, distance_miles, total_elevation_gain_feet, average_speed_mph,
+                   max_speed_mph, moving_time_seconds, start_epoch, weather_code, terrain_code,
+                   temperature_celsius, precipitation_mm, terrain_multiplier
+            FROM ledger_rides
+            WHERE athlete_id = ? AND gear_id = ? AND start_epoch >= ? AND start_epoch < ?
+            ORDER BY start_epoch, ride_id
+        ''', (athlete_id, gear_id or NO_GEAR, since_epoch,
+              until_epoch if until_epoch is not None else 2 ** 62))
+
+        rows = cursor.fetchall()
+        conn.close()
+
+        columns: Dict[str, List] = {column: [] for column in RideTable.COLUMNS}
+        names = []
+        for row in rows:
+            (ride_id, name, distance, elevation, average_speed, max_speed, moving_time,
+             start_epoch, weather_code, terrain_code, temperature, precipitation,
+             terrain_multiplier) = row
+            names.append(name)
+            columns["id"].append(ride_id)
+            columns["distance_miles"].append(distance)
+            columns["total_elevation_gain_feet"].append(elevation)
+            columns["average_speed_mph"].append(average_speed)
+            columns["max_speed_mph"].append(max_speed)
+            columns["moving_time_seconds"].append(moving_time)
+            columns["start_epoch"].append(start_epoch)
+            columns["weather_code"].append(weather_code)
+            columns["terrain_code"].append(terrain_code)
+            columns["temperature_celsius"].append(np.nan if temperature is None else temperature)
+            columns["precipitation_mm"].append(np.nan if precipitation is None else precipitation)
+            columns["terrain_multiplier"].append(np.nan if terrain_multiplier is None else terrain_multiplier)
+            columns["gear_code"].append(0)
+
+        return RideTable(columns, names, [gear_id or NO_GEAR])
+
+    def rebuild(self, athlete_id: int, gear_id: Optional[str],
+                estimator: StravaBrakeWearEstimator) -> Optional[LedgerEntry]:
+        """
+        Re-score the current pads' rides with the estimator's wear model and pads.
+
+        Use this after the wear model or the bike's pad specs change (see `needs_rebuild`).
+
+        Args:
+            athlete_id: Strava athlete ID
+            gear_id: Strava gear ID (None for rides without gear)
+            estimator: Estimator with the new wear model and the bike's pads
+
+        Returns:
+            Updated LedgerEntry, or None if the bike has no ledger
+        """
+        gear_id = gear_id or NO_GEAR
+        entry = self.get_entry(athlete_id, gear_id)
+        if not entry:
+            return None
+
+        rides = self.load_rides(athlete_id, gear_id, entry.pads_installed_epoch)
+        wear_mm = estimator.estimate_wear_for_table(
+            rides, entry.rider_weight_kg, entry.bike_weight_kg
+        )["wear_mm"]
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        try:
+            cursor.executemany('''
+                UPDATE ledger_rides SET wear_mm = ?
+                WHERE athlete_id = ? AND gear_id = ? AND ride_id = ?
+            ''', [(wear, athlete_id, gear_id, ride_id)
+                  for wear, ride_id in zip(wear_mm.tolist(), rides.id.tolist())])
+
+            cursor.execute('''
+                UPDATE wear_ledger
+                SET cumulative_wear_mm = ?, cumulative_distance_miles = ?, ride_count = ?,
+                    model_version = ?, updated_at = ?, pad_material = ?
+                WHERE athlete_id = ? AND gear_id = ?
+            ''', (
+                float(wear_mm.sum()), float(rides.distance_miles.sum()), len(rides),
+                estimator.WEAR_MODEL_VERSION, datetime.now().isoformat(),
+                estimator.brake_pad_specs.material, athlete_id, gear_id
+            ))
+
+            conn.commit()
+        finally:
+            conn.close()
+
+        return self.get_entry(athlete_id, gear_id)
+
+    def needs_rebuild(self, entry: LedgerEntry, estimator: StravaBrakeWearEstimator) -> bool:
+        """Check whether an entry was scored with a different wear model version or pad material."""
+        return (entry.model_version != estimator.WEAR_MODEL_VERSION or
+                entry.pad_material != estimator.brake_pad_specs.material)
+
+    def _ride_rows(self, athlete_id: int, gear_id: str, rides: RideTable, wear_mm: np.ndarray) -> List[tuple]:
+        """Convert a RideTable into ledger_rides rows."""
+        temperature = [None if np.isnan(t) else t for t in rides.temperature_celsius.tolist()]
+        precipitation = [None if np.isnan(p) else p for p in rides.precipitation_mm.tolist()]
+        terrain_multiplier = [None if np.isnan(m) else m for m in rides.terrain_multiplier.tolist()]
+        return list(zip(
+            [athlete_id] * len(rides), [gear_id] * len(rides), rides.id.tolist(), rides.names,
+            rides.start_epoch.tolist(), rides.distance_miles.tolist(),
+            rides.total_elevation_gain_feet.tolist(), rides.average_speed_mph.tolist(),
+            rides.max_speed_mph.tolist(), rides.moving_time_seconds.tolist(),
+            rides.weather_code.tolist(), rides.terrain_code.tolist(),
+            temperature, precipitation, wear_mm.tolist(), terrain_multiplier
+        ))
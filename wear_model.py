@@ -0,0 +1,206 @@
+"""
+Versioned Wear Model
+
+This module holds the wear multiplier tables (weather, terrain, pad material)
+shared by `BrakeWearEstimator` and `StravaBrakeWearEstimator`. The built-in
+tables live here; fitted tables from `wear_calibration.py` are saved as a
+versioned JSON model file that both estimators load at startup.
+
+Tables are keyed by the enum values ("wet", "hilly", ...) so the file does not
+depend on either estimator's enum classes.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# Version recorded for the built-in tables
+BUILTIN_VERSION = "builtin-1"
+
+# Model file loaded by the estimators, overridable with WEAR_MODEL_PATH
+DEFAULT_MODEL_PATH = "wear_model.json"
+
+# Bumped when the file layout changes
+MODEL_FORMAT = 1
+
+# Estimator attributes holding each table; subclasses may override them at class level
+TABLE_ATTRIBUTES = ("WEAR_MODEL_VERSION", "WEATHER_MULTIPLIERS", "TERRAIN_MULTIPLIERS", "MATERIAL_WEAR_RATES")
+
+# Weather wear multipliers (higher = more wear)
+BUILTIN_WEATHER_MULTIPLIERS = {
+    "dry": 1.0,
+    "wet": 1.3,
+    "rainy": 1.5,
+    "snowy": 1.8,
+    "muddy": 2.2,
+    "sandy": 2.5,
+}
+
+# Terrain wear multipliers
+BUILTIN_TERRAIN_MULTIPLIERS = {
+    "flat": 0.8,
+    "hilly": 1.2,
+    "mountainous": 1.6,
+    "urban": 1.1,
+    "off_road": 1.4,
+}
+
+# Material wear rates (mm per 1000 km under standard conditions)
+BUILTIN_MATERIAL_WEAR_RATES = {
+    "organic": 0.15,
+    "semi-metallic": 0.12,
+    "ceramic": 0.08,
+    "sintered": 0.10,
+}
+
+
+@dataclass
+class WearModel:
+    """A versioned set of wear multiplier tables."""
+    version: str
+    weather_multipliers: Dict[str, float]
+    terrain_multipliers: Dict[str, float]
+    material_wear_rates: Dict[str, float]
+    fitted_at: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)  # Fit statistics etc.
+
+    def weather_table(self, enum_cls) -> Dict:
+        """Weather multipliers keyed by members of `enum_cls`."""
+        return {member: self.weather_multipliers[member.value] for member in enum_cls
+                if member.value in self.weather_multipliers}
+
+    def terrain_table(self, enum_cls) -> Dict:
+        """Terrain multipliers keyed by members of `enum_cls`."""
+        return {member: self.terrain_multipliers[member.value] for member in enum_cls
+                if member.value in self.terrain_multipliers}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the model for the JSON file."""
+        return dict(asdict(self), format=MODEL_FORMAT)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WearModel":
+        """
+        Build a model from its JSON form.
+
+        Tables missing an entry keep the built-in value for it.
+
+        Args:
+            data: Decoded model file
+
+        Returns:
+            WearModel
+        """
+        if data.get("format", MODEL_FORMAT) > MODEL_FORMAT:
+            raise ValueError(f"Wear model format {data['format']} is newer than supported ({MODEL_FORMAT})")
+        return cls(
+            version=data["version"],
+            weather_multipliers={**BUILTIN_WEATHER_MULTIPLIERS, **data.get("weather_multipliers", {})},
+            terrain_multipliers={**BUILTIN_TERRAIN_MULTIPLIERS, **data.get("terrain_multipliers", {})},
+            material_wear_rates={**BUILTIN_MATERIAL_WEAR_RATES, **data.get("material_wear_rates", {})},
+            fitted_at=data.get("fitted_at"),
+            metadata=data.get("metadata", {})
+        )
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        """
+        Write the model file atomically.
+
+        Args:
+            path: Destination path
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WearModel":
+        """
+        Read a model file.
+
+        Args:
+            path: Model file path
+
+        Returns:
+            WearModel
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def builtin_model() -> WearModel:
+    """The hard-coded tables the estimators shipped with."""
+    return WearModel(
+        version=BUILTIN_VERSION,
+        weather_multipliers=dict(BUILTIN_WEATHER_MULTIPLIERS),
+        terrain_multipliers=dict(BUILTIN_TERRAIN_MULTIPLIERS),
+        material_wear_rates=dict(BUILTIN_MATERIAL_WEAR_RATES)
+    )
+
+
+# path -> ((mtime, size), model); the file is parsed again only after it changes
+_loaded_models: Dict[str, Tuple[Tuple[int, int], WearModel]] = {}
+_loaded_models_lock = threading.Lock()
+_builtin = builtin_model()
+
+
+def load_wear_model(path: Optional[str] = None) -> WearModel:
+    """
+    Load the wear model used at estimator startup.
+
+    The parsed model is cached per process by path, modification time and
+    size, so building many estimators reads the file once. The returned
+    model is shared: copy it before editing its tables.
+
+    Args:
+        path: Model file (default: $WEAR_MODEL_PATH or wear_model.json)
+
+    Returns:
+        The fitted model if the file exists, otherwise the built-in model
+    """
+    path = path or os.getenv("WEAR_MODEL_PATH", DEFAULT_MODEL_PATH)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return _builtin
+    key = (stat.st_mtime_ns, stat.st_size)
+
+    with _loaded_models_lock:
+        cached = _loaded_models.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    model = WearModel.load(path)
+    with _loaded_models_lock:
+        _loaded_models[path] = (key, model)
+    return model
+
+
+def apply_wear_model(estimator, base_cls, wear_model: WearModel, weather_enum, terrain_enum):
+    """
+    Set an estimator's multiplier tables from a wear model.
+
+    Tables that a subclass of `base_cls` overrides at class level (for example
+    `MATERIAL_WEAR_RATES = {"sintered": 0.2}`) keep the subclass's values.
+
+    Args:
+        estimator: BrakeWearEstimator or StravaBrakeWearEstimator instance
+        base_cls: The estimator class that defines the built-in tables
+        wear_model: Model to apply
+        weather_enum: WeatherCondition enum of the estimator's module
+        terrain_enum: TerrainType enum of the estimator's module
+    """
+    tables = {
+        "WEAR_MODEL_VERSION": wear_model.version,
+        "WEATHER_MULTIPLIERS": wear_model.weather_table(weather_enum),
+        "TERRAIN_MULTIPLIERS": wear_model.terrain_table(terrain_enum),
+        "MATERIAL_WEAR_RATES": dict(wear_model.material_wear_rates),
+    }
+    subclasses = type(estimator).__mro__[:type(estimator).__mro__.index(base_cls)]
+    estimator.wear_model = wear_model
+    for name in TABLE_ATTRIBUTES:
+        if not any(name in vars(cls) for cls in subclasses):
+            setattr(estimator, name, tables[name])
@@ -0,0 +1,236 @@
+"""
+Monte Carlo Brake Pad Wear
+
+This module turns the point estimates of `brake_wear_estimator.py` into
+distributions. The model's multipliers and the ride inputs are sampled from
+configurable distributions and pushed through the vectorized wear formula in a
+single NumPy pass, giving P10/P50/P90 remaining miles for stocking decisions.
+Many bikes can be simulated across a process pool; every bike gets its own
+child seed, so results are reproducible and independent of the worker count.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from brake_wear_estimator import BrakePadSpecs, BrakeWearEstimator, RidingConditions, wear_mm_array
+
+# Percentiles reported for each simulation
+PERCENTILES = (10, 50, 90)
+
+
+@dataclass
+class Distribution:
+    """A sampling distribution for one model input."""
+    kind: str  # "fixed", "normal", "lognormal", "uniform" or "triangular"
+    params: Tuple[float, ...]  # fixed: (value,), normal/lognormal: (mean, sigma), uniform: (low, high), triangular: (low, mode, high)
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """
+        Draw samples from the distribution.
+
+        Args:
+            rng: NumPy random generator
+            size: Number of draws
+
+        Returns:
+            Array of samples
+        """
+        if self.kind == "fixed":
+            return np.full(size, float(self.params[0]))
+        if self.kind == "normal":
+            return rng.normal(self.params[0], self.params[1], size)
+        if self.kind == "lognormal":
+            return rng.lognormal(self.params[0], self.params[1], size)
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1], size)
+        if self.kind == "triangular":
+            return rng.triangular(self.params[0], self.params[1], self.params[2], size)
+        raise ValueError(f"Unknown distribution kind: {self.kind}")
+
+
+def _spread(sigma: float) -> Distribution:
+    """Median-1.0 lognormal scale factor."""
+    return Distribution("lognormal", (0.0, sigma))
+
+
+@dataclass
+class WearUncertainty:
+    """
+    Uncertainty in the wear model, as scale factors applied to the point inputs.
+
+    Each distribution is sampled as a multiplier on the corresponding point
+    value (e.g. a draw of 1.1 for average_speed means 10% faster riding).
+    Use `Distribution("fixed", (1.0,))` to switch a source of uncertainty off.
+    """
+    base_wear_rate: Distribution = field(default_factory=lambda: _spread(0.20))
+    weather_multiplier: Distribution = field(default_factory=lambda: _spread(0.15))
+    terrain_multiplier: Distribution = field(default_factory=lambda: _spread(0.15))
+    average_speed: Distribution = field(default_factory=lambda: _spread(0.10))
+    braking_frequency: Distribution = field(default_factory=lambda: _spread(0.20))
+    total_weight: Distribution = field(default_factory=lambda: _spread(0.05))
+    current_wear: Distribution = field(default_factory=lambda: _spread(0.10))
+
+
+@dataclass
+class BikeWearInputs:
+    """Everything needed to simulate remaining pad life for one bike."""
+    bike_id: str
+    brake_pad_specs: BrakePadSpecs
+    conditions: RidingConditions
+    current_wear_mm: float = 0.0
+    temperature_celsius: Optional[float] = None
+
+
+class MonteCarloWearEstimator(BrakeWearEstimator):
+    """Brake wear estimator that reports distributions instead of point values."""
+
+    def __init__(self, brake_pad_specs: BrakePadSpecs, uncertainty: Optional[WearUncertainty] = None):
+        """
+        Initialize the estimator.
+
+        Args:
+            brake_pad_specs: Brake pad specifications
+            uncertainty: Input distributions (defaults to WearUncertainty())
+        """
+        super().__init__(brake_pad_specs)
+        self.uncertainty = uncertainty or WearUncertainty()
+
+    def sample_remaining_miles(
+        self,
+        conditions: RidingConditions,
+        current_wear_mm: float = 0.0,
+        draws: int = 100_000,
+        seed=None,
+        temperature_celsius: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Sample remaining miles until the pads reach minimum thickness.
+
+        Args:
+            conditions: Expected riding conditions
+            current_wear_mm: Wear already on the pads
+            draws: Number of Monte Carlo draws
+            seed: Seed or SeedSequence for reproducible draws
+            temperature_celsius: Ambient temperature (optional)
+
+        Returns:
+            Array of remaining miles, one per draw
+        """
+        rng = np.random.default_rng(seed)
+        u = self.uncertainty
+
+        base_wear_rate = self.MATERIAL_WEAR_RATES.get(self.brake_pad_specs.material, 0.12)
+        weather_multiplier = self.WEATHER_MULTIPLIERS.get(conditions.weather, 1.0)
+        terrain_multiplier = self.TERRAIN_MULTIPLIERS.get(conditions.terrain, 1.0)
+        total_weight = conditions.rider_weight_kg + conditions.bike_weight_kg
+
+        # Wear over one mile (1.60934 km) for every draw
+        wear_per_mile = wear_mm_array(
+            base_wear_rate * u.base_wear_rate.sample(rng, draws),
+            1.60934,
+            weather_multiplier * u.weather_multiplier.sample(rng, draws),
+            terrain_multiplier * u.terrain_multiplier.sample(rng, draws),
+            conditions.average_speed_kmh * u.average_speed.sample(rng, draws),
+            np.clip(conditions.braking_frequency * u.braking_frequency.sample(rng, draws), 0.0, 10.0),
+            total_weight * u.total_weight.sample(rng, draws),
+            temperature_celsius
+        )
+
+        worn = current_wear_mm * u.current_wear.sample(rng, draws)
+        usable_thickness = self.brake_pad_specs.initial_thickness_mm - self.brake_pad_specs.minimum_thickness_mm
+        remaining_usable = np.maximum(0.0, usable_thickness - worn)
+
+        with np.errstate(divide="ignore"):
+            return np.where(wear_per_mile > 0, remaining_usable / wear_per_mile, np.inf)
+
+    def estimate_remaining_miles(
+        self,
+        conditions: RidingConditions,
+        current_wear_mm: float = 0.0,
+        draws: int = 100_000,
+        seed=None,
+        temperature_celsius: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Estimate the remaining-miles distribution for the pads.
+
+        Args:
+            conditions: Expected riding conditions
+            current_wear_mm: Wear already on the pads
+            draws: Number of Monte Carlo draws
+            seed: Seed or SeedSequence for reproducible draws
+            temperature_celsius: Ambient temperature (optional)
+
+        Returns:
+            Dictionary with p10/p50/p90 and mean remaining miles
+        """
+        samples = self.sample_remaining_miles(conditions, current_wear_mm, draws, seed, temperature_celsius)
+        return summarize_samples(samples)
+
+
+def summarize_samples(samples: np.ndarray) -> Dict[str, float]:
+    """
+    Summarize remaining-miles samples.
+
+    Args:
+        samples: Remaining miles per draw
+
+    Returns:
+        Dictionary with p10/p50/p90, mean and draw count
+    """
+    p10, p50, p90 = np.percentile(samples, PERCENTILES)
+    return {
+        "p10_remaining_miles": round(float(p10), 0),
+        "p50_remaining_miles": round(float(p50), 0),
+        "p90_remaining_miles": round(float(p90), 0),
+        "mean_remaining_miles": round(float(np.mean(samples)), 0),
+        "draws": int(len(samples)),
+    }
+
+
+def _simulate_bike(args) -> Dict[str, float]:
+    """Process pool worker: simulate one bike with its own seed."""
+    bike, uncertainty, draws, seed = args
+    estimator = MonteCarloWearEstimator(bike.brake_pad_specs, uncertainty)
+    result = estimator.estimate_remaining_miles(
+        bike.conditions, bike.current_wear_mm, draws, seed, bike.temperature_celsius
+    )
+    result["bike_id"] = bike.bike_id
+    return result
+
+
+def estimate_fleet_remaining_miles(
+    bikes: Sequence[BikeWearInputs],
+    uncertainty: Optional[WearUncertainty] = None,
+    draws: int = 100_000,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None
+) -> List[Dict[str, float]]:
+    """
+    Simulate remaining pad life for many bikes.
+
+    Each bike draws from its own child of `seed`, so results do not depend on
+    how the bikes are split across workers.
+
+    Args:
+        bikes: Bikes to simulate
+        uncertainty: Input distributions (defaults to WearUncertainty())
+        draws: Monte Carlo draws per bike
+        seed: Root seed for reproducible results
+        max_workers: Process pool size (1 runs in this process, None uses all cores)
+
+    Returns:
+        List of per-bike summaries in input order
+    """
+    uncertainty = uncertainty or WearUncertainty()
+    seeds = np.random.SeedSequence(seed).spawn(len(bikes))
+    jobs = [(bike, uncertainty, draws, child) for bike, child in zip(bikes, seeds)]
+
+    if max_workers == 1 or len(jobs) <= 1:
+        return [_simulate_bike(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_simulate_bike, jobs))
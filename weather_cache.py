@@ -0,0 +1,181 @@
+"""
+Weather Lookup Cache
+
+This module caches OpenWeatherMap lookups on disk, keyed by a rounded
+latitude/longitude cell and the hour of the ride. Rides that start from the
+same place in the same hour share one API call, and past weather never
+changes, so entries are kept until they are evicted (LRU) or expire (TTL).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+class WeatherCache:
+    """Persistent geo/time-bucketed cache for weather lookups."""
+
+    def __init__(self, db_path: str = "weather_cache.db", cell_degrees: float = 0.1,
+                 ttl_seconds: Optional[float] = None, max_entries: int = 50000):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to SQLite database (share it to share the cache)
+            cell_degrees: Size of a lat/lon cell in degrees (0.1 is about 11 km)
+            ttl_seconds: Drop entries older than this (None keeps them forever)
+            max_entries: Least recently used entries are evicted beyond this size
+        """
+        self.db_path = db_path
+        self.cell_degrees = cell_degrees
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.setup_database()
+
+    def setup_database(self):
+        """Set up SQLite table for cached weather data."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                lat_cell INTEGER,
+                lon_cell INTEGER,
+                hour_bucket INTEGER,
+                weather_json TEXT,
+                stored_at REAL,
+                last_used REAL,
+                PRIMARY KEY (lat_cell, lon_cell, hour_bucket)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_cache_last_used ON weather_cache (last_used)')
+
+        conn.commit()
+        conn.close()
+
+    def cache_key(self, lat: float, lon: float, date: datetime) -> Tuple[int, int, int]:
+        """
+        Get the (lat cell, lon cell, hour bucket) key for a lookup.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            date: Date of the ride
+
+        Returns:
+            Cache key tuple
+        """
+        return (
+            round(lat / self.cell_degrees),
+            round(lon / self.cell_degrees),
+            int(date.timestamp()) // 3600
+        )
+
+    def get(self, lat: float, lon: float, date: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached weather data.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            date: Date of the ride
+
+        Returns:
+            Weather data dictionary, or None on a miss
+        """
+        key = self.cache_key(lat, lon, date)
+        now = time.time()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT weather_json, stored_at FROM weather_cache
+            WHERE lat_cell = ? AND lon_cell = ? AND hour_bucket = ?
+        ''', key)
+        row = cursor.fetchone()
+
+        if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+            cursor.execute('''
+                DELETE FROM weather_cache WHERE lat_cell = ? AND lon_cell = ? AND hour_bucket = ?
+            ''', key)
+            row = None
+            with self._lock:
+                self.evictions += 1
+        elif row:
+            cursor.execute('''
+                UPDATE weather_cache SET last_used = ?
+                WHERE lat_cell = ? AND lon_cell = ? AND hour_bucket = ?
+            ''', (now,) + key)
+
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return json.loads(row[0]) if row else None
+
+    def put(self, lat: float, lon: float, date: datetime, weather_data: Dict[str, Any]):
+        """
+        Store weather data and evict least recently used entries over the size limit.
+
+        Args:
+            lat: Latitude
+            lon: Longitude
+            date: Date of the ride
+            weather_data: Weather data dictionary from the API
+        """
+        key = self.cache_key(lat, lon, date)
+        now = time.time()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO weather_cache
+            (lat_cell, lon_cell, hour_bucket, weather_json, stored_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', key + (json.dumps(weather_data), now, now))
+
+        cursor.execute('SELECT COUNT(*) FROM weather_cache')
+        excess = cursor.fetchone()[0] - self.max_entries
+        if excess > 0:
+            cursor.execute('''
+                DELETE FROM weather_cache WHERE rowid IN (
+                    SELECT rowid FROM weather_cache ORDER BY last_used ASC LIMIT ?
+                )
+            ''', (excess,))
+            with self._lock:
+                self.evictions += excess
+
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss/eviction counters and the current number of entries."""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM weather_cache')
+        entries = cursor.fetchone()[0]
+        conn.close()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": entries,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -15,7 +15,8 @@ import os
 import secrets
 from strava_monitor import StravaMonitor, StoredTrafficComparison
 from traffic_comparison import GoogleMapsAPI
-import requests
+from http_session import get_session as get_http_session, set_max_rate_limit_wait
+from rate_limiter import RateLimitExceeded
 
 # Load environment variables from .env file
 try:
@@ -35,6 +36,26 @@ GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', 'your_google_maps_ap
 # OAuth redirect URI (should match your Strava app settings)
 REDIRECT_URI = 'http://localhost:5001/oauth/callback'
 
+# Longest a dashboard request waits for an API rate limiter before answering 503
+DASHBOARD_MAX_RATE_LIMIT_WAIT = float(os.environ.get('DASHBOARD_MAX_RATE_LIMIT_WAIT', 2.0))
+
+@app.before_request
+def limit_rate_limit_wait():
+    """Fail fast instead of holding a request thread until an API quota resets."""
+    set_max_rate_limit_wait(DASHBOARD_MAX_RATE_LIMIT_WAIT)
+
+@app.teardown_request
+def reset_rate_limit_wait(exc=None):
+    set_max_rate_limit_wait(None)
+
+@app.errorhandler(RateLimitExceeded)
+def rate_limited(error):
+    """Tell the client to come back once the API quota allows."""
+    response = jsonify({'error': 'Strava API rate limit reached, please try again shortly',
+                        'retry_after': round(error.retry_after)})
+    response.headers['Retry-After'] = str(max(1, round(error.retry_after)))
+    return response, 503
+
 def load_config():
     """Load configuration from environment variables or config file."""
     try:
@@ -84,9 +105,11 @@ def get_user_athlete_info(user_id):
     headers = {"Authorization": f"Bearer {access_token}"}
     
     try:
-        response = requests.get("https://www.strava.com/api/v3/athlete", headers=headers)
+        response = get_http_session().get("https://www.strava.com/api/v3/athlete", headers=headers)
         if response.status_code == 200:
             return response.json()
+    except RateLimitExceeded:
+        raise
     except:
         pass
     
@@ -129,7 +152,7 @@ def oauth_callback():
     }
     
     try:
-        response = requests.post(token_url, data=data)
+        response = get_http_session().post(token_url, data=data)
         if response.status_code == 200:
             token_data = response.json()
             
@@ -149,12 +172,21 @@ def oauth_callback():
                     'athlete_info': athlete_info
                 }
                 
+                # Register the athlete for the nightly service-due run
+                from service_scheduler import AthleteTokenStore
+                AthleteTokenStore(os.environ.get('SERVICE_DB', 'service_schedule.db')).save_tokens(
+                    athlete_info['id'], token_data['access_token'],
+                    token_data.get('refresh_token', ''), token_data.get('expires_at', 0)
+                )
+                
                 session['current_user_id'] = user_id
                 flash(f'Welcome, {athlete_info.get("firstname", "Athlete")}!', 'success')
             else:
                 flash('Failed to get athlete information.', 'error')
         else:
             flash('Failed to get access token.', 'error')
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         flash(f'Authentication error: {str(e)}', 'error')
     
@@ -164,9 +196,11 @@ def get_athlete_info(access_token):
     """Get athlete information using access token."""
     headers = {"Authorization": f"Bearer {access_token}"}
     try:
-        response = requests.get("https://www.strava.com/api/v3/athlete", headers=headers)
+        response = get_http_session().get("https://www.strava.com/api/v3/athlete", headers=headers)
         if response.status_code == 200:
             return response.json()
+    except RateLimitExceeded:
+        raise
     except:
         pass
     return None
@@ -210,6 +244,8 @@ def get_comparisons():
             "car_speed_mph": comp.car_speed_mph,
             "traffic_conditions": comp.traffic_conditions,
             "route_summary": comp.route_summary,
+            "route_overlap_percentage": comp.route_overlap_percentage,
+            "route_max_deviation_meters": comp.route_max_deviation_meters,
             "captured_at": comp.captured_at
         })
     
@@ -327,6 +363,8 @@ def trigger_check():
             "new_comparisons": len(new_comparisons),
             "activities": [comp.activity_name for comp in new_comparisons]
         })
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)})
 
@@ -349,9 +387,138 @@ def fetch_historical():
             "activities": [comp.activity_name for comp in new_comparisons],
             "days_back": days_back
         })
+    except RateLimitExceeded:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)})
 
+@app.route('/api/bike_wear')
+def get_bike_wear():
+    """Get brake pad wear per bike from the wear ledger."""
+    user_id = session.get('current_user_id')
+    
+    if not user_id:
+        return jsonify({"error": "Please log in to Strava."})
+    
+    from strava_brake_wear_estimator import BrakePadSpecs
+    from wear_ledger import WearLedger
+    ledger = WearLedger(os.environ.get('WEAR_LEDGER_DB', 'wear_ledger.db'))
+    # Query args only cover bikes whose pads were never recorded via /api/bike_specs
+    default_specs = BrakePadSpecs(
+        material=request.args.get('material', default='organic'),
+        compound_hardness=5.0,
+        initial_thickness_mm=request.args.get('initial_thickness_mm', type=float, default=4.0),
+        minimum_thickness_mm=request.args.get('minimum_thickness_mm', type=float, default=1.0)
+    )
+    bike_specs = ledger.get_bike_specs(int(user_id))
+    
+    bikes = []
+    for entry in ledger.get_all_entries(int(user_id)):
+        specs = bike_specs.get(entry.gear_id, default_specs)
+        usable_thickness = specs.initial_thickness_mm - specs.minimum_thickness_mm
+        bikes.append({
+            "gear_id": entry.gear_id or None,
+            "material": specs.material,
+            "initial_thickness_mm": specs.initial_thickness_mm,
+            "minimum_thickness_mm": specs.minimum_thickness_mm,
+            "specs_recorded": entry.gear_id in bike_specs,
+            "cumulative_wear_mm": round(entry.cumulative_wear_mm, 3),
+            "distance_miles": round(entry.cumulative_distance_miles, 1),
+            "ride_count": entry.ride_count,
+            "wear_percentage": round(min(100.0, max(0.0, entry.cumulative_wear_mm / usable_thickness * 100)), 1),
+            "pads_installed": datetime.fromtimestamp(entry.pads_installed_epoch).isoformat() if entry.pads_installed_epoch else None,
+            "model_version": entry.model_version,
+            "updated_at": entry.updated_at
+        })
+    
+    return jsonify(bikes)
+
+@app.route('/api/bike_specs', methods=['POST'])
+def set_bike_specs():
+    """Record the brake pads fitted to one of the user's bikes."""
+    user_id = session.get('current_user_id')
+    
+    if not user_id:
+        return jsonify({"error": "Please log in to Strava."}), 403
+    
+    from strava_brake_wear_estimator import BrakePadSpecs, StravaBrakeWearEstimator
+    from wear_ledger import WearLedger
+    payload = request.get_json(silent=True) or {}
+    
+    try:
+        specs = BrakePadSpecs(
+            material=str(payload.get('material', 'organic')),
+            compound_hardness=float(payload.get('compound_hardness', 5.0)),
+            initial_thickness_mm=float(payload.get('initial_thickness_mm', 4.0)),
+            minimum_thickness_mm=float(payload.get('minimum_thickness_mm', 1.0))
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid pad specs: {e}"}), 400
+    if specs.material not in StravaBrakeWearEstimator.MATERIAL_WEAR_RATES:
+        return jsonify({"error": f"Unknown pad material: {specs.material}"}), 400
+    if specs.initial_thickness_mm <= specs.minimum_thickness_mm:
+        return jsonify({"error": "Initial thickness must exceed minimum thickness."}), 400
+    
+    ledger = WearLedger(os.environ.get('WEAR_LEDGER_DB', 'wear_ledger.db'))
+    ledger.set_bike_specs(int(user_id), payload.get('gear_id'), specs)
+    
+    # Totals scored with the previous pads are re-scored so /api/bike_wear matches the new ones
+    estimator = StravaBrakeWearEstimator(specs, None)
+    entry = ledger.get_entry(int(user_id), payload.get('gear_id'))
+    if entry and ledger.needs_rebuild(entry, estimator):
+        ledger.rebuild(int(user_id), payload.get('gear_id'), estimator)
+    return jsonify({"success": True, "gear_id": payload.get('gear_id')})
+
+@app.route('/api/ride_track/<int:activity_id>')
+def get_ride_track(activity_id):
+    """Get a ride's stored (simplified) track for map and elevation rendering."""
+    user_id = session.get('current_user_id')
+    
+    if not user_id:
+        return jsonify({"error": "Please log in to Strava."})
+    
+    from ride_store import RideStore
+    store = RideStore(os.environ.get('RIDE_STORE_DB', 'traffic_comparisons.db'))
+    activity = store.get_activity(activity_id)
+    if not activity or activity.get("athlete", {}).get("id") not in (None, int(user_id)):
+        return jsonify({"error": "Ride not found."})
+    
+    streams = store.get_track(activity_id)
+    if streams is None or "latlng" not in streams:
+        return jsonify({"error": "No track stored for this ride."})
+    
+    return jsonify({
+        "activity_id": activity_id,
+        "name": activity.get("name"),
+        "latlng": streams["latlng"].round(6).tolist(),
+        "distance": streams["distance"].round(1).tolist() if "distance" in streams else None,
+        "altitude": streams["altitude"].round(1).tolist() if "altitude" in streams else None
+    })
+
+@app.route('/webhook', methods=['GET'])
+def webhook_verify():
+    """Answer Strava's webhook subscription handshake."""
+    from strava_webhook import verify_subscription
+    body, status = verify_subscription(request.args, os.environ.get('STRAVA_WEBHOOK_VERIFY_TOKEN', ''))
+    return jsonify(body), status
+
+@app.route('/webhook', methods=['POST'])
+def webhook_event():
+    """Queue a Strava webhook event for the monitor (Strava expects a reply within 2 seconds)."""
+    from strava_webhook import WebhookEventQueue
+    payload = request.get_json(silent=True) or {}
+    
+    subscription_id = os.environ.get('STRAVA_WEBHOOK_SUBSCRIPTION_ID')
+    if subscription_id and str(payload.get('subscription_id')) != subscription_id:
+        return jsonify({"error": "Unknown subscription"}), 403
+    
+    try:
+        queue = WebhookEventQueue(os.environ.get('WEBHOOK_DB', 'webhook_events.db'))
+        queued = queue.enqueue(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"success": True, "queued": queued})
+
 @app.route('/api/user_info')
 def get_user_info():
     """Get current user information."""